@@ -124,7 +124,7 @@ class BathroomDataCollector:
         if not self.last_collection:
             return True
 
-        seconds_since_last = (datetime.now() - self.last_collection).seconds
+        seconds_since_last = (datetime.now() - self.last_collection).total_seconds()
         return seconds_since_last >= self.interval_seconds
 
     def _should_reload_config(self) -> bool:
@@ -132,7 +132,7 @@ class BathroomDataCollector:
         if not self._last_config_load:
             return False
 
-        minutes_since_last = (datetime.now() - self._last_config_load).seconds / 60
+        minutes_since_last = (datetime.now() - self._last_config_load).total_seconds() / 60
         return minutes_since_last >= 5
 
     def _collect_data(self):
@@ -13,7 +13,8 @@ class DatabaseMaintenanceJob:
     """Background-Job für automatische Datenbank-Wartung
 
     - Löscht alte Daten basierend auf Retention-Policy
-    - Führt VACUUM aus zur Speicheroptimierung
+    - Gibt freie Seiten per incremental_vacuum zurück (Speicheroptimierung)
+    - Aktualisiert die Planner-Statistiken (ANALYZE)
     - Läuft täglich um 3:00 Uhr
     """
 
@@ -85,14 +86,16 @@ class DatabaseMaintenanceJob:
 
             self.last_cleanup = datetime.now()
 
-            # 2. VACUUM nur wenn viele Daten gelöscht wurden (> 1000 Zeilen)
-            if total_deleted > 1000:
-                logger.info("Running VACUUM to reclaim space...")
-                self.db.vacuum_database()
+            # 2. Freie Seiten zurückgeben (incremental_vacuum statt komplettem VACUUM)
+            if total_deleted > 0:
+                logger.info("Reclaiming free pages...")
+                self.db.reclaim_free_pages()
                 self.last_vacuum = datetime.now()
-                logger.info("VACUUM completed")
 
-            # 3. Zeige Datenbank-Statistiken
+            # 3. Planner-Statistiken aktualisieren (auch Basis für Zeilen-Schätzungen)
+            self.db.analyze()
+
+            # 4. Zeige Datenbank-Statistiken
             db_info = self.db.get_database_size()
             logger.info(f"Database size: {db_info['file_size_mb']} MB, {db_info['total_rows']} total rows")
 
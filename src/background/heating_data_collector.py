@@ -62,6 +62,8 @@ class HeatingDataCollector:
         while self.running:
             try:
                 self._collect_data()
+                # Gepufferte Beobachtungen und ML-Trainingsdaten des Durchlaufs schreiben
+                self.db.flush_write_buffers()
                 self.last_collection = datetime.now()
             except Exception as e:
                 logger.error(f"Error in heating data collection: {e}")
@@ -115,8 +117,7 @@ class HeatingDataCollector:
             collected_count = 0
             for device in heating_devices:
                 try:
-                    observation_id = self._collect_device_data(device, outdoor_temp)
-                    if observation_id:
+                    if self._collect_device_data(device, outdoor_temp):
                         collected_count += 1
                 except Exception as e:
                     logger.error(f"Error collecting data from device {device.get('id')}: {e}")
@@ -126,11 +127,11 @@ class HeatingDataCollector:
         except Exception as e:
             logger.error(f"Error in heating data collection: {e}")
 
-    def _collect_device_data(self, device: dict, outdoor_temp: Optional[float]) -> Optional[int]:
+    def _collect_device_data(self, device: dict, outdoor_temp: Optional[float]) -> bool:
         """Sammelt Daten von einem einzelnen Heizgerät"""
         device_id = device.get('id') or device.get('entity_id')
         if not device_id:
-            return None
+            return False
 
         # Extrahiere Daten (unterstützt beide Formate)
         capabilities = device.get('capabilitiesObj', {})
@@ -179,7 +180,7 @@ class HeatingDataCollector:
                 logger.debug(f"Could not fetch zone name for zone_id {zone_id}: {e}")
 
         # Speichere in Datenbank (beide Tabellen für Analytics und ML)
-        observation_id = self.db.add_heating_observation(
+        self.db.add_heating_observation(
             device_id=device_id,
             room_name=room_name,
             current_temp=current_temp,
@@ -213,7 +214,7 @@ class HeatingDataCollector:
             )
             logger.debug(f"Saved ML training data for {device_name}")
 
-        return observation_id
+        return True
 
     def _get_outdoor_temperature(self) -> Optional[float]:
         """Holt die aktuelle Außentemperatur"""
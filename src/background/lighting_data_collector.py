@@ -89,6 +89,8 @@ class LightingDataCollector:
         while self.running:
             try:
                 self._collect_lighting_data()
+                # Gepufferte ML-Trainingsdaten des Durchlaufs schreiben
+                self.db.flush_write_buffers()
             except Exception as e:
                 logger.error(f"Error in lighting data collection: {e}")
             
@@ -90,6 +90,8 @@ class TemperatureDataCollector:
         while self.running:
             try:
                 self._collect_temperature_data()
+                # Gepufferte ML-Trainingsdaten des Durchlaufs schreiben
+                self.db.flush_write_buffers()
             except Exception as e:
                 logger.error(f"Error in temperature data collection: {e}")
             
@@ -12,7 +12,6 @@ Hinweis: Türen werden explizit NICHT erfasst, nur Fenster!
 import threading
 import time
 from datetime import datetime
-from typing import Optional
 from loguru import logger
 from src.utils.database import Database
 
@@ -61,6 +60,8 @@ class WindowDataCollector:
         while self.running:
             try:
                 self._collect_data()
+                # Gepufferte Beobachtungen des Durchlaufs schreiben
+                self.db.flush_write_buffers()
                 self.last_collection = datetime.now()
             except Exception as e:
                 logger.error(f"Error in window data collection: {e}")
@@ -127,8 +128,7 @@ class WindowDataCollector:
             collected_count = 0
             for device in window_devices:
                 try:
-                    observation_id = self._collect_device_data(device)
-                    if observation_id:
+                    if self._collect_device_data(device):
                         collected_count += 1
                 except Exception as e:
                     logger.error(f"Error collecting data from device {device.get('id')}: {e}")
@@ -138,11 +138,11 @@ class WindowDataCollector:
         except Exception as e:
             logger.error(f"Error in window data collection: {e}")
 
-    def _collect_device_data(self, device: dict) -> Optional[int]:
+    def _collect_device_data(self, device: dict) -> bool:
         """Sammelt Daten von einem einzelnen Fenster"""
         device_id = device.get('id')
         if not device_id:
-            return None
+            return False
 
         device_name = device.get('name', 'Unbekannt')
         capabilities = device.get('capabilitiesObj', {})
@@ -181,8 +181,8 @@ class WindowDataCollector:
             except (AttributeError, KeyError, TypeError) as e:
                 logger.debug(f"Could not fetch zone name for zone_id {zone_id}: {e}")
 
-        # Speichere in Datenbank
-        observation_id = self.db.add_window_observation(
+        # Speichere in Datenbank (gepuffert, Flush am Ende des Durchlaufs)
+        self.db.add_window_observation(
             device_id=device_id,
             device_name=device_name,
             room_name=room_name,
@@ -190,7 +190,7 @@ class WindowDataCollector:
             contact_alarm=contact_alarm
         )
 
-        return observation_id
+        return True
 
     def get_status(self) -> dict:
         """Gibt den aktuellen Status des Collectors zurück"""
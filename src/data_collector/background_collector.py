@@ -92,7 +92,8 @@ class BackgroundDataCollector:
                 logger.warning("No devices found")
                 return
 
-            collected_count = 0
+            # Alle Messwerte eines Durchlaufs werden gesammelt in einer Transaktion geschrieben
+            readings = []
 
             for device_id, state in all_devices.items():
                 # Extrahiere relevante Daten
@@ -105,43 +106,28 @@ class BackgroundDataCollector:
                 if 'measure_temperature' in capabilities:
                     temp_value = capabilities['measure_temperature'].get('value')
                     if temp_value is not None:
-                        self.db.insert_sensor_data(
-                            timestamp=timestamp,
-                            sensor_id=device_id,
-                            sensor_type='temperature',
-                            value=float(temp_value),
-                            unit='°C',
-                            metadata={'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
-                        )
-                        collected_count += 1
+                        readings.append((
+                            timestamp, device_id, 'temperature', float(temp_value), '°C',
+                            {'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
+                        ))
 
                 # Luftfeuchtigkeit
                 if 'measure_humidity' in capabilities:
                     humid_value = capabilities['measure_humidity'].get('value')
                     if humid_value is not None:
-                        self.db.insert_sensor_data(
-                            timestamp=timestamp,
-                            sensor_id=device_id,
-                            sensor_type='humidity',
-                            value=float(humid_value),
-                            unit='%',
-                            metadata={'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
-                        )
-                        collected_count += 1
+                        readings.append((
+                            timestamp, device_id, 'humidity', float(humid_value), '%',
+                            {'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
+                        ))
 
                 # Helligkeit (nur bei signifikanter Änderung > 10 Lux)
                 if 'measure_luminance' in capabilities:
                     lux_value = capabilities['measure_luminance'].get('value')
                     if lux_value is not None and self._has_changed(device_id, 'brightness', float(lux_value), threshold=10.0):
-                        self.db.insert_sensor_data(
-                            timestamp=timestamp,
-                            sensor_id=device_id,
-                            sensor_type='brightness',
-                            value=float(lux_value),
-                            unit='lux',
-                            metadata={'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
-                        )
-                        collected_count += 1
+                        readings.append((
+                            timestamp, device_id, 'brightness', float(lux_value), 'lux',
+                            {'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
+                        ))
 
                 # Bewegung (Binary Sensor - nur bei Änderung)
                 if 'alarm_motion' in capabilities:
@@ -149,15 +135,10 @@ class BackgroundDataCollector:
                     if motion_value is not None:
                         motion_float = 1.0 if motion_value else 0.0
                         if self._has_changed(device_id, 'motion', motion_float, threshold=0.1):
-                            self.db.insert_sensor_data(
-                                timestamp=timestamp,
-                                sensor_id=device_id,
-                                sensor_type='motion',
-                                value=motion_float,
-                                unit='binary',
-                                metadata={'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
-                            )
-                            collected_count += 1
+                            readings.append((
+                                timestamp, device_id, 'motion', motion_float, 'binary',
+                                {'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
+                            ))
 
                 # Lichter (für ML-Training - nur bei Änderung)
                 if 'onoff' in capabilities:
@@ -174,35 +155,27 @@ class BackgroundDataCollector:
 
                         # Speichere nur bei Änderung (on/off Wechsel)
                         if self._has_changed(device_id, 'light_state', light_float, threshold=0.1):
-                            self.db.insert_sensor_data(
-                                timestamp=timestamp,
-                                sensor_id=device_id,
-                                sensor_type='light_state',
-                                value=light_float,
-                                unit='binary',
-                                metadata={
+                            readings.append((
+                                timestamp, device_id, 'light_state', light_float, 'binary',
+                                {
                                     'zone': attributes.get('zone'),
                                     'name': attributes.get('friendly_name'),
                                     'brightness': brightness
                                 }
-                            )
-                            collected_count += 1
+                            ))
 
                 # Heizung (für ML-Training)
                 if 'target_temperature' in capabilities:
                     target_temp = capabilities['target_temperature'].get('value')
                     if target_temp is not None:
-                        self.db.insert_sensor_data(
-                            timestamp=timestamp,
-                            sensor_id=device_id,
-                            sensor_type='target_temperature',
-                            value=float(target_temp),
-                            unit='°C',
-                            metadata={'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
-                        )
-                        collected_count += 1
+                        readings.append((
+                            timestamp, device_id, 'target_temperature', float(target_temp), '°C',
+                            {'zone': attributes.get('zone'), 'name': attributes.get('friendly_name')}
+                        ))
+
+            self.db.insert_sensor_data_many(readings)
 
-            logger.info(f"Collected {collected_count} sensor readings from {len(all_devices)} devices")
+            logger.info(f"Collected {len(readings)} sensor readings from {len(all_devices)} devices")
 
         except Exception as e:
             logger.error(f"Error collecting sensor data: {e}")
@@ -8,6 +8,10 @@ from datetime import datetime
 from .base_collector import SmartHomeCollector
 
 
+# Wie lange die Device-Liste wiederverwendet wird, bevor sie neu geladen wird (Sekunden)
+DEVICE_CACHE_TTL = 30
+
+
 class HomeyCollector(SmartHomeCollector):
     """
     Sammelt Daten von Homey Pro via Web API
@@ -64,13 +68,16 @@ class HomeyCollector(SmartHomeCollector):
             self._cache_timestamp = datetime.now()
             logger.debug(f"Device cache refreshed: {len(devices)} devices")
 
-    def _get_device(self, device_id: str) -> Optional[Dict]:
-        """Holt ein Device aus dem Cache oder API"""
-        # Refresh cache wenn älter als 30 Sekunden
+    def _refresh_device_cache_if_stale(self):
+        """Lädt die Device-Liste neu, wenn sie älter als DEVICE_CACHE_TTL ist"""
         if (not self._cache_timestamp or
-            (datetime.now() - self._cache_timestamp).seconds > 30):
+            (datetime.now() - self._cache_timestamp).total_seconds() > DEVICE_CACHE_TTL):
             self._refresh_device_cache()
 
+    def _get_device(self, device_id: str) -> Optional[Dict]:
+        """Holt ein Device aus dem Cache oder API"""
+        self._refresh_device_cache_if_stale()
+
         # Suche in Cache
         if isinstance(self._device_cache, dict):
             return self._device_cache.get(device_id)
@@ -138,25 +145,28 @@ class HomeyCollector(SmartHomeCollector):
         }
 
     def get_states(self, entity_ids: List[str] = None) -> Dict[str, Dict]:
-        """Holt Status mehrerer Devices"""
-        self._refresh_device_cache()
-
-        states = {}
+        """
+        Holt Status mehrerer Devices
 
-        devices_list = self._device_cache
-        if isinstance(devices_list, dict):
-            devices_list = list(devices_list.values())
+        Wie get_state() aus dem Device-Cache (neu geladen erst nach DEVICE_CACHE_TTL);
+        Devices, die in der Liste fehlen, werden einzeln von der API geholt.
 
-        for device in devices_list:
-            device_id = device.get('id')
+        Args:
+            entity_ids: Optional - nur diese Devices, sonst alle
+        """
+        if not entity_ids:
+            self._refresh_device_cache_if_stale()
 
-            # Filter wenn spezifische IDs angegeben
-            if entity_ids and device_id not in entity_ids:
-                continue
+            devices_list = self._device_cache
+            if isinstance(devices_list, dict):
+                devices_list = list(devices_list.values())
+            entity_ids = [device.get('id') for device in devices_list]
 
-            state = self.get_state(device_id)
+        states = {}
+        for entity_id in entity_ids:
+            state = self.get_state(entity_id)
             if state:
-                states[device_id] = state
+                states[entity_id] = state
 
         return states
 
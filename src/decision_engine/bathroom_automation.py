@@ -358,7 +358,7 @@ class BathroomAutomation:
         if len(self.humidity_history) >= 3:  # Mindestens 3 Messungen
             # Vergleiche aktuelle mit Messung vor 2-3 Minuten
             old_measurement = self.humidity_history[-3]
-            time_diff = (now - old_measurement['time']).seconds / 60  # in Minuten
+            time_diff = (now - old_measurement['time']).total_seconds() / 60  # in Minuten
             
             if time_diff >= 1.0:  # Mindestens 1 Minute zwischen Messungen
                 humidity_diff = humidity - old_measurement['value']
@@ -375,7 +375,7 @@ class BathroomAutomation:
         motion_ok = True
         if self.config.get('motion_sensor_id'):
             if self.last_motion_time:
-                time_since_motion = (datetime.now() - self.last_motion_time).seconds / 60
+                time_since_motion = (datetime.now() - self.last_motion_time).total_seconds() / 60
                 # Keine Bewegung seit 30 Min -> Wahrscheinlich keine Dusche
                 motion_ok = time_since_motion <= 30
             else:
@@ -504,7 +504,7 @@ class BathroomAutomation:
                 logger.info(f"Humidity dropped below threshold ({humidity}%), starting {self.dehumidifier_delay_minutes} min shutdown countdown")
             
             # Prüfe ob Verzögerung abgelaufen ist
-            minutes_since_below = (datetime.now() - self.humidity_below_threshold_since).seconds / 60
+            minutes_since_below = (datetime.now() - self.humidity_below_threshold_since).total_seconds() / 60
             if minutes_since_below < self.dehumidifier_delay_minutes:
                 remaining = self.dehumidifier_delay_minutes - minutes_since_below
                 logger.info(f"Delaying dehumidifier shutdown: {remaining:.1f} min remaining (humidity: {humidity}%)")
@@ -598,7 +598,7 @@ class BathroomAutomation:
         
         # Berechne Zeit bis automatisches Ausschalten (nur wenn Timer bereits von Automation gesetzt wurde)
         if actual_dehumidifier_running and self.humidity_below_threshold_since:
-            elapsed_seconds = (datetime.now() - self.humidity_below_threshold_since).seconds
+            elapsed_seconds = (datetime.now() - self.humidity_below_threshold_since).total_seconds()
             delay_seconds = self.dehumidifier_delay_minutes * 60
             remaining_seconds = delay_seconds - elapsed_seconds
             if remaining_seconds > 0:
@@ -606,7 +606,7 @@ class BathroomAutomation:
 
         # Füge Event-Info hinzu wenn aktiv
         if self.current_event_id and self.event_start_time:
-            duration = (datetime.now() - self.event_start_time).seconds / 60
+            duration = (datetime.now() - self.event_start_time).total_seconds() / 60
             status['current_event'] = {
                 'id': self.current_event_id,
                 'duration_minutes': duration
@@ -720,7 +720,7 @@ class BathroomAutomation:
             # Berechne Luftentfeuchter-Laufzeit
             dehumidifier_runtime = None
             if self.dehumidifier_start_time:
-                dehumidifier_runtime = (datetime.now() - self.dehumidifier_start_time).seconds / 60
+                dehumidifier_runtime = (datetime.now() - self.dehumidifier_start_time).total_seconds() / 60
 
             self.db.end_bathroom_event(
                 event_id=self.current_event_id,
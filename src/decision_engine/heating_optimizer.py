@@ -92,6 +92,9 @@ class HeatingOptimizer:
             except Exception as e:
                 logger.error(f"Error collecting state for {entity_id}: {e}")
 
+        # Gepufferte Beobachtungen in einer Transaktion schreiben
+        self.db.flush_write_buffers()
+
         logger.info(f"Collected {len(observations)} heating observations")
         return {
             'timestamp': datetime.now().isoformat(),
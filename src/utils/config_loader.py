@@ -41,6 +41,8 @@ class ConfigLoader:
 
         self.config_path = Path(config_path)
         self.config = self._load_config()
+        # Wird bei jedem update() erhöht - erlaubt Caches auf Config-Werten
+        self.version = 0
         self._merge_env_variables()
 
         # Validate configuration if requested and Pydantic is available
@@ -187,6 +189,7 @@ class ConfigLoader:
 
         # Set value
         config_ref[keys[-1]] = value
+        self.version += 1
 
         # Save to YAML
         return self._save_config()
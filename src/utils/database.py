@@ -1,20 +1,245 @@
 """Datenbankmanagement für historische Daten"""
 
+import atexit
+import copy
 import sqlite3
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
+from itertools import chain, groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional
 import json
+import numpy as np
 from loguru import logger
 
 
+# Klassifizierung von Kontakt-Sensoren für window_observations.device_kind
+WINDOW_NAME_KEYWORDS = ('fenster', 'window')
+WINDOW_EXCLUDE_KEYWORDS = ('tür', 'door', 'temperatur', 'temperature', 'gruppe', 'group')
+
+# heating_observations: Spalten der früheren Schema-Varianten (siehe
+# Database._upgrade_heating_observations_columns)
+HEATING_OBSERVATION_RENAMED_COLUMNS = {
+    'current_temperature': 'current_temp',
+    'target_temperature': 'target_temp',
+    'outdoor_temperature': 'outdoor_temp',
+}
+HEATING_OBSERVATION_ADDED_COLUMNS = {
+    'presence_detected': 'BOOLEAN',
+    'window_open': 'BOOLEAN',
+    'energy_price_level': 'INTEGER',
+    'is_weekend': 'BOOLEAN',
+}
+
+# Sortierbare Rangfolge für heating_insights.priority (-> priority_rank)
+HEATING_INSIGHT_PRIORITY_RANK = {'low': 1, 'medium': 2, 'high': 3}
+
+# Gültigkeit (Sekunden) für gecachte gelernte Badezimmer-Parameter
+LEARNED_PARAMETER_CACHE_TTL = 60.0
+
+# Gültigkeit (Sekunden) für gecachte Dashboard-Statistiken (Database._cached_statistics);
+# eigene Schreibzugriffe verwerfen den Cache sofort, die TTL begrenzt das Alter bei
+# Änderungen über andere Instanzen (z.B. Collector-Threads)
+BATHROOM_STATISTICS_CACHE_TTL = 60.0
+BATHROOM_ENERGY_STATS_CACHE_TTL = 300.0
+WINDOW_OPEN_STATISTICS_CACHE_TTL = 60.0
+
+# INSERT/UPDATE ... RETURNING gibt es ab SQLite 3.35, UPDATE ... FROM ab 3.33; ältere
+# Bibliotheken (z.B. Debian 11, Ubuntu 20.04) nutzen lastrowid bzw. eine separate Abfrage
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Größe des sqlite3-Statement-Caches pro Verbindung (Standard: 128); dieses Modul
+# nutzt deutlich mehr verschiedene Queries (~130 feste plus Filter-Varianten)
+STATEMENT_CACHE_SIZE = 256
+
+# Wartezeit in Sekunden, wenn eine andere Verbindung gerade schreibt (sqlite3-Parameter
+# timeout = PRAGMA busy_timeout); jeder Thread schreibt über eine eigene Verbindung
+BUSY_TIMEOUT_SECONDS = 5.0
+
+# Page-Cache pro Verbindung in KiB (PRAGMA cache_size, negativ = KiB); jeder Thread hat
+# eigene Verbindungen, daher moderat statt der 2 MB Standard mal Thread-Anzahl hoch
+PAGE_CACHE_SIZE_KIB = 16384
+
+# Memory-mapped I/O: Lesezugriffe direkt aus dem Page-Cache des Betriebssystems,
+# von allen Verbindungen gemeinsam genutzt
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Zeilen pro Transaktion beim Löschen alter Daten aus großen Zeitreihen-Tabellen
+RETENTION_DELETE_BATCH_SIZE = 5000
+
+# Höchstens so viele freie Seiten pro Wartungslauf zurückgeben (4 KiB-Seiten: ~40 MB),
+# damit der Schreib-Lock kurz bleibt; der Rest folgt beim nächsten Lauf
+INCREMENTAL_VACUUM_MAX_PAGES = 10000
+
+# Schreibpuffer für ML-Trainingsdaten und Beobachtungen: Flush nach so vielen Zeilen bzw. Sekunden
+WRITE_BUFFER_MAX_ROWS = 200
+WRITE_BUFFER_MAX_AGE = 30.0
+# Nach einem fehlgeschlagenen Flush (z.B. Lock durch VACUUM) bleiben die Zeilen gepuffert,
+# pro Tabelle aber höchstens so viele (älteste werden verworfen)
+WRITE_BUFFER_MAX_PENDING = 20000
+
+class LightingEventRow(NamedTuple):
+    """Gepufferte Zeile für lighting_events (Reihenfolge = Parameter ?1..?9)"""
+    timestamp: str
+    device_id: str
+    device_name: str
+    room_name: str
+    state: str
+    brightness: Optional[int]
+    outdoor_light: Optional[float]
+    presence: bool
+    motion_detected: bool
+
+
+class ContinuousMeasurementRow(NamedTuple):
+    """Gepufferte Zeile für continuous_measurements (Reihenfolge = Parameter ?1..?12)"""
+    timestamp: str
+    device_id: str
+    device_name: str
+    room_name: str
+    current_temperature: float
+    target_temperature: float
+    outdoor_temperature: Optional[float]
+    humidity: Optional[float]
+    heating_active: bool
+    presence: bool
+    window_open: bool
+    energy_price_level: int
+
+
+class HeatingObservationRow(NamedTuple):
+    """Gepufferte Zeile für heating_observations (Reihenfolge = Parameter ?1..?12)"""
+    timestamp: str
+    device_id: str
+    room_name: Optional[str]
+    current_temp: Optional[float]
+    target_temp: Optional[float]
+    outdoor_temp: Optional[float]
+    is_heating: bool
+    presence_detected: Optional[bool]
+    window_open: Optional[bool]
+    energy_price_level: int
+    humidity: Optional[float]
+    power_percentage: Optional[float]
+
+
+class WindowObservationRow(NamedTuple):
+    """Gepufferte Zeile für window_observations (Reihenfolge = Parameter ?1..?7)"""
+    timestamp: str
+    device_id: str
+    device_name: Optional[str]
+    room_name: Optional[str]
+    is_open: bool
+    contact_alarm: bool
+    device_kind: str
+
+
+# Insert für sensor_data (Database.insert_sensor_data_many) - eine Konstante wie
+# BUFFERED_INSERTS, damit alle Aufrufer denselben Eintrag im Statement-Cache treffen
+SENSOR_DATA_INSERT = """
+    INSERT INTO sensor_data
+    (timestamp, sensor_id, sensor_type, value, unit, metadata)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Gepufferte Inserts (Tabelle -> SQL), siehe Database._buffer_insert.
+# hour_of_day/day_of_week/is_weekend leitet SQLite aus dem gebundenen Zeitstempel ?1
+# ab (day_of_week wie datetime.weekday(): 0=Montag; strftime('%w'): 0=Sonntag)
+BUFFERED_INSERTS = {
+    'lighting_events': """
+        INSERT INTO lighting_events
+        (timestamp, device_id, device_name, room_name, state, brightness,
+         hour_of_day, day_of_week, is_weekend, outdoor_light, presence, motion_detected)
+        VALUES (?1, ?2, ?3, ?4, ?5, ?6,
+                CAST(strftime('%H', ?1) AS INTEGER),
+                (CAST(strftime('%w', ?1) AS INTEGER) + 6) % 7,
+                strftime('%w', ?1) IN ('0', '6'),
+                ?7, ?8, ?9)
+    """,
+    'continuous_measurements': """
+        INSERT INTO continuous_measurements
+        (timestamp, device_id, device_name, room_name, current_temperature, target_temperature,
+         outdoor_temperature, humidity, heating_active, presence, window_open,
+         hour_of_day, day_of_week, is_weekend, energy_price_level)
+        VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11,
+                CAST(strftime('%H', ?1) AS INTEGER),
+                (CAST(strftime('%w', ?1) AS INTEGER) + 6) % 7,
+                strftime('%w', ?1) IN ('0', '6'),
+                ?12)
+    """,
+    'heating_observations': """
+        INSERT INTO heating_observations
+        (timestamp, device_id, room_name, current_temp, target_temp, outdoor_temp, is_heating,
+         presence_detected, window_open, energy_price_level, humidity, power_percentage,
+         hour_of_day, day_of_week, is_weekend)
+        VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12,
+                CAST(strftime('%H', ?1) AS INTEGER),
+                (CAST(strftime('%w', ?1) AS INTEGER) + 6) % 7,
+                strftime('%w', ?1) IN ('0', '6'))
+    """,
+    'window_observations': """
+        INSERT INTO window_observations
+        (timestamp, device_id, device_name, room_name, is_open, contact_alarm, device_kind)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+}
+
+# datetime explizit als ISO-Text ('YYYY-MM-DD HH:MM:SS.ffffff') speichern - dasselbe
+# Format wie der in Python 3.12 als deprecated markierte Standard-Adapter
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+# Offene Instanzen, deren Schreibpuffer beim Beenden noch geschrieben werden
+_open_databases = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_databases():
+    for database in list(_open_databases):
+        try:
+            database.flush_write_buffers()
+        except Exception as e:
+            logger.error(f"Error flushing write buffers on exit: {e}")
+
+
+def classify_window_device(device_name: Optional[str]) -> str:
+    """Ordnet ein Gerät anhand des Namens ein: 'window' für echte Fenster, sonst 'other'"""
+    name = (device_name or '').lower()
+    if any(keyword in name for keyword in WINDOW_NAME_KEYWORDS) and \
+            not any(keyword in name for keyword in WINDOW_EXCLUDE_KEYWORDS):
+        return 'window'
+    return 'other'
+
+
 class Database:
     """SQLite Datenbank für Sensor- und Entscheidungsdaten"""
 
     def __init__(self, db_path: str = "data/ki_system.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Verbindung des erzeugenden Threads (bei ':memory:' die einzige Verbindung)
         self.connection = None
+        # Eine Verbindung pro Thread (Schreiben bzw. read-only), siehe _thread_connection
+        self._connection_local = threading.local()
+        self._connections: Dict[int, tuple] = {}
+        self._connections_lock = threading.Lock()
+        # (Methode, parameter_name, min_confidence) -> (Ablaufzeit, Ergebnis)
+        self._learned_cache: Dict[tuple, tuple] = {}
+        self._learned_cache_lock = threading.Lock()
+        # (Methode, Argumente) -> (Ablaufzeit, Ergebnis), siehe _cached_statistics
+        self._statistics_cache: Dict[tuple, tuple] = {}
+        self._statistics_cache_lock = threading.Lock()
+        # ((Pfad, mtime_ns), device_id -> Raumname) aus rooms.json
+        self._rooms_cache = None
+        # Gepufferte Zeilen pro Tabelle (siehe BUFFERED_INSERTS)
+        self._write_buffers: Dict[str, list] = {table: [] for table in BUFFERED_INSERTS}
+        self._write_buffer_since = None
+        # time.monotonic() des letzten fehlgeschlagenen Flushs (automatischer Retry erst nach WRITE_BUFFER_MAX_AGE)
+        self._write_buffer_failed_at = None
+        self._write_buffer_lock = threading.Lock()
+        _open_databases.add(self)
         self._init_database()
         self._run_migrations()
 
@@ -127,14 +352,14 @@ class Database:
         # Badezimmer - Gelernte Parameter
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS bathroom_learned_parameters (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp DATETIME NOT NULL,
                 parameter_name TEXT NOT NULL,
                 parameter_value REAL NOT NULL,
                 confidence REAL,
                 samples_used INTEGER,
-                reason TEXT
-            )
+                reason TEXT,
+                PRIMARY KEY (parameter_name, timestamp DESC)
+            ) WITHOUT ROWID
         """)
 
         # Badezimmer - Kontinuierliche Messungen (alle 60s)
@@ -209,10 +434,10 @@ class Database:
                 timestamp DATETIME NOT NULL,
                 device_id TEXT NOT NULL,
                 room_name TEXT,
-                current_temperature REAL,
-                target_temperature REAL,
-                outdoor_temperature REAL,
-                is_heating BOOLEAN,
+                current_temp REAL,
+                target_temp REAL,
+                outdoor_temp REAL,
+                is_heating BOOLEAN DEFAULT 0,
                 presence_detected BOOLEAN,
                 window_open BOOLEAN,
                 energy_price_level INTEGER,
@@ -223,6 +448,7 @@ class Database:
                 is_weekend BOOLEAN
             )
         """)
+        self._upgrade_heating_observations_columns(cursor)
 
         # KI-generierte Heizungs-Insights
         cursor.execute("""
@@ -341,6 +567,18 @@ class Database:
             ON sensor_data(timestamp, sensor_id)
         """)
 
+        # Filter auf einen Sensor bzw. Sensor-Typ + Zeitbereich (Zeitreihen, Aggregation);
+        # idx_sensor_timestamp bleibt für reine Zeitbereiche (Retention, MIN/MAX)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sensor_id_time
+            ON sensor_data(sensor_id, timestamp)
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sensor_type_time
+            ON sensor_data(sensor_type, timestamp)
+        """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_decisions_timestamp
             ON decisions(timestamp, device_id)
@@ -356,6 +594,11 @@ class Database:
             ON bathroom_measurements(event_id, timestamp)
         """)
 
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_bathroom_continuous_time
+            ON bathroom_continuous_measurements(timestamp)
+        """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_lighting_events_time
             ON lighting_events(timestamp, device_id)
@@ -391,26 +634,82 @@ class Database:
             ON humidity_alerts(timestamp, room_name, acknowledged)
         """)
 
+        # Partieller Index nur über offene Warnungen (acknowledged = 0) - klein gegenüber
+        # der Historie; ersetzt den früheren Vollindex idx_humidity_alerts_ack_time
+        cursor.execute("DROP INDEX IF EXISTS idx_humidity_alerts_ack_time")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_humidity_alerts_active
+            ON humidity_alerts(timestamp DESC, room_name)
+            WHERE acknowledged = 0
+        """)
+
+        # Gleicher Teilindex mit Raum vorne für get_active_humidity_alerts(room_name=...)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_humidity_alerts_active_room
+            ON humidity_alerts(room_name, timestamp DESC)
+            WHERE acknowledged = 0
+        """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_ventilation_recs_time
             ON ventilation_recommendations(timestamp, room_name)
         """)
 
+        # Neueste Empfehlung pro Raum per Index-Seek statt Scan + Sortierung
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ventilation_recs_room_time
+            ON ventilation_recommendations(room_name, timestamp DESC)
+        """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_shower_predictions_time
             ON shower_predictions(predicted_time, confidence)
         """)
 
         conn.commit()
+
+        # Planner-Statistiken einmalig erzeugen (danach über Wartungs-Job aktuell gehalten)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            self.analyze()
+
         logger.info(f"Database initialized at {self.db_path}")
 
+    @staticmethod
+    def _upgrade_heating_observations_columns(cursor: sqlite3.Cursor):
+        """
+        Gleicht ältere heating_observations-Tabellen an das aktuelle Schema an
+
+        Es gab zwei Varianten: die frühere aus _init_database (current_temperature,
+        target_temperature, outdoor_temperature) und die aus Migration 002 (current_temp,
+        ..., ohne Präsenz/Fenster/Energiepreis). Eine .sql-Migration kann nicht nach
+        vorhandenen Spalten verzweigen, daher hier: Spalten umbenennen bzw. ergänzen,
+        vorhandene Zeilen bleiben erhalten.
+        """
+        cursor.execute("SELECT name FROM pragma_table_info('heating_observations')")
+        columns = {row[0] for row in cursor.fetchall()}
+
+        for old_name, new_name in HEATING_OBSERVATION_RENAMED_COLUMNS.items():
+            if old_name in columns and new_name not in columns:
+                cursor.execute(f"ALTER TABLE heating_observations RENAME COLUMN {old_name} TO {new_name}")
+                columns.add(new_name)
+
+        for name, column_type in HEATING_OBSERVATION_ADDED_COLUMNS.items():
+            if name not in columns:
+                cursor.execute(f"ALTER TABLE heating_observations ADD COLUMN {name} {column_type}")
+
     def _run_migrations(self):
         """Führt ausstehende Datenbank-Migrationen aus"""
+        # Der MigrationManager öffnet eine eigene Verbindung - bei ':memory:' wäre das
+        # eine zweite, leere Datenbank
+        if str(self.db_path) == ':memory:':
+            return
+
         try:
             from src.utils.migrations import MigrationManager
 
-            migrator = MigrationManager(str(self.db_path))
-            applied_count = migrator.run_migrations()
+            with MigrationManager(str(self.db_path)) as migrator:
+                applied_count = migrator.run_migrations()
 
             if applied_count > 0:
                 logger.info(f"Applied {applied_count} database migration(s)")
@@ -419,16 +718,173 @@ class Database:
             logger.error(f"Error running database migrations: {e}")
             # Nicht fatal - System kann ohne Migrationen weiterlaufen
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Gibt eine Datenbankverbindung zurück"""
-        if self.connection is None:
-            self.connection = sqlite3.connect(
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Öffnet eine neue Verbindung (read_only: per URI mode=ro und query_only)"""
+        if read_only:
+            conn = sqlite3.connect(
+                f"{self.db_path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                timeout=BUSY_TIMEOUT_SECONDS,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+            conn.execute("PRAGMA query_only = 1")
+        else:
+            conn = sqlite3.connect(
                 self.db_path,
+                timeout=BUSY_TIMEOUT_SECONDS,
                 detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
-                check_same_thread=False  # Erlaubt Multi-Threading für Flask
+                check_same_thread=False,  # close() schließt auch Verbindungen anderer Threads
+                cached_statements=STATEMENT_CACHE_SIZE
             )
-            self.connection.row_factory = sqlite3.Row
-        return self.connection
+            # Freie Seiten nach Retention-Löschungen schrittweise zurückgeben statt per
+            # komplettem VACUUM; muss vor WAL stehen, damit es bei neuen Datenbanken
+            # greift - bestehende werden beim nächsten VACUUM umgestellt (reclaim_free_pages)
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            # WAL: Leser (eigene Verbindungen pro Thread) blockieren Schreiber nicht
+            # und umgekehrt; NORMAL reicht bei WAL für Crash-Sicherheit
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{PAGE_CACHE_SIZE_KIB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        # Sortierungen/temporäre Indizes (GROUP BY, ORDER BY ohne Index) im RAM
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _thread_connection(self, read_only: bool) -> sqlite3.Connection:
+        """
+        Gibt die Verbindung des aktuellen Threads zurück (wird bei Bedarf geöffnet)
+
+        Jeder Thread (Flask-Requests, Collector, Wartungs-Job) bekommt eine eigene
+        dauerhafte Verbindung statt sich eine zu teilen. Verbindungen beendeter
+        Threads werden beim Öffnen einer neuen Verbindung geschlossen.
+        """
+        attribute = 'reader' if read_only else 'writer'
+        conn = getattr(self._connection_local, attribute, None)
+        if conn is not None:
+            return conn
+
+        current = threading.current_thread()
+        with self._connections_lock:
+            for key, (thread, stale_conn) in list(self._connections.items()):
+                if not thread.is_alive():
+                    stale_conn.close()
+                    del self._connections[key]
+
+            conn = self._connect(read_only=read_only)
+            self._connections[id(conn)] = (current, conn)
+            setattr(self._connection_local, attribute, conn)
+            if not read_only and self.connection is None:
+                self.connection = conn
+        return conn
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Gibt die Datenbankverbindung des aktuellen Threads zurück"""
+        if str(self.db_path) == ':memory:':
+            # Jede Verbindung wäre eine eigene leere Datenbank -> eine gemeinsame
+            if self.connection is None:
+                self.connection = self._connect()
+            return self.connection
+        return self._thread_connection(read_only=False)
+
+    def _get_reader_connection(self) -> sqlite3.Connection:
+        """
+        Gibt die read-only Verbindung des aktuellen Threads zurück
+
+        Lange Statistik-Scans laufen so nicht über die Schreib-Verbindung und
+        blockieren die regelmäßigen Inserts der Collector nicht. Bei ':memory:'
+        gibt es keine zweite Sicht auf dieselbe Datenbank - dort wird die
+        normale Verbindung verwendet.
+        """
+        if str(self.db_path) == ':memory:':
+            return self._get_connection()
+        return self._thread_connection(read_only=True)
+
+    @staticmethod
+    def _fetch_columns(cursor: sqlite3.Cursor, dtypes: Dict[str, Any],
+                       chunk_size: int = None) -> Dict[str, np.ndarray]:
+        """
+        Holt das Ergebnis einer Query spaltenweise als NumPy-Arrays
+
+        Args:
+            cursor: Ausgeführter Cursor (Spalten in derselben Reihenfolge wie dtypes)
+            dtypes: Mapping Spaltenname -> NumPy-dtype (z.B. np.float64, np.int64, object)
+            chunk_size: Wenn gesetzt, wird in Blöcken per fetchmany gelesen, damit
+                        nie das ganze Ergebnis als Python-Tupel im Speicher liegt
+
+        Returns:
+            Dict Spaltenname -> np.ndarray. NULL wird bei Float-Spalten zu NaN,
+            bei Integer-Spalten zu -1 und bleibt bei object-Spalten None.
+        """
+        missing_values = []
+        for dtype in dtypes.values():
+            if np.issubdtype(dtype, np.floating):
+                missing_values.append(np.nan)
+            elif np.issubdtype(dtype, np.integer):
+                missing_values.append(-1)
+            else:
+                missing_values.append(None)
+
+        def to_arrays(rows):
+            count = len(rows)
+            return [
+                np.fromiter(
+                    (missing if row[index] is None else row[index] for row in rows),
+                    dtype=dtype,
+                    count=count
+                )
+                for index, (dtype, missing) in enumerate(zip(dtypes.values(), missing_values))
+            ]
+
+        if chunk_size is None:
+            return dict(zip(dtypes, to_arrays(cursor.fetchall())))
+
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunks.append(to_arrays(rows))
+
+        if not chunks:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in dtypes.items()}
+        return {
+            name: np.concatenate([chunk[index] for chunk in chunks])
+            for index, name in enumerate(dtypes)
+        }
+
+    @staticmethod
+    def _rows_as_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+        """
+        Wandelt das Ergebnis einer Query in eine Liste von Dicts um
+
+        Die Spaltennamen werden einmal aus cursor.description gelesen. Mit
+        cursor.row_factory = None vor dem execute sind die Zeilen einfache Tupel
+        statt sqlite3.Row.
+        """
+        columns = tuple(description[0] for description in cursor.description)
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _iter_dict_chunks(cursor: sqlite3.Cursor, chunk_size: int) -> Iterator[List[Dict]]:
+        """Wie _rows_as_dicts, aber blockweise per fetchmany (je bis zu chunk_size Dicts)"""
+        columns = tuple(description[0] for description in cursor.description)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [dict(zip(columns, row)) for row in rows]
+
+    @staticmethod
+    def _rows_as_columns(cursor: sqlite3.Cursor) -> Dict[str, list]:
+        """Wandelt das Ergebnis einer Query spaltenweise um ({Spalte: [Werte]})"""
+        columns = tuple(description[0] for description in cursor.description)
+        rows = cursor.fetchall()
+        if not rows:
+            return {column: [] for column in columns}
+        return {column: list(values) for column, values in zip(columns, zip(*rows))}
 
     def execute(self, query: str, params: tuple = None) -> List[Dict]:
         """
@@ -443,40 +899,54 @@ class Database:
         """
         conn = self._get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         if params:
             cursor.execute(query, params)
         else:
             cursor.execute(query)
 
-        # Konvertiere sqlite3.Row Objekte zu Dictionaries
-        results = []
-        for row in cursor.fetchall():
-            results.append(dict(row))
+        # Statements ohne Ergebnisspalten (z.B. UPDATE ohne RETURNING)
+        if cursor.description is None:
+            return []
 
-        return results
+        return self._rows_as_dicts(cursor)
 
     def insert_sensor_data(self, sensor_id: str, sensor_type: str,
                           value: float, unit: str = None,
                           metadata: Dict = None, timestamp: datetime = None):
         """Fügt Sensordaten hinzu"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO sensor_data
+        self.insert_sensor_data_many([
             (timestamp, sensor_id, sensor_type, value, unit, metadata)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            timestamp or datetime.now(),
-            sensor_id,
-            sensor_type,
-            value,
-            unit,
-            json.dumps(metadata) if metadata else None
-        ))
+        ])
 
-        conn.commit()
+    def insert_sensor_data_many(self, rows: List[tuple]) -> int:
+        """
+        Fügt mehrere Sensordaten in einer Transaktion hinzu
+
+        Args:
+            rows: Tupel (timestamp, sensor_id, sensor_type, value, unit, metadata);
+                  timestamp None = jetzt, metadata als Dict oder None
+
+        Returns:
+            Anzahl eingefügter Zeilen
+        """
+        if not rows:
+            return 0
+
+        # Zeitstempel sekundengenau speichern: 19 statt 26 Bytes pro Zeile und pro
+        # Index-Eintrag (sensor_data hat drei Indizes mit timestamp); Metadaten als
+        # kompaktes JSON ohne Leerzeichen und mit Umlauten als UTF-8 statt \uXXXX
+        now = datetime.now()
+        conn = self._get_connection()
+        with conn:
+            conn.executemany(SENSOR_DATA_INSERT, [
+                ((timestamp or now).isoformat(' ', 'seconds'), sensor_id, sensor_type, value, unit,
+                 json.dumps(metadata, separators=(',', ':'), ensure_ascii=False) if metadata else None)
+                for timestamp, sensor_id, sensor_type, value, unit, metadata in rows
+            ])
+
+        return len(rows)
 
     def insert_external_data(self, data_type: str, data: Dict, timestamp: datetime = None):
         """Fügt externe Daten hinzu (Wetter, Strompreise)"""
@@ -486,23 +956,130 @@ class Database:
         cursor.execute("""
             INSERT INTO external_data (timestamp, data_type, data)
             VALUES (?, ?, ?)
-        """, (timestamp or datetime.now(), data_type, json.dumps(data)))
+        """, (timestamp or datetime.now(), data_type,
+              json.dumps(data, separators=(',', ':'), ensure_ascii=False)))
 
         conn.commit()
 
     def get_sensor_data_count(self) -> int:
         """Gibt die Gesamtanzahl der Sensor-Datensätze zurück"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) as count FROM sensor_data")
-        return cursor.fetchone()['count']
+        return self.get_table_counts(['sensor_data'])['sensor_data']
 
     def get_external_data_count(self) -> int:
         """Gibt die Gesamtanzahl der externen Datensätze zurück"""
-        conn = self._get_connection()
+        return self.get_table_counts(['external_data'])['external_data']
+
+    def get_table_counts(self, tables: List[str]) -> Dict[str, int]:
+        """Zählt die Zeilen mehrerer Tabellen
+
+        Große Tabellen werden per Trigger in row_counts mitgezählt (Migration 010)
+        und von dort gelesen; alle übrigen werden in einer einzigen Query gezählt.
+
+        Args:
+            tables: Liste der Tabellennamen (feste Namen, keine Benutzereingaben)
+
+        Returns:
+            Dict Tabellenname -> Anzahl Zeilen (0 wenn Tabelle nicht existiert)
+        """
+        if not tables:
+            return {}
+
+        conn = self._get_reader_connection()
+        cursor = conn.cursor()
+
+        table_counts = self._tracked_row_counts(cursor, tables)
+
+        missing = [table for table in tables if table not in table_counts]
+        if missing:
+            table_counts.update(self._count_rows(cursor, missing))
+
+        return {table: table_counts[table] for table in tables}
+
+    @staticmethod
+    def _tracked_row_counts(cursor: sqlite3.Cursor, tables: List[str]) -> Dict[str, int]:
+        """Liest die per Trigger gepflegten Zeilenanzahlen aus row_counts (Migration 010)"""
+        try:
+            placeholders = ', '.join('?' for _ in tables)
+            cursor.execute(f"""
+                SELECT table_name, row_count FROM row_counts
+                WHERE table_name IN ({placeholders})
+            """, tuple(tables))
+            return {row['table_name']: row['row_count'] for row in cursor.fetchall()}
+        except sqlite3.OperationalError:
+            # row_counts existiert nicht (Migrationen nicht gelaufen, z.B. :memory:)
+            return {}
+
+    @staticmethod
+    def _existing_tables(cursor: sqlite3.Cursor, tables: List[str]) -> set:
+        """Gibt die vorhandenen Tabellen aus tables zurück (laut sqlite_master)"""
+        placeholders = ', '.join('?' for _ in tables)
+        cursor.execute(f"""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name IN ({placeholders})
+        """, tuple(tables))
+        return {row[0] for row in cursor.fetchall()}
+
+    @staticmethod
+    def _count_rows(cursor: sqlite3.Cursor, tables: List[str]) -> Dict[str, int]:
+        """Zählt die Zeilen per COUNT(*) in einer UNION ALL-Query (0 für fehlende Tabellen)"""
+        # Nur vorhandene Tabellen abfragen (z.B. fehlen Migrations-Tabellen bei :memory:)
+        existing = Database._existing_tables(cursor, tables)
+
+        table_counts = {table: 0 for table in tables}
+        if existing:
+            cursor.execute(" UNION ALL ".join(
+                f"SELECT '{table}' AS name, COUNT(*) AS count FROM {table}"
+                for table in tables if table in existing
+            ))
+            table_counts.update((row[0], row[1]) for row in cursor.fetchall())
+
+        return table_counts
+
+    def get_table_count_estimates(self, tables: List[str]) -> Dict[str, int]:
+        """Liefert geschätzte Zeilenanzahlen aus den ANALYZE-Statistiken (sqlite_stat1)
+
+        Günstiger als COUNT(*), da keine Tabelle durchlaufen wird. Die Werte sind
+        so aktuell wie der letzte ANALYZE-Lauf; in row_counts mitgezählte Tabellen
+        sind exakt. Tabellen ohne Statistik werden exakt gezählt.
+
+        Args:
+            tables: Liste der Tabellennamen
+
+        Returns:
+            Dict Tabellenname -> (geschätzte) Anzahl Zeilen
+        """
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) as count FROM external_data")
-        return cursor.fetchone()['count']
+
+        estimates = {}
+        try:
+            placeholders = ', '.join('?' for _ in tables)
+            cursor.execute(f"""
+                SELECT tbl, stat FROM sqlite_stat1
+                WHERE tbl IN ({placeholders})
+            """, tuple(tables))
+
+            for row in cursor.fetchall():
+                # Erste Zahl im stat-Feld = Anzahl Zeilen der Tabelle
+                estimates[row['tbl']] = int(row['stat'].split()[0])
+        except sqlite3.OperationalError:
+            # sqlite_stat1 existiert noch nicht (ANALYZE nie gelaufen)
+            pass
+
+        estimates.update(self._tracked_row_counts(cursor, tables))
+
+        missing = [table for table in tables if table not in estimates]
+        if missing:
+            estimates.update(self.get_table_counts(missing))
+
+        return {table: estimates[table] for table in tables}
+
+    def analyze(self):
+        """Aktualisiert die Planner-Statistiken (sqlite_stat1) via ANALYZE"""
+        conn = self._get_connection()
+        conn.execute("ANALYZE")
+        conn.commit()
+        logger.debug("Database statistics updated (ANALYZE)")
 
     def get_latest_external_data(self, data_type: str) -> Optional[Dict]:
         """Holt die neuesten externen Daten eines bestimmten Typs
@@ -513,7 +1090,7 @@ class Database:
         Returns:
             Dictionary mit den neuesten Daten oder None
         """
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -533,7 +1110,7 @@ class Database:
 
     def get_latest_sensor_timestamp(self) -> Optional[datetime]:
         """Gibt den Zeitstempel der letzten Sensor-Messung zurück"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT MAX(timestamp) as latest FROM sensor_data")
         result = cursor.fetchone()
@@ -541,6 +1118,15 @@ class Database:
             return datetime.fromisoformat(result['latest'])
         return None
 
+    @staticmethod
+    def _insert_returning_id(cursor: sqlite3.Cursor, query: str, params) -> int:
+        """Führt ein INSERT aus und gibt die neue id zurück (RETURNING bzw. lastrowid)"""
+        if SQLITE_HAS_RETURNING:
+            cursor.execute(query + "RETURNING id", params)
+            return cursor.fetchone()[0]
+        cursor.execute(query, params)
+        return cursor.lastrowid
+
     def insert_decision(self, device_id: str, decision_type: str,
                        action: str, confidence: float,
                        model_version: str = None):
@@ -548,7 +1134,7 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("""
+        decision_id = self._insert_returning_id(cursor, """
             INSERT INTO decisions
             (timestamp, device_id, decision_type, action, confidence, model_version)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -560,9 +1146,8 @@ class Database:
             confidence,
             model_version
         ))
-
         conn.commit()
-        return cursor.lastrowid
+        return decision_id
 
     def update_decision_result(self, decision_id: int, executed: bool, result: str = None):
         """Aktualisiert das Ergebnis einer Entscheidung"""
@@ -582,7 +1167,7 @@ class Database:
                        hours_back: int = 24,
                        limit: int = None) -> List[Dict]:
         """Holt Sensordaten der letzten X Stunden"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         start_time = datetime.now() - timedelta(hours=hours_back)
@@ -598,27 +1183,89 @@ class Database:
             query += " AND sensor_type = ?"
             params.append(sensor_type)
 
-        query += " ORDER BY timestamp DESC"
-
-        if limit:
-            query += f" LIMIT {limit}"
+        # LIMIT immer gebunden (-1 = ohne Limit), damit der Statement-Cache greift
+        query += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(int(limit) if limit else -1)
 
         cursor.execute(query, params)
+        return self._sensor_rows_as_dicts(cursor.fetchall())
 
+    @staticmethod
+    def _sensor_rows_as_dicts(rows) -> List[Dict]:
+        """
+        Wandelt sensor_data-Zeilen in Dicts um (metadata-JSON wird geparst)
+
+        Die Metadaten eines Sensors sind meist bei jeder Messung gleich - jeder
+        JSON-Text wird daher nur einmal geparst, jede Zeile bekommt eine Kopie.
+        """
+        parsed_metadata = {}
         results = []
-        for row in cursor.fetchall():
+        for row in rows:
             result = dict(row)
             # Parse metadata JSON
-            if result.get('metadata'):
-                try:
-                    result['metadata'] = json.loads(result['metadata'])
-                except (json.JSONDecodeError, TypeError) as e:
-                    logger.debug(f"Failed to parse metadata JSON: {e}")
-                    result['metadata'] = None
+            raw_metadata = result.get('metadata')
+            if raw_metadata:
+                if raw_metadata not in parsed_metadata:
+                    try:
+                        parsed_metadata[raw_metadata] = json.loads(raw_metadata)
+                    except (json.JSONDecodeError, TypeError) as e:
+                        logger.debug(f"Failed to parse metadata JSON: {e}")
+                        parsed_metadata[raw_metadata] = None
+                metadata = parsed_metadata[raw_metadata]
+                result['metadata'] = dict(metadata) if isinstance(metadata, dict) else metadata
             results.append(result)
 
         return results
 
+    def get_sensor_data_np(self, sensor_id: str = None,
+                           sensor_type: str = None,
+                           hours_back: int = 24,
+                           chunk_size: int = 10000) -> Dict[str, np.ndarray]:
+        """
+        Holt Sensordaten der letzten X Stunden spaltenweise als NumPy-Arrays
+
+        Für ML-Training und Auswertungen über viele Zeilen: keine Dicts und kein
+        metadata-JSON pro Zeile, gelesen wird in Blöcken von chunk_size Zeilen.
+        Zeilen in derselben Reihenfolge wie get_sensor_data (neueste zuerst).
+
+        Returns:
+            Dict mit 'timestamp' (datetime64[s]), 'sensor_id', 'sensor_type',
+            'unit' (object) und 'value' (float64, NULL -> NaN)
+        """
+        conn = self._get_reader_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = None
+
+        start_time = datetime.now() - timedelta(hours=hours_back)
+
+        query = """
+            SELECT CAST(strftime('%s', timestamp) AS INTEGER), sensor_id, sensor_type, value, unit
+            FROM sensor_data
+            WHERE timestamp >= ?
+        """
+        params = [start_time]
+
+        if sensor_id:
+            query += " AND sensor_id = ?"
+            params.append(sensor_id)
+
+        if sensor_type:
+            query += " AND sensor_type = ?"
+            params.append(sensor_type)
+
+        query += " ORDER BY timestamp DESC"
+
+        cursor.execute(query, params)
+        columns = self._fetch_columns(cursor, {
+            'timestamp': np.int64,
+            'sensor_id': object,
+            'sensor_type': object,
+            'value': np.float64,
+            'unit': object,
+        }, chunk_size=chunk_size)
+        columns['timestamp'] = columns['timestamp'].astype('datetime64[s]')
+        return columns
+
     def get_sensor_data_aggregated(self, sensor_type: str,
                                    hours_back: int = 24,
                                    interval_minutes: int = 60) -> List[Dict]:
@@ -626,45 +1273,84 @@ class Database:
         Holt aggregierte Sensordaten (Durchschnitt pro Intervall)
         Nützlich für Graphen
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        cursor = self._get_reader_connection().cursor()
+        cursor.row_factory = None
+        self._execute_sensor_aggregation(cursor, sensor_type, hours_back, interval_minutes,
+                                         interval_as_epoch=False)
+        return self._rows_as_dicts(cursor)
+
+    def get_sensor_data_aggregated_np(self, sensor_type: str,
+                                      hours_back: int = 24,
+                                      interval_minutes: int = 60) -> Dict[str, np.ndarray]:
+        """
+        Wie get_sensor_data_aggregated, aber spaltenweise als NumPy-Arrays
 
+        Returns:
+            Dict mit 'interval_time' (datetime64[s]), 'avg_value', 'min_value',
+            'max_value' (float64) und 'sample_count' (int64)
+        """
+        cursor = self._get_reader_connection().cursor()
+        self._execute_sensor_aggregation(cursor, sensor_type, hours_back, interval_minutes,
+                                         interval_as_epoch=True)
+        columns = self._fetch_columns(cursor, {
+            'interval_time': np.int64,
+            'avg_value': np.float64,
+            'min_value': np.float64,
+            'max_value': np.float64,
+            'sample_count': np.int64,
+        })
+        columns['interval_time'] = columns['interval_time'].astype('datetime64[s]')
+        return columns
+
+    @staticmethod
+    def _execute_sensor_aggregation(cursor: sqlite3.Cursor, sensor_type: str, hours_back: int,
+                                    interval_minutes: int, interval_as_epoch: bool):
+        """Führt die Intervall-Aggregation für get_sensor_data_aggregated(_np) aus"""
         start_time = datetime.now() - timedelta(hours=hours_back)
+        interval_seconds = interval_minutes * 60
 
-        # SQLite nutzt strftime für Gruppierung
-        query = """
+        # Intervall-Beginn per Epoch-Sekunden (beliebige Intervall-Längen), als Text
+        # im bisherigen Format 'YYYY-MM-DD HH:MM:SS' oder direkt als Zahl
+        interval_column = 'bucket' if interval_as_epoch else "datetime(bucket, 'unixepoch')"
+        cursor.execute(f"""
             SELECT
-                strftime('%Y-%m-%d %H:00:00', timestamp) as interval_time,
+                {interval_column} as interval_time,
                 AVG(value) as avg_value,
                 MIN(value) as min_value,
                 MAX(value) as max_value,
                 COUNT(*) as sample_count
-            FROM sensor_data
-            WHERE timestamp >= ? AND sensor_type = ?
-            GROUP BY interval_time
-            ORDER BY interval_time ASC
-        """
-
-        cursor.execute(query, (start_time, sensor_type))
-
-        return [dict(row) for row in cursor.fetchall()]
+            FROM (
+                SELECT CAST(strftime('%s', timestamp) AS INTEGER) / ?1 * ?1 as bucket, value
+                FROM sensor_data
+                WHERE timestamp >= ?2 AND sensor_type = ?3
+            )
+            GROUP BY bucket
+            ORDER BY bucket ASC
+        """, (interval_seconds, start_time, sensor_type))
 
     def get_training_data(self, hours_back: int = 168) -> Dict[str, List[Dict]]:
         """
         Holt Trainingsdaten für ML-Modelle
         Standard: 168 Stunden = 1 Woche
         """
-        sensor_data = self.get_sensor_data(hours_back=hours_back)
+        conn = self._get_reader_connection()
+        cursor = conn.cursor()
+
+        start_time = datetime.now() - timedelta(hours=hours_back)
 
-        # Gruppiere nach Sensor-Typ
-        grouped_data = {}
-        for record in sensor_data:
-            sensor_type = record['sensor_type']
-            if sensor_type not in grouped_data:
-                grouped_data[sensor_type] = []
-            grouped_data[sensor_type].append(record)
+        # SQLite liefert die Zeilen bereits nach Sensor-Typ sortiert (innerhalb eines
+        # Typs wie get_sensor_data neueste zuerst), groupby fasst sie in einem Durchlauf zusammen
+        cursor.execute("""
+            SELECT * FROM sensor_data
+            WHERE timestamp >= ?
+            ORDER BY sensor_type, timestamp DESC
+        """, (start_time,))
 
-        return grouped_data
+        records = self._sensor_rows_as_dicts(cursor.fetchall())
+        return {
+            sensor_type: list(group)
+            for sensor_type, group in groupby(records, key=itemgetter('sensor_type'))
+        }
 
     def insert_training_history(self, model_name: str, model_type: str,
                                metrics: Dict, model_path: str):
@@ -686,6 +1372,45 @@ class Database:
 
         conn.commit()
 
+    def _delete_older_than(self, table: str, timestamp_col: str, cutoff: datetime,
+                           batch_size: int = RETENTION_DELETE_BATCH_SIZE) -> int:
+        """
+        Löscht Zeilen mit timestamp_col < cutoff in Batches von batch_size Zeilen
+
+        Jeder Batch ist eine eigene kurze Transaktion über den Zeitstempel-Index,
+        damit parallele Schreiber (Sensor-Collector, Fenster-Polling) nicht für die
+        Dauer einer großen Retention-Löschung blockiert werden.
+
+        Args:
+            table: Tabellenname (nur interne Konstanten, wird nicht escaped)
+            timestamp_col: Zeitstempel-Spalte
+            cutoff: Ältere Zeilen werden gelöscht
+            batch_size: Zeilen pro Transaktion
+
+        Returns:
+            Anzahl gelöschter Zeilen
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        query = f"""
+            DELETE FROM {table}
+            WHERE rowid IN (
+                SELECT rowid FROM {table}
+                WHERE {timestamp_col} < ?
+                LIMIT ?
+            )
+        """
+
+        deleted = 0
+        while True:
+            cursor.execute(query, (cutoff, batch_size))
+            batch_deleted = cursor.rowcount
+            conn.commit()
+            deleted += batch_deleted
+            if batch_deleted < batch_size:
+                return deleted
+
     def cleanup_old_data(self, retention_days: int = 90):
         """Löscht alte Daten basierend auf Retention-Policy
 
@@ -701,50 +1426,69 @@ class Database:
         cutoff_date = datetime.now() - timedelta(days=retention_days)
         deleted_counts = {}
 
-        # Alte Sensor-Daten löschen
-        cursor.execute("DELETE FROM sensor_data WHERE timestamp < ?", (cutoff_date,))
-        deleted_counts['sensor_data'] = cursor.rowcount
-
-        # Alte externe Daten löschen
-        cursor.execute("DELETE FROM external_data WHERE timestamp < ?", (cutoff_date,))
-        deleted_counts['external_data'] = cursor.rowcount
-
-        # Alte Entscheidungen löschen
-        cursor.execute("DELETE FROM decisions WHERE timestamp < ?", (cutoff_date,))
-        deleted_counts['decisions'] = cursor.rowcount
-
-        # Alte Badezimmer-Events löschen (behalte mehr Daten für Muster-Erkennung)
-        bathroom_retention = max(retention_days, 180)  # Mind. 6 Monate
-        bathroom_cutoff = datetime.now() - timedelta(days=bathroom_retention)
-        cursor.execute("DELETE FROM bathroom_events WHERE start_time < ?", (bathroom_cutoff,))
-        deleted_counts['bathroom_events'] = cursor.rowcount
-
-        # Alte Badezimmer-Messungen löschen (nur behalten wenn Event noch existiert)
-        cursor.execute("""
-            DELETE FROM bathroom_measurements
-            WHERE event_id NOT IN (SELECT id FROM bathroom_events)
-        """)
-        deleted_counts['bathroom_measurements'] = cursor.rowcount
+        # Große Zeitreihen-Tabellen zuerst löschen (in Batches, eigene Commits).
+        # Migrations-Tabellen fehlen bei :memory: oder nach fehlgeschlagener Migration.
+        batched_tables = {
+            'sensor_data': 'timestamp',
+            'heating_observations': 'timestamp',
+            'window_observations': 'timestamp',
+            'window_open_sessions': 'opened_at',
+        }
+        existing = self._existing_tables(cursor, list(batched_tables))
+        for table, timestamp_col in batched_tables.items():
+            if table in existing:
+                deleted_counts[table] = self._delete_older_than(table, timestamp_col, cutoff_date)
 
-        # Alte Badezimmer-Aktionen löschen
-        cursor.execute("DELETE FROM bathroom_device_actions WHERE timestamp < ?", (bathroom_cutoff,))
-        deleted_counts['bathroom_device_actions'] = cursor.rowcount
+        # Übrige Tabellen in einer Schreib-Transaktion (ein Lock, ein Commit)
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
 
-        # Alte kontinuierliche Badezimmer-Messungen löschen (normale Retention)
-        cursor.execute("DELETE FROM bathroom_continuous_measurements WHERE timestamp < ?", (cutoff_date,))
-        deleted_counts['bathroom_continuous_measurements'] = cursor.rowcount
+            # Alte externe Daten löschen
+            cursor.execute("DELETE FROM external_data WHERE timestamp < ?", (cutoff_date,))
+            deleted_counts['external_data'] = cursor.rowcount
 
-        # Alte Heizungs-Beobachtungen löschen
-        cursor.execute("DELETE FROM heating_observations WHERE timestamp < ?", (cutoff_date,))
-        deleted_counts['heating_observations'] = cursor.rowcount
+            # Alte Entscheidungen löschen
+            cursor.execute("DELETE FROM decisions WHERE timestamp < ?", (cutoff_date,))
+            deleted_counts['decisions'] = cursor.rowcount
 
-        # Alte Heizungs-Insights löschen (nur die ältesten, behalte mind. 30 Tage)
-        insights_retention = max(retention_days, 30)
-        insights_cutoff = datetime.now() - timedelta(days=insights_retention)
-        cursor.execute("DELETE FROM heating_insights WHERE timestamp < ?", (insights_cutoff,))
-        deleted_counts['heating_insights'] = cursor.rowcount
+            # Alte Badezimmer-Events löschen (behalte mehr Daten für Muster-Erkennung)
+            bathroom_retention = max(retention_days, 180)  # Mind. 6 Monate
+            bathroom_cutoff = datetime.now() - timedelta(days=bathroom_retention)
+            cursor.execute("DELETE FROM bathroom_events WHERE start_time < ?", (bathroom_cutoff,))
+            deleted_counts['bathroom_events'] = cursor.rowcount
 
-        conn.commit()
+            # Alte Badezimmer-Messungen löschen (nur behalten wenn Event noch existiert);
+            # NOT EXISTS prüft pro Messung per Primärschlüssel
+            cursor.execute("""
+                DELETE FROM bathroom_measurements
+                WHERE event_id IS NOT NULL
+                    AND NOT EXISTS (
+                        SELECT 1 FROM bathroom_events be
+                        WHERE be.id = bathroom_measurements.event_id
+                    )
+            """)
+            deleted_counts['bathroom_measurements'] = cursor.rowcount
+
+            # Alte Badezimmer-Aktionen löschen
+            cursor.execute("DELETE FROM bathroom_device_actions WHERE timestamp < ?", (bathroom_cutoff,))
+            deleted_counts['bathroom_device_actions'] = cursor.rowcount
+
+            # Alte kontinuierliche Badezimmer-Messungen löschen (normale Retention)
+            cursor.execute("DELETE FROM bathroom_continuous_measurements WHERE timestamp < ?", (cutoff_date,))
+            deleted_counts['bathroom_continuous_measurements'] = cursor.rowcount
+
+            # Alte Heizungs-Insights löschen (nur die ältesten, behalte mind. 30 Tage)
+            insights_retention = max(retention_days, 30)
+            insights_cutoff = datetime.now() - timedelta(days=insights_retention)
+            cursor.execute("DELETE FROM heating_insights WHERE timestamp < ?", (insights_cutoff,))
+            deleted_counts['heating_insights'] = cursor.rowcount
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        self._clear_statistics_cache()
 
         total_deleted = sum(deleted_counts.values())
         logger.info(f"Cleaned up {total_deleted} rows older than {retention_days} days: {deleted_counts}")
@@ -826,6 +1570,40 @@ class Database:
         conn.isolation_level = ''
         logger.info("Database VACUUM completed")
 
+    def reclaim_free_pages(self, max_pages: int = INCREMENTAL_VACUUM_MAX_PAGES) -> int:
+        """
+        Gibt nach Löschungen freie Seiten an das Dateisystem zurück
+
+        Mit auto_vacuum = INCREMENTAL werden nur die freien Seiten ans Dateiende
+        verschoben und abgeschnitten, statt wie bei VACUUM die gesamte Datenbank neu
+        zu schreiben. Bestehende Datenbanken werden einmalig per VACUUM umgestellt.
+        Danach wird das WAL per Checkpoint auf 0 Bytes gekürzt.
+
+        Args:
+            max_pages: Höchstens so viele Seiten in diesem Aufruf freigeben
+
+        Returns:
+            Anzahl freigegebener Seiten
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        free_pages = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            # executescript führt das PRAGMA bis zum Ende aus (execute gibt nur eine Seite frei)
+            cursor.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+            free_pages = min(free_pages, max_pages)
+        else:
+            logger.info("Converting database to incremental auto_vacuum (one-time VACUUM)")
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.vacuum_database()
+
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+        logger.info(f"Reclaimed {free_pages} free database pages")
+        return free_pages
+
     def get_database_size(self) -> Dict[str, Any]:
         """Gibt Informationen über die Datenbankgröße zurück
 
@@ -838,9 +1616,6 @@ class Database:
         file_size_bytes = os.path.getsize(self.db_path)
         file_size_mb = file_size_bytes / (1024 * 1024)
 
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
         # Zähle Zeilen in jeder Tabelle
         tables = [
             'sensor_data',
@@ -857,17 +1632,10 @@ class Database:
             'heating_schedules'
         ]
 
-        table_counts = {}
-        for table in tables:
-            try:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
-                table_counts[table] = count
-            except sqlite3.OperationalError:
-                # Tabelle existiert nicht
-                table_counts[table] = 0
+        table_counts = self.get_table_counts(tables)
 
         # Ältester und neuester Eintrag
+        cursor = self._get_reader_connection().cursor()
         cursor.execute("""
             SELECT MIN(timestamp), MAX(timestamp)
             FROM sensor_data
@@ -894,7 +1662,7 @@ class Database:
 
         now = datetime.now()
 
-        cursor.execute("""
+        event_id = self._insert_returning_id(cursor, """
             INSERT INTO bathroom_events
             (start_time, start_humidity, avg_temperature, motion_detected,
              door_closed, day_of_week, hour_of_day, event_type)
@@ -908,9 +1676,9 @@ class Database:
             now.weekday(),  # 0=Monday, 6=Sunday
             now.hour
         ))
-
         conn.commit()
-        return cursor.lastrowid
+        self._clear_statistics_cache()
+        return event_id
 
     def end_bathroom_event(self, event_id: int, humidity: float,
                           dehumidifier_runtime: float = None):
@@ -918,51 +1686,66 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        # Hole Event-Daten
-        cursor.execute("SELECT * FROM bathroom_events WHERE id = ?", (event_id,))
-        event = cursor.fetchone()
-
-        if not event:
-            logger.warning(f"Event {event_id} nicht gefunden")
-            return
-
-        start_time = datetime.fromisoformat(event['start_time'])
-        end_time = datetime.now()
-        duration_minutes = (end_time - start_time).seconds / 60
+        params = {
+            'end_time': datetime.now(),
+            'end_humidity': humidity,
+            'dehumidifier_runtime': dehumidifier_runtime,
+            'event_id': event_id
+        }
 
-        # Hole Messungen für dieses Event
-        cursor.execute("""
-            SELECT AVG(humidity) as avg_hum, MAX(humidity) as peak_hum
-            FROM bathroom_measurements
-            WHERE event_id = ?
-        """, (event_id,))
+        # Dauer sowie Durchschnitts-/Spitzenfeuchte werden direkt in SQLite berechnet
+        # (ohne Messungen fällt der Wert auf start_humidity zurück)
+        if SQLITE_HAS_RETURNING:
+            # Ein Statement: UPDATE ... FROM liest die Messungen des Events nur
+            # einmal für AVG und MAX
+            cursor.execute("""
+                UPDATE bathroom_events
+                SET end_time = :end_time,
+                    duration_minutes = (strftime('%s', :end_time) - strftime('%s', start_time)) / 60.0,
+                    end_humidity = :end_humidity,
+                    avg_humidity = COALESCE(m.avg_humidity, start_humidity),
+                    peak_humidity = COALESCE(m.peak_humidity, start_humidity),
+                    dehumidifier_runtime_minutes = :dehumidifier_runtime
+                FROM (
+                    SELECT AVG(humidity) as avg_humidity, MAX(humidity) as peak_humidity
+                    FROM bathroom_measurements
+                    WHERE event_id = :event_id
+                ) as m
+                WHERE id = :event_id
+                RETURNING duration_minutes, peak_humidity
+            """, params)
+            result = cursor.fetchone()
+        else:
+            # Ältere SQLite-Versionen: korrelierte Unterabfragen, Ergebnis separat lesen
+            cursor.execute("""
+                UPDATE bathroom_events
+                SET end_time = :end_time,
+                    duration_minutes = (strftime('%s', :end_time) - strftime('%s', start_time)) / 60.0,
+                    end_humidity = :end_humidity,
+                    avg_humidity = COALESCE((
+                        SELECT AVG(humidity) FROM bathroom_measurements WHERE event_id = :event_id
+                    ), start_humidity),
+                    peak_humidity = COALESCE((
+                        SELECT MAX(humidity) FROM bathroom_measurements WHERE event_id = :event_id
+                    ), start_humidity),
+                    dehumidifier_runtime_minutes = :dehumidifier_runtime
+                WHERE id = :event_id
+            """, params)
+            cursor.execute(
+                "SELECT duration_minutes, peak_humidity FROM bathroom_events WHERE id = ?",
+                (event_id,)
+            )
+            result = cursor.fetchone()
 
-        stats = cursor.fetchone()
-        avg_humidity = stats['avg_hum'] if stats['avg_hum'] else event['start_humidity']
-        peak_humidity = stats['peak_hum'] if stats['peak_hum'] else event['start_humidity']
+        conn.commit()
+        self._clear_statistics_cache()
 
-        # Update Event
-        cursor.execute("""
-            UPDATE bathroom_events
-            SET end_time = ?,
-                duration_minutes = ?,
-                end_humidity = ?,
-                avg_humidity = ?,
-                peak_humidity = ?,
-                dehumidifier_runtime_minutes = ?
-            WHERE id = ?
-        """, (
-            end_time,
-            duration_minutes,
-            humidity,
-            avg_humidity,
-            peak_humidity,
-            dehumidifier_runtime,
-            event_id
-        ))
+        if not result:
+            logger.warning(f"Event {event_id} nicht gefunden")
+            return
 
-        conn.commit()
-        logger.info(f"Event {event_id} beendet: {duration_minutes:.1f} Min, Peak: {peak_humidity:.1f}%")
+        logger.info(f"Event {event_id} beendet: {result['duration_minutes']:.1f} Min, "
+                    f"Peak: {result['peak_humidity']:.1f}%")
 
     def add_bathroom_measurement(self, event_id: int, humidity: float,
                                 temperature: float, motion: bool,
@@ -1053,13 +1836,55 @@ class Database:
         ))
 
         conn.commit()
+        self._clear_learned_cache()
         logger.info(f"Learned parameter: {parameter_name}={value:.2f} (confidence: {confidence:.2f})")
 
-    def get_learned_parameter(self, parameter_name: str,
-                             min_confidence: float = 0.7) -> Optional[float]:
-        """Holt den neuesten gelernten Parameter-Wert"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    def _get_cached_learned(self, key: tuple):
+        """Liefert (True, Ergebnis) für einen gültigen Cache-Eintrag, sonst (False, None)"""
+        with self._learned_cache_lock:
+            entry = self._learned_cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return True, entry[1]
+        return False, None
+
+    def _set_cached_learned(self, key: tuple, value):
+        with self._learned_cache_lock:
+            self._learned_cache[key] = (time.monotonic() + LEARNED_PARAMETER_CACHE_TTL, value)
+
+    def _clear_learned_cache(self):
+        with self._learned_cache_lock:
+            self._learned_cache.clear()
+
+    def _cached_statistics(self, key: tuple, ttl: float, compute):
+        """
+        Liefert das Ergebnis von compute() aus dem Statistik-Cache (bis zu ttl Sekunden alt)
+
+        Gibt immer eine Kopie zurück, damit Aufrufer den Cache-Eintrag nicht verändern.
+        """
+        with self._statistics_cache_lock:
+            entry = self._statistics_cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return copy.deepcopy(entry[1])
+
+        value = compute()
+        with self._statistics_cache_lock:
+            self._statistics_cache[key] = (time.monotonic() + ttl, value)
+        return copy.deepcopy(value)
+
+    def _clear_statistics_cache(self):
+        with self._statistics_cache_lock:
+            self._statistics_cache.clear()
+
+    def get_learned_parameter(self, parameter_name: str,
+                             min_confidence: float = 0.7) -> Optional[float]:
+        """Holt den neuesten gelernten Parameter-Wert (gecacht, siehe LEARNED_PARAMETER_CACHE_TTL)"""
+        key = ('value', parameter_name, min_confidence)
+        hit, value = self._get_cached_learned(key)
+        if hit:
+            return value
+
+        conn = self._get_reader_connection()
+        cursor = conn.cursor()
 
         cursor.execute("""
             SELECT parameter_value, confidence
@@ -1070,12 +1895,19 @@ class Database:
         """, (parameter_name, min_confidence))
 
         result = cursor.fetchone()
-        return result['parameter_value'] if result else None
+        value = result['parameter_value'] if result else None
+        self._set_cached_learned(key, value)
+        return value
 
     def get_learned_parameter_details(self, parameter_name: str,
                                       min_confidence: float = 0.7) -> Optional[Dict]:
         """Holt Details des neuesten gelernten Parameters (inkl. Confidence, Samples)"""
-        conn = self._get_connection()
+        key = ('details', parameter_name, min_confidence)
+        hit, details = self._get_cached_learned(key)
+        if hit:
+            return dict(details) if details else None
+
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -1087,15 +1919,17 @@ class Database:
         """, (parameter_name, min_confidence))
 
         result = cursor.fetchone()
+        details = None
         if result:
-            return {
+            details = {
                 'value': result['parameter_value'],
                 'confidence': result['confidence'],
                 'samples_used': result['samples_used'],
                 'timestamp': result['timestamp'],
                 'reason': result['reason']
             }
-        return None
+        self._set_cached_learned(key, details)
+        return dict(details) if details else None
 
     def reset_learned_parameters(self) -> int:
         """Löscht alle gelernten Parameter (Reset auf manuelle Werte)"""
@@ -1106,68 +1940,172 @@ class Database:
         deleted_count = cursor.rowcount
 
         conn.commit()
+        self._clear_learned_cache()
         logger.info(f"Reset learned parameters: {deleted_count} entries deleted")
         return deleted_count
 
     def get_bathroom_events(self, days_back: int = 30, limit: int = None) -> List[Dict]:
         """Holt Badezimmer-Events der letzten X Tage"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         start_time = datetime.now() - timedelta(days=days_back)
 
-        query = """
+        # LIMIT immer gebunden (-1 = unbegrenzt), damit der SQL-Text konstant bleibt
+        # und das vorbereitete Statement aus dem Cache wiederverwendet wird
+        cursor.execute("""
             SELECT * FROM bathroom_events
             WHERE start_time >= ?
             ORDER BY start_time DESC
+            LIMIT ?
+        """, (start_time, limit if limit else -1))
+
+        return self._rows_as_dicts(cursor)
+
+    def get_sensor_data_timeseries(self, sensor_id: str, hours_back: int = 6,
+                                   downsample_seconds: int = None, limit: int = None) -> List[Dict]:
+        """Holt Zeitreihen-Daten für einen Sensor
+
+        Args:
+            sensor_id: Sensor-ID
+            hours_back: Zeitraum in Stunden
+            downsample_seconds: Mittelwert pro Intervall dieser Länge statt Einzelwerten
+            limit: Nur die neuesten limit Punkte (weiterhin aufsteigend sortiert)
+        """
+        conn = self._get_reader_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = None
+
+        start_time = datetime.now() - timedelta(hours=hours_back)
+
+        cursor.execute(self._timeseries_query("""
+            SELECT timestamp, value, unit
+            FROM sensor_data
+            WHERE sensor_id = :sensor_id AND timestamp >= :start_time
+        """, downsample_seconds, limit), {
+            'sensor_id': sensor_id,
+            'start_time': start_time,
+            'bucket_seconds': downsample_seconds,
+            'limit': limit
+        })
+
+        return self._rows_as_dicts(cursor)
+
+    @staticmethod
+    def _timeseries_query(query: str, downsample_seconds: int = None, limit: int = None) -> str:
         """
+        Ergänzt eine Zeitreihen-Query (Spalten timestamp, value, unit) um Sortierung,
+        optionales Downsampling (:bucket_seconds) und optionales Limit (:limit)
+
+        Ohne Limit wird aufsteigend über den Zeitstempel-Index gelesen; mit Limit
+        absteigend bis zum Limit und nur diese Zeilen werden umsortiert.
+        """
+        if downsample_seconds:
+            # Intervall-Beginn per Epoch-Sekunden wie in _execute_sensor_aggregation
+            query = f"""
+                SELECT datetime(bucket, 'unixepoch') as timestamp, AVG(value) as value, MAX(unit) as unit
+                FROM (
+                    SELECT CAST(strftime('%s', timestamp) AS INTEGER)
+                               / :bucket_seconds * :bucket_seconds as bucket,
+                           value, unit
+                    FROM ({query})
+                )
+                GROUP BY bucket
+            """
 
         if limit:
-            query += f" LIMIT {limit}"
+            return f"SELECT * FROM ({query} ORDER BY timestamp DESC LIMIT :limit) ORDER BY timestamp ASC"
+        return query + " ORDER BY timestamp ASC"
 
-        cursor.execute(query, (start_time,))
+    def get_sensor_data_timeseries_np(self, sensor_id: str, hours_back: int = 6,
+                                      chunk_size: int = 1000) -> Dict[str, Any]:
+        """Holt Zeitreihen-Daten für einen Sensor spaltenweise als NumPy-Arrays
 
-        return [dict(row) for row in cursor.fetchall()]
+        Für Auswertungen/Plots, die ohnehin vektorisiert weiterrechnen - spart
+        die Dict-pro-Zeile-Allokation von get_sensor_data_timeseries().
 
-    def get_sensor_data_timeseries(self, sensor_id: str, hours_back: int = 6) -> List[Dict]:
-        """Holt Zeitreihen-Daten für einen Sensor"""
-        conn = self._get_connection()
+        Returns:
+            Dict mit 'timestamp' (datetime64[s]), 'value' (float64, NULL -> NaN)
+            und 'unit' (Einheit der Messreihe oder None)
+        """
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         start_time = datetime.now() - timedelta(hours=hours_back)
 
         cursor.execute("""
-            SELECT timestamp, value, unit
+            SELECT CAST(strftime('%s', timestamp) AS INTEGER), value, unit
             FROM sensor_data
             WHERE sensor_id = ? AND timestamp >= ?
             ORDER BY timestamp ASC
         """, (sensor_id, start_time))
 
-        return [dict(row) for row in cursor.fetchall()]
-
-    def get_bathroom_humidity_timeseries(self, hours_back: int = 6) -> List[Dict]:
+        columns = self._fetch_columns(cursor, {
+            'timestamp': np.int64,
+            'value': np.float64,
+            'unit': object,
+        }, chunk_size=chunk_size)
+        columns['timestamp'] = columns['timestamp'].astype('datetime64[s]')
+        # Einheit der Messreihe: letzte gesetzte Einheit
+        columns['unit'] = next((unit for unit in columns['unit'][::-1] if unit), None)
+        return columns
+
+    def get_bathroom_humidity_timeseries(self, hours_back: int = 6, downsample_seconds: int = None,
+                                         limit: int = None) -> List[Dict]:
         """Holt kontinuierliche Luftfeuchtigkeitsdaten aus bathroom_continuous_measurements
 
         Diese Methode ist speziell für die Live-Anzeige von Badezimmer-Luftfeuchtigkeit gedacht
         und nutzt die kontinuierlichen Messungen (alle 60s), nicht die sensor_data Tabelle.
+        downsample_seconds/limit wie bei get_sensor_data_timeseries().
         """
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         start_time = datetime.now() - timedelta(hours=hours_back)
 
-        cursor.execute("""
+        cursor.execute(self._timeseries_query("""
             SELECT
                 timestamp,
                 humidity as value,
                 '%' as unit
             FROM bathroom_continuous_measurements
+            WHERE timestamp >= :start_time
+              AND humidity IS NOT NULL
+        """, downsample_seconds, limit), {
+            'start_time': start_time,
+            'bucket_seconds': downsample_seconds,
+            'limit': limit
+        })
+
+        return self._rows_as_dicts(cursor)
+
+    def get_bathroom_humidity_timeseries_np(self, hours_back: int = 6) -> Dict[str, np.ndarray]:
+        """Wie get_bathroom_humidity_timeseries(), aber spaltenweise als NumPy-Arrays
+
+        Returns:
+            Dict mit 'timestamp' (datetime64[s]) und 'humidity' (float64)
+        """
+        conn = self._get_reader_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = None
+
+        start_time = datetime.now() - timedelta(hours=hours_back)
+
+        # Nur Spalten aus idx_bathroom_continuous_humidity (Migration 011)
+        cursor.execute("""
+            SELECT CAST(strftime('%s', timestamp) AS INTEGER), humidity
+            FROM bathroom_continuous_measurements
             WHERE timestamp >= ?
               AND humidity IS NOT NULL
             ORDER BY timestamp ASC
         """, (start_time,))
 
-        return [dict(row) for row in cursor.fetchall()]
+        columns = self._fetch_columns(cursor, {'timestamp': np.int64, 'humidity': np.float64})
+        columns['timestamp'] = columns['timestamp'].astype('datetime64[s]')
+        return columns
 
     def create_manual_bathroom_event(self, start_time: datetime, end_time: datetime,
                                      peak_humidity: float, notes: str = None) -> int:
@@ -1175,78 +2113,158 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        duration_minutes = (end_time - start_time).total_seconds() / 60
-
-        cursor.execute("""
+        # Dauer wird von SQLite aus start_time/end_time berechnet
+        event_id = self._insert_returning_id(cursor, """
             INSERT INTO bathroom_events
             (start_time, end_time, duration_minutes, peak_humidity,
              start_humidity, avg_humidity, day_of_week, hour_of_day, event_type)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'manual')
-        """, (
-            start_time,
-            end_time,
-            duration_minutes,
-            peak_humidity,
-            peak_humidity - 10,  # Schätzung
-            peak_humidity - 5,   # Schätzung
-            start_time.weekday(),
-            start_time.hour,
-        ))
+            VALUES (:start_time, :end_time,
+                    (strftime('%s', :end_time) - strftime('%s', :start_time)) / 60.0,
+                    :peak_humidity, :start_humidity, :avg_humidity,
+                    :day_of_week, :hour_of_day, 'manual')
+        """, {
+            'start_time': start_time,
+            'end_time': end_time,
+            'peak_humidity': peak_humidity,
+            'start_humidity': peak_humidity - 10,  # Schätzung
+            'avg_humidity': peak_humidity - 5,     # Schätzung
+            'day_of_week': start_time.weekday(),
+            'hour_of_day': start_time.hour
+        })
 
         conn.commit()
-        event_id = cursor.lastrowid
+        self._clear_statistics_cache()
         logger.info(f"Manual bathroom event created: {event_id} at {start_time}")
         return event_id
 
-    def get_bathroom_statistics(self, days_back: int = 30) -> Dict:
-        """Berechnet Statistiken für Badezimmer-Automatisierung"""
+    def create_manual_bathroom_events_bulk(self, events: List[Dict]) -> List[int]:
+        """
+        Erstellt mehrere manuelle Badezimmer-Events in einem Statement
+
+        Die Events werden einmalig als JSON gebunden und von SQLite per json_each
+        expandiert (ein execute, eine Transaktion). Schätzwerte wie bei
+        create_manual_bathroom_event.
+
+        Args:
+            events: Liste von Dicts mit 'start_time', 'end_time' (datetime) und 'peak_humidity'
+
+        Returns:
+            IDs der erstellten Events
+        """
+        if not events:
+            return []
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        start_time = datetime.now() - timedelta(days=days_back)
+        payload = json.dumps([
+            {
+                # Gleiches Textformat wie der sqlite3-Adapter für datetime
+                'start': event['start_time'].isoformat(' '),
+                'end': event['end_time'].isoformat(' '),
+                'peak': event['peak_humidity']
+            }
+            for event in events
+        ])
 
-        # Event-Statistiken (nur gültige Events mit sinnvollen Werten)
-        cursor.execute("""
+        # strftime('%w'): 0=Sonntag -> auf Python weekday() (0=Montag) umrechnen
+        query = """
+            INSERT INTO bathroom_events
+            (start_time, end_time, duration_minutes, peak_humidity,
+             start_humidity, avg_humidity, day_of_week, hour_of_day, event_type)
             SELECT
-                COUNT(*) as event_count,
-                AVG(duration_minutes) as avg_duration,
-                AVG(peak_humidity) as avg_peak_humidity,
-                AVG(dehumidifier_runtime_minutes) as avg_dehumidifier_runtime
-            FROM bathroom_events
-            WHERE start_time >= ? 
-                AND end_time IS NOT NULL
-                AND duration_minutes > 0
-                AND (peak_humidity IS NULL OR peak_humidity >= 0)
-        """, (start_time,))
+                json_extract(value, '$.start'),
+                json_extract(value, '$.end'),
+                (strftime('%s', json_extract(value, '$.end'))
+                    - strftime('%s', json_extract(value, '$.start'))) / 60.0,
+                json_extract(value, '$.peak'),
+                json_extract(value, '$.peak') - 10,
+                json_extract(value, '$.peak') - 5,
+                (CAST(strftime('%w', json_extract(value, '$.start')) AS INTEGER) + 6) % 7,
+                CAST(strftime('%H', json_extract(value, '$.start')) AS INTEGER),
+                'manual'
+            FROM json_each(?)
+            ORDER BY key
+        """
+        if SQLITE_HAS_RETURNING:
+            cursor.execute(query + "RETURNING id", (payload,))
+            event_ids = [row[0] for row in cursor.fetchall()]
+        else:
+            # Ein INSERT ... SELECT vergibt fortlaufende ids (Schreibsperre für das
+            # ganze Statement), lastrowid ist die id der letzten Zeile
+            cursor.execute(query, (payload,))
+            event_ids = list(range(cursor.lastrowid - cursor.rowcount + 1, cursor.lastrowid + 1))
+        conn.commit()
+        self._clear_statistics_cache()
+        logger.info(f"Manual bathroom events created: {len(event_ids)}")
+        return event_ids
 
-        event_stats = dict(cursor.fetchone())
+    def get_bathroom_statistics(self, days_back: int = 30) -> Dict:
+        """Berechnet Statistiken für Badezimmer-Automatisierung (gecacht, siehe BATHROOM_STATISTICS_CACHE_TTL)"""
+        return self._cached_statistics(
+            ('bathroom_statistics', days_back), BATHROOM_STATISTICS_CACHE_TTL,
+            lambda: self._query_bathroom_statistics(days_back)
+        )
 
-        # Häufigste Duschzeiten (nach Stunde)
-        cursor.execute("""
-            SELECT
-                hour_of_day,
-                COUNT(*) as count
-            FROM bathroom_events
-            WHERE start_time >= ?
-            GROUP BY hour_of_day
-            ORDER BY count DESC
-            LIMIT 5
-        """, (start_time,))
+    def _query_bathroom_statistics(self, days_back: int) -> Dict:
+        conn = self._get_reader_connection()
+        cursor = conn.cursor()
 
-        peak_hours = [dict(row) for row in cursor.fetchall()]
+        start_time = datetime.now() - timedelta(days=days_back)
 
-        # Wochentags-Verteilung
+        # Alle drei Auswertungen in einem Round-Trip über denselben Zeitraum-Scan:
+        # - Event-Statistiken (nur gültige Events mit sinnvollen Werten)
+        # - Häufigste Duschzeiten (nach Stunde)
+        # - Wochentags-Verteilung
         cursor.execute("""
+            WITH filtered AS (
+                SELECT start_time, end_time, duration_minutes, peak_humidity,
+                       dehumidifier_runtime_minutes, hour_of_day, day_of_week
+                FROM bathroom_events
+                WHERE start_time >= ?
+            ),
+            stats AS (
+                SELECT
+                    COUNT(*) as event_count,
+                    AVG(duration_minutes) as avg_duration,
+                    AVG(peak_humidity) as avg_peak_humidity,
+                    AVG(dehumidifier_runtime_minutes) as avg_dehumidifier_runtime
+                FROM filtered
+                WHERE end_time IS NOT NULL
+                    AND duration_minutes > 0
+                    AND (peak_humidity IS NULL OR peak_humidity >= 0)
+            ),
+            hours AS (
+                SELECT hour_of_day, COUNT(*) as count
+                FROM filtered
+                GROUP BY hour_of_day
+                ORDER BY count DESC, hour_of_day ASC
+                LIMIT 5
+            ),
+            days AS (
+                SELECT day_of_week, COUNT(*) as count
+                FROM filtered
+                GROUP BY day_of_week
+                ORDER BY day_of_week
+            )
             SELECT
-                day_of_week,
-                COUNT(*) as count
-            FROM bathroom_events
-            WHERE start_time >= ?
-            GROUP BY day_of_week
-            ORDER BY day_of_week
+                json_object(
+                    'event_count', event_count,
+                    'avg_duration', avg_duration,
+                    'avg_peak_humidity', avg_peak_humidity,
+                    'avg_dehumidifier_runtime', avg_dehumidifier_runtime
+                ) as event_stats,
+                (SELECT json_group_array(json_object('hour_of_day', hour_of_day, 'count', count))
+                 FROM hours) as peak_hours,
+                (SELECT json_group_array(json_object('day_of_week', day_of_week, 'count', count))
+                 FROM days) as weekday_distribution
+            FROM stats
         """, (start_time,))
 
-        weekday_distribution = [dict(row) for row in cursor.fetchall()]
+        result = cursor.fetchone()
+        event_stats = json.loads(result['event_stats'])
+        peak_hours = json.loads(result['peak_hours'])
+        weekday_distribution = json.loads(result['weekday_distribution'])
 
         return {
             'event_stats': event_stats,
@@ -1267,24 +2285,33 @@ class Database:
             dehumidifier_wattage: Leistung des Luftentfeuchters in Watt (Standard: 400W)
             heater_wattage: Wird nicht verwendet (Zentralheizung nicht messbar)
             energy_price_per_kwh: Strompreis pro kWh in EUR (Standard: 0.30€)
+
+        Das Ergebnis wird gecacht (siehe BATHROOM_ENERGY_STATS_CACHE_TTL).
         """
-        conn = self._get_connection()
+        return self._cached_statistics(
+            ('bathroom_energy_stats', days_back, dehumidifier_wattage, heater_wattage, energy_price_per_kwh),
+            BATHROOM_ENERGY_STATS_CACHE_TTL,
+            lambda: self._query_bathroom_energy_stats(days_back, dehumidifier_wattage, energy_price_per_kwh)
+        )
+
+    def _query_bathroom_energy_stats(self, days_back: int, dehumidifier_wattage: float,
+                                     energy_price_per_kwh: float) -> Dict:
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         start_time = datetime.now() - timedelta(days=days_back)
 
-        # Gesamte Laufzeit des Luftentfeuchters
+        # Gesamtlaufzeit des Luftentfeuchters und Anzahl Events (aggregiert in SQLite,
+        # eine Ergebniszeile statt einer Zeile pro Event; TOTAL() ist immer float, 0.0 ohne Events)
         cursor.execute("""
             SELECT
-                SUM(dehumidifier_runtime_minutes) as total_runtime_minutes,
+                TOTAL(dehumidifier_runtime_minutes) as total_runtime_minutes,
                 COUNT(*) as event_count
             FROM bathroom_events
             WHERE start_time >= ? AND dehumidifier_runtime_minutes IS NOT NULL
         """, (start_time,))
 
-        result = cursor.fetchone()
-        total_runtime_minutes = result['total_runtime_minutes'] or 0.0
-        event_count = result['event_count'] or 0
+        total_runtime_minutes, event_count = cursor.fetchone()
 
         # Umrechnung in Stunden
         total_runtime_hours = total_runtime_minutes / 60.0
@@ -1369,36 +2396,14 @@ class Database:
             humidity: Luftfeuchtigkeit (optional)
             power_percentage: Leistung in % (optional)
 
-        Returns:
-            ID der eingefügten Zeile
+        Die Zeile wird gepuffert und mit dem nächsten flush_write_buffers()
+        geschrieben (ein executemany + ein Commit für alle Geräte eines Durchlaufs).
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        now = datetime.now()
-
-        cursor.execute("""
-            INSERT INTO heating_observations
-            (timestamp, device_id, room_name, current_temp, target_temp,
-             outdoor_temp, is_heating, humidity, power_percentage, hour_of_day, day_of_week)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            now,
-            device_id,
-            room_name,
-            current_temp,
-            target_temp,
-            outdoor_temp,
-            1 if is_heating else 0,
-            humidity,
-            power_percentage,
-            now.hour,
-            now.weekday()
+        self._buffer_insert('heating_observations', HeatingObservationRow(
+            datetime.now().isoformat(' '), device_id, room_name, current_temp, target_temp,
+            outdoor_temp, is_heating, presence, window_open, energy_level, humidity, power_percentage
         ))
 
-        conn.commit()
-        return cursor.lastrowid
-
     def add_heating_insight(self, insight_type: str, recommendation: str,
                            device_id: str = None, room_name: str = None,
                            saving_percent: float = None, saving_eur: float = None,
@@ -1412,8 +2417,8 @@ class Database:
             INSERT INTO heating_insights
             (timestamp, insight_type, device_id, room_name, recommendation,
              potential_saving_percent, potential_saving_eur, confidence,
-             samples_used, priority)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             samples_used, priority, priority_rank)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             datetime.now(),
             insight_type,
@@ -1424,7 +2429,8 @@ class Database:
             saving_eur,
             confidence,
             samples,
-            priority
+            priority,
+            HEATING_INSIGHT_PRIORITY_RANK.get(priority, 2)
         ))
 
         conn.commit()
@@ -1434,19 +2440,20 @@ class Database:
                                     min_confidence: float = 0.6,
                                     limit: int = 10) -> List[Dict]:
         """Holt die neuesten Heizungs-Insights"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         start_time = datetime.now() - timedelta(days=days_back)
 
         cursor.execute("""
             SELECT * FROM heating_insights
             WHERE timestamp >= ? AND confidence >= ?
-            ORDER BY timestamp DESC, priority DESC
+            ORDER BY timestamp DESC, priority_rank DESC
             LIMIT ?
         """, (start_time, min_confidence, limit))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows_as_dicts(cursor)
 
     def save_heating_schedule(self, device_id: str, room_name: str,
                              schedule_type: str, day_of_week: int, hour: int,
@@ -1479,8 +2486,9 @@ class Database:
     def get_heating_schedule(self, device_id: str = None,
                             min_confidence: float = 0.7) -> List[Dict]:
         """Holt den optimierten Heizplan für ein Gerät"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         if device_id:
             cursor.execute("""
@@ -1495,13 +2503,21 @@ class Database:
                 ORDER BY device_id, day_of_week, hour
             """, (min_confidence,))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows_as_dicts(cursor)
 
     def get_heating_observations(self, days_back: int = 7, device_id: str = None,
                                  room_name: str = None) -> List[Dict]:
-        """Holt Heizungsbeobachtungen für Analytics"""
-        conn = self._get_connection()
+        """Holt Heizungsbeobachtungen für Analytics (siehe iter_heating_observations)"""
+        return list(chain.from_iterable(self.iter_heating_observations(days_back, device_id, room_name)))
+
+    def iter_heating_observations(self, days_back: int = 7, device_id: str = None,
+                                  room_name: str = None,
+                                  chunk_size: int = 4096) -> Iterator[List[Dict]]:
+        """Liefert Heizungsbeobachtungen blockweise (je bis zu chunk_size Dicts), älteste zuerst"""
+        self.flush_write_buffers()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         start_time = datetime.now() - timedelta(days=days_back)
 
@@ -1517,7 +2533,10 @@ class Database:
                 humidity,
                 hour_of_day,
                 day_of_week,
-                power_percentage
+                power_percentage,
+                presence_detected,
+                window_open,
+                energy_price_level
             FROM heating_observations
             WHERE timestamp >= ?
         """
@@ -1535,61 +2554,168 @@ class Database:
         query += " ORDER BY timestamp ASC"
 
         cursor.execute(query, params)
+        yield from self._iter_dict_chunks(cursor, chunk_size)
 
-        return [dict(row) for row in cursor.fetchall()]
+    def get_heating_observations_np(self, days_back: int = 7, device_id: str = None,
+                                    room_name: str = None) -> Dict[str, np.ndarray]:
+        """
+        Holt Heizungsbeobachtungen spaltenweise als NumPy-Arrays
 
-    def get_heating_statistics(self, days_back: int = 30) -> Dict:
-        """Berechnet Heizungs-Statistiken"""
-        conn = self._get_connection()
+        Gleiche Filter und Reihenfolge wie get_heating_observations(), für Analysen
+        über viele Wochen ohne ein Dict pro Zeile.
+
+        Returns:
+            Dict mit 'timestamp' (datetime64[s]), 'device_id', 'room_name' (object),
+            Temperaturen/'humidity'/'power_percentage' (float64, NULL -> NaN) sowie
+            'is_heating', 'hour_of_day', 'day_of_week', 'presence_detected',
+            'window_open', 'energy_price_level' (int64, NULL -> -1)
+        """
+        self.flush_write_buffers()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         start_time = datetime.now() - timedelta(days=days_back)
 
-        # Gesamt-Statistiken
-        cursor.execute("""
+        query = """
             SELECT
-                COUNT(*) as total_observations,
-                SUM(CASE WHEN is_heating = 1 THEN 1 ELSE 0 END) as heating_count,
-                AVG(current_temp) as avg_temp,
-                AVG(target_temp) as avg_target,
-                AVG(outdoor_temp) as avg_outdoor
+                CAST(strftime('%s', timestamp) AS INTEGER),
+                device_id,
+                room_name,
+                current_temp,
+                target_temp,
+                is_heating,
+                outdoor_temp,
+                humidity,
+                hour_of_day,
+                day_of_week,
+                power_percentage,
+                presence_detected,
+                window_open,
+                energy_price_level
             FROM heating_observations
             WHERE timestamp >= ?
-        """, (start_time,))
+        """
 
-        stats = dict(cursor.fetchone())
+        params = [start_time]
 
-        # Raum-Statistiken
-        cursor.execute("""
-            SELECT
-                room_name,
-                COUNT(*) as observations,
-                AVG(current_temp) as avg_temp,
-                AVG(target_temp) as avg_target,
-                SUM(CASE WHEN is_heating = 1 THEN 1 ELSE 0 END) as heating_count
-            FROM heating_observations
-            WHERE timestamp >= ? AND room_name IS NOT NULL
-            GROUP BY room_name
-        """, (start_time,))
+        if device_id:
+            query += " AND device_id = ?"
+            params.append(device_id)
 
-        stats['room_stats'] = [dict(row) for row in cursor.fetchall()]
+        if room_name:
+            query += " AND room_name = ?"
+            params.append(room_name)
 
-        return stats
+        query += " ORDER BY timestamp ASC"
 
-    def cleanup_heating_observations(self, retention_days: int = 90) -> int:
-        """Löscht alte Heizungsbeobachtungen"""
-        conn = self._get_connection()
+        cursor.execute(query, params)
+        columns = self._fetch_columns(cursor, {
+            'timestamp': np.int64,
+            'device_id': object,
+            'room_name': object,
+            'current_temp': np.float64,
+            'target_temp': np.float64,
+            'is_heating': np.int64,
+            'outdoor_temp': np.float64,
+            'humidity': np.float64,
+            'hour_of_day': np.int64,
+            'day_of_week': np.int64,
+            'power_percentage': np.float64,
+            'presence_detected': np.int64,
+            'window_open': np.int64,
+            'energy_price_level': np.int64,
+        }, chunk_size=10000)
+        columns['timestamp'] = columns['timestamp'].astype('datetime64[s]')
+        return columns
+
+    def get_heating_statistics(self, days_back: int = 30) -> Dict:
+        """Berechnet Heizungs-Statistiken"""
+        self.flush_write_buffers()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
-        cutoff_date = datetime.now() - timedelta(days=retention_days)
+        start_time = datetime.now() - timedelta(days=days_back)
 
-        cursor.execute("""
-            DELETE FROM heating_observations
-            WHERE timestamp < ?
-        """, (cutoff_date,))
+        # Gesamt- und Raum-Statistiken in einem Round-Trip aus dem Tages-Rollup
+        # (Migration 012, tagesgenau ab dem Starttag); Raum-Statistiken als JSON-Array
+        # wie in get_bathroom_statistics. Durchschnitt = Summe / Anzahl Nicht-NULL-Werte.
+        try:
+            cursor.execute("""
+                WITH days AS (
+                    SELECT * FROM heating_observations_daily
+                    WHERE day >= date(?)
+                ),
+                rooms AS (
+                    SELECT
+                        room_name,
+                        SUM(observations) as observations,
+                        SUM(temp_sum) / SUM(temp_count) as avg_temp,
+                        SUM(target_sum) / SUM(target_count) as avg_target,
+                        SUM(heating_count) as heating_count
+                    FROM days
+                    WHERE room_name != ''
+                    GROUP BY room_name
+                )
+                SELECT
+                    COALESCE(SUM(observations), 0) as total_observations,
+                    SUM(heating_count) as heating_count,
+                    SUM(temp_sum) / SUM(temp_count) as avg_temp,
+                    SUM(target_sum) / SUM(target_count) as avg_target,
+                    SUM(outdoor_sum) / SUM(outdoor_count) as avg_outdoor,
+                    (SELECT json_group_array(json_object(
+                        'room_name', room_name,
+                        'observations', observations,
+                        'avg_temp', avg_temp,
+                        'avg_target', avg_target,
+                        'heating_count', heating_count
+                     )) FROM rooms) as room_stats
+                FROM days
+            """, (start_time,))
+        except sqlite3.OperationalError:
+            # Rollup existiert nicht (Migrationen nicht gelaufen, z.B. :memory:)
+            cursor.execute("""
+                WITH filtered AS (
+                    SELECT room_name, current_temp, target_temp, outdoor_temp, is_heating
+                    FROM heating_observations
+                    WHERE timestamp >= ?
+                ),
+                rooms AS (
+                    SELECT
+                        room_name,
+                        COUNT(*) as observations,
+                        AVG(current_temp) as avg_temp,
+                        AVG(target_temp) as avg_target,
+                        SUM(CASE WHEN is_heating = 1 THEN 1 ELSE 0 END) as heating_count
+                    FROM filtered
+                    WHERE room_name IS NOT NULL
+                    GROUP BY room_name
+                )
+                SELECT
+                    COUNT(*) as total_observations,
+                    SUM(CASE WHEN is_heating = 1 THEN 1 ELSE 0 END) as heating_count,
+                    AVG(current_temp) as avg_temp,
+                    AVG(target_temp) as avg_target,
+                    AVG(outdoor_temp) as avg_outdoor,
+                    (SELECT json_group_array(json_object(
+                        'room_name', room_name,
+                        'observations', observations,
+                        'avg_temp', avg_temp,
+                        'avg_target', avg_target,
+                        'heating_count', heating_count
+                     )) FROM rooms) as room_stats
+                FROM filtered
+            """, (start_time,))
 
-        deleted_count = cursor.rowcount
-        conn.commit()
+        stats = dict(cursor.fetchone())
+        stats['room_stats'] = json.loads(stats['room_stats'])
+
+        return stats
+
+    def cleanup_heating_observations(self, retention_days: int = 90) -> int:
+        """Löscht alte Heizungsbeobachtungen"""
+        cutoff_date = datetime.now() - timedelta(days=retention_days)
+        deleted_count = self._delete_older_than('heating_observations', 'timestamp', cutoff_date)
 
         logger.info(f"Deleted {deleted_count} old heating observations (older than {retention_days} days)")
         return deleted_count
@@ -1599,32 +2725,19 @@ class Database:
     def add_window_observation(self, device_id: str, device_name: str = None,
                                 room_name: str = None, is_open: bool = False,
                                 contact_alarm: bool = False):
-        """Fügt eine Fenster-Beobachtung hinzu (alle 60s für Heizungsoptimierung)"""
-        from datetime import datetime
-
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO window_observations
-            (timestamp, device_id, device_name, room_name, is_open, contact_alarm)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            datetime.now(),
-            device_id,
-            device_name,
-            room_name,
-            1 if is_open else 0,
-            1 if contact_alarm else 0
+        """Fügt eine Fenster-Beobachtung hinzu (alle 60s für Heizungsoptimierung, gepuffert)"""
+        self._buffer_insert('window_observations', WindowObservationRow(
+            # Volle Genauigkeit: trg_window_open_sessions ordnet Beobachtungen nach timestamp
+            datetime.now().isoformat(' '), device_id, device_name, room_name,
+            is_open, contact_alarm, classify_window_device(device_name)
         ))
 
-        conn.commit()
-        return cursor.lastrowid
-
     def get_current_open_windows(self) -> List[Dict]:
         """Holt alle aktuell geöffneten Fenster mit Dauer"""
-        conn = self._get_connection()
+        self.flush_write_buffers()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         # Nutze die View für effiziente Abfrage
         cursor.execute("""
@@ -1639,58 +2752,48 @@ class Database:
             ORDER BY minutes_open DESC
         """)
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows_as_dicts(cursor)
 
     def get_all_windows_latest_status(self) -> List[Dict]:
         """Holt den letzten bekannten Status aller Fenster (filtert Türen/Sensoren)"""
-        conn = self._get_connection()
+        self.flush_write_buffers()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         # Hole die letzte Beobachtung pro Fenster
-        # Filtere nur echte Fenster (entferne Türen, Temperatursensoren, etc.)
+        # Nur echte Fenster (Türen, Temperatursensoren etc. sind beim Einfügen als 'other' klassifiziert)
+        # SQLite liefert bei MAX() die übrigen Spalten aus der Zeile mit dem Maximum,
+        # der Index (device_kind, device_id, timestamp) wird dabei in Reihenfolge gelesen
         cursor.execute("""
-            WITH latest_obs AS (
-                SELECT
-                    device_id,
-                    device_name,
-                    room_name,
-                    is_open,
-                    contact_alarm,
-                    timestamp,
-                    ROW_NUMBER() OVER (PARTITION BY device_id ORDER BY timestamp DESC) as rn
-                FROM window_observations
-                WHERE (
-                    LOWER(device_name) LIKE '%fenster%'
-                    OR LOWER(device_name) LIKE '%window%'
-                )
-                AND NOT (
-                    LOWER(device_name) LIKE '%tür%'
-                    OR LOWER(device_name) LIKE '%door%'
-                    OR LOWER(device_name) LIKE '%temperatur%'
-                    OR LOWER(device_name) LIKE '%temperature%'
-                    OR LOWER(device_name) LIKE '%gruppe%'
-                    OR LOWER(device_name) LIKE '%group%'
-                )
-            )
             SELECT
                 device_id,
                 device_name,
                 room_name,
                 is_open,
                 contact_alarm,
-                timestamp
-            FROM latest_obs
-            WHERE rn = 1
+                MAX(timestamp) as timestamp
+            FROM window_observations
+            WHERE device_kind = 'window'
+            GROUP BY device_id
             ORDER BY device_name ASC
         """)
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows_as_dicts(cursor)
 
     def get_window_observations(self, hours_back: int = 24, device_id: str = None,
                                 room_name: str = None) -> List[Dict]:
-        """Holt Fenster-Beobachtungen für Analytics"""
-        conn = self._get_connection()
+        """Holt Fenster-Beobachtungen für Analytics (siehe iter_window_observations)"""
+        return list(chain.from_iterable(self.iter_window_observations(hours_back, device_id, room_name)))
+
+    def iter_window_observations(self, hours_back: int = 24, device_id: str = None,
+                                 room_name: str = None,
+                                 chunk_size: int = 4096) -> Iterator[List[Dict]]:
+        """Liefert Fenster-Beobachtungen blockweise (je bis zu chunk_size Dicts), älteste zuerst"""
+        self.flush_write_buffers()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         start_time = datetime.now() - timedelta(hours=hours_back)
 
@@ -1719,59 +2822,78 @@ class Database:
         query += " ORDER BY timestamp ASC"
 
         cursor.execute(query, params)
-
-        return [dict(row) for row in cursor.fetchall()]
+        yield from self._iter_dict_chunks(cursor, chunk_size)
 
     def get_window_open_statistics(self, days_back: int = 7) -> Dict:
-        """Berechnet Statistiken über offene Fenster (für Heizungsoptimierung)"""
-        conn = self._get_connection()
+        """Berechnet Statistiken über offene Fenster (für Heizungsoptimierung, gecacht)"""
+        self.flush_write_buffers()
+        return self._cached_statistics(
+            ('window_open_statistics', days_back), WINDOW_OPEN_STATISTICS_CACHE_TTL,
+            lambda: self._query_window_open_statistics(days_back)
+        )
+
+    def _query_window_open_statistics(self, days_back: int) -> Dict:
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
+        cursor.row_factory = None
+
         start_time = datetime.now() - timedelta(days=days_back)
 
-        # Pro Raum: wie oft und wie lange waren Fenster offen
+        # Pro Raum: wie oft und wie lange waren Fenster offen (abgeschlossene Öffnungen
+        # aus window_open_sessions, siehe Migration 006)
         cursor.execute("""
-            WITH window_sessions AS (
-                SELECT
-                    device_id,
-                    device_name,
-                    room_name,
-                    timestamp,
-                    is_open,
-                    LAG(is_open, 1, 0) OVER (PARTITION BY device_id ORDER BY timestamp) as prev_open
-                FROM window_observations
-                WHERE timestamp >= ?
-            ),
-            open_events AS (
-                SELECT
-                    device_id,
-                    device_name,
-                    room_name,
-                    timestamp as opened_at,
-                    LEAD(timestamp) OVER (PARTITION BY device_id ORDER BY timestamp) as closed_at
-                FROM window_sessions
-                WHERE is_open = 1 AND prev_open = 0
-            )
             SELECT
                 room_name,
                 device_name,
                 COUNT(*) as open_count,
-                AVG(CAST((julianday(closed_at) - julianday(opened_at)) * 24 * 60 AS INTEGER)) as avg_duration_minutes,
-                MAX(CAST((julianday(closed_at) - julianday(opened_at)) * 24 * 60 AS INTEGER)) as max_duration_minutes,
-                SUM(CAST((julianday(closed_at) - julianday(opened_at)) * 24 * 60 AS INTEGER)) as total_minutes_open
-            FROM open_events
-            WHERE closed_at IS NOT NULL
+                AVG(duration_minutes) as avg_duration_minutes,
+                MAX(duration_minutes) as max_duration_minutes,
+                SUM(duration_minutes) as total_minutes_open
+            FROM window_open_sessions
+            WHERE opened_at >= ? AND closed_at IS NOT NULL
             GROUP BY room_name, device_name
             ORDER BY total_minutes_open DESC
         """, (start_time,))
 
         stats = {
-            'by_room': [dict(row) for row in cursor.fetchall()],
+            'by_room': self._rows_as_dicts(cursor),
             'period_days': days_back
         }
 
         return stats
 
+    def _get_device_room_names(self, rooms_file: Path = Path('data/rooms.json')) -> Dict[str, str]:
+        """
+        Liefert device_id -> Raumname aus rooms.json
+
+        Die Datei wird nur neu gelesen, wenn sich mtime oder Größe geändert haben
+        (die Größe fängt Schreibvorgänge innerhalb desselben mtime-Ticks ab).
+        """
+        try:
+            stat = rooms_file.stat()
+            cache_key = (rooms_file, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return {}
+
+        if self._rooms_cache and self._rooms_cache[0] == cache_key:
+            return self._rooms_cache[1]
+
+        device_rooms = {}
+        try:
+            with open(rooms_file, 'r') as f:
+                rooms_data = json.load(f)
+            room_names_map = {room['id']: room['name'] for room in rooms_data.get('rooms', [])}
+            for device_id, room_id in rooms_data.get('assignments', {}).items():
+                if room_id in room_names_map:
+                    device_rooms[device_id] = room_names_map[room_id]
+        except Exception as e:
+            logger.warning(f"Could not load room assignments: {e}")
+            return {}
+
+        self._rooms_cache = (cache_key, device_rooms)
+        return device_rooms
+
     def get_window_statistics_for_charts(self, days_back: int = 7) -> Dict:
         """
         Berechnet Fenster-Statistiken speziell für Chart-Visualisierungen
@@ -1782,158 +2904,102 @@ class Database:
             - frequency_by_window: Liste mit {device_name, room_name, open_count}
             - daily_trends: Liste mit {date, total_opens, total_hours}
         """
-        conn = self._get_connection()
+        self.flush_write_buffers()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         start_time = datetime.now() - timedelta(days=days_back)
 
-        # Lade Raum-Zuordnungen aus rooms.json
-        import json
-        from pathlib import Path
-        room_assignments = {}
-        room_names_map = {}
+        # Raum-Zuordnungen aus rooms.json (device_id -> Raumname), als JSON gebunden
+        # und per json_each gejoint - Raumname und Rundung kommen direkt aus SQLite
+        device_rooms = json.dumps(self._get_device_room_names())
 
-        rooms_file = Path('data/rooms.json')
-        if rooms_file.exists():
-            try:
-                with open(rooms_file, 'r') as f:
-                    rooms_data = json.load(f)
-                    room_assignments = rooms_data.get('assignments', {})
-                    # Erstelle mapping von room_id zu room_name
-                    for room in rooms_data.get('rooms', []):
-                        room_names_map[room['id']] = room['name']
-            except Exception as e:
-                logger.warning(f"Could not load room assignments: {e}")
-
-        # 1. Öffnungszeiten pro Fenster (für Balkendiagramm)
+        # Öffnungen kommen aus window_open_sessions (per Trigger gepflegt, Migration 006);
+        # noch offene Fenster zählen bis jetzt. Pro Fenster ('window') und pro Tag ('day').
         cursor.execute("""
-            WITH window_sessions AS (
+            WITH open_events AS (
                 SELECT
                     device_id,
                     device_name,
                     room_name,
-                    timestamp,
-                    is_open,
-                    LAG(is_open, 1, 0) OVER (PARTITION BY device_id ORDER BY timestamp) as prev_open
-                FROM window_observations
-                WHERE timestamp >= ?
-                    AND device_id IS NOT NULL
+                    opened_at,
+                    COALESCE(
+                        duration_minutes,
+                        (strftime('%s', datetime('now')) - strftime('%s', opened_at)) / 60
+                    ) as minutes
+                FROM window_open_sessions
+                WHERE opened_at >= ?
             ),
-            open_events AS (
+            by_window AS (
                 SELECT
                     device_id,
                     device_name,
                     room_name,
-                    timestamp as opened_at,
-                    LEAD(timestamp) OVER (PARTITION BY device_id ORDER BY timestamp) as closed_at
-                FROM window_sessions
-                WHERE is_open = 1 AND prev_open = 0
+                    COUNT(*) as open_count,
+                    SUM(minutes) as total_minutes
+                FROM open_events
+                GROUP BY device_id, device_name, room_name
             )
             SELECT
-                device_id,
-                device_name,
-                room_name,
-                CAST(SUM(CAST((julianday(COALESCE(closed_at, datetime('now'))) - julianday(opened_at)) * 24 * 60 AS INTEGER)) AS REAL) as total_minutes
+                'window' as kind,
+                w.device_name,
+                COALESCE(r.value, w.room_name, 'Unbekannt') as room_name,
+                NULL as date,
+                w.open_count,
+                ROUND(w.total_minutes, 0) as total_minutes,
+                ROUND(w.total_minutes / 60.0, 1) as total_hours
+            FROM by_window w
+            LEFT JOIN json_each(?) r ON r.key = w.device_id
+
+            UNION ALL
+
+            SELECT
+                'day' as kind,
+                NULL,
+                NULL,
+                DATE(opened_at) as date,
+                COUNT(*) as open_count,
+                NULL,
+                ROUND(SUM(minutes) / 60.0, 1) as total_hours
             FROM open_events
-            GROUP BY device_id, device_name, room_name
-            ORDER BY total_minutes DESC
-        """, (start_time,))
+            GROUP BY DATE(opened_at)
+        """, (start_time, device_rooms))
 
-        duration_data = []
+        window_rows = []
+        daily_rows = []
         for row in cursor.fetchall():
-            total_minutes = row['total_minutes'] or 0
-            device_id = row['device_id']
+            (window_rows if row['kind'] == 'window' else daily_rows).append(row)
 
-            # Hole Raumnamen aus room_assignments
-            room_name = row['room_name'] or 'Unbekannt'
-            if device_id in room_assignments:
-                room_id = room_assignments[device_id]
-                room_name = room_names_map.get(room_id, room_name)
-
-            duration_data.append({
+        # 1. Öffnungszeiten pro Fenster (für Balkendiagramm)
+        duration_data = [
+            {
                 'device_name': row['device_name'],
-                'room_name': room_name,
-                'total_hours': round(total_minutes / 60, 1),
-                'total_minutes': round(total_minutes, 0)
-            })
+                'room_name': row['room_name'],
+                'total_hours': row['total_hours'],
+                'total_minutes': row['total_minutes']
+            }
+            for row in sorted(window_rows, key=lambda r: r['total_minutes'], reverse=True)
+        ]
 
         # 2. Öffnungshäufigkeit pro Fenster (für Balkendiagramm)
-        cursor.execute("""
-            WITH window_sessions AS (
-                SELECT
-                    device_id,
-                    device_name,
-                    room_name,
-                    timestamp,
-                    is_open,
-                    LAG(is_open, 1, 0) OVER (PARTITION BY device_id ORDER BY timestamp) as prev_open
-                FROM window_observations
-                WHERE timestamp >= ?
-                    AND device_id IS NOT NULL
-            )
-            SELECT
-                device_id,
-                device_name,
-                room_name,
-                COUNT(*) as open_count
-            FROM window_sessions
-            WHERE is_open = 1 AND prev_open = 0
-            GROUP BY device_id, device_name, room_name
-            ORDER BY open_count DESC
-        """, (start_time,))
-
-        frequency_data = []
-        for row in cursor.fetchall():
-            device_id = row['device_id']
-
-            # Hole Raumnamen aus room_assignments
-            room_name = row['room_name'] or 'Unbekannt'
-            if device_id in room_assignments:
-                room_id = room_assignments[device_id]
-                room_name = room_names_map.get(room_id, room_name)
-
-            frequency_data.append({
+        frequency_data = [
+            {
                 'device_name': row['device_name'],
-                'room_name': room_name,
+                'room_name': row['room_name'],
                 'open_count': row['open_count']
-            })
+            }
+            for row in sorted(window_rows, key=lambda r: r['open_count'], reverse=True)
+        ]
 
         # 3. Tägliche Trends (für Linien-/Balkendiagramm)
-        cursor.execute("""
-            WITH window_sessions AS (
-                SELECT
-                    device_id,
-                    timestamp,
-                    is_open,
-                    LAG(is_open, 1, 0) OVER (PARTITION BY device_id ORDER BY timestamp) as prev_open,
-                    LEAD(timestamp) OVER (PARTITION BY device_id ORDER BY timestamp) as next_timestamp
-                FROM window_observations
-                WHERE timestamp >= ?
-            ),
-            daily_opens AS (
-                SELECT
-                    DATE(timestamp) as date,
-                    COUNT(*) as open_count,
-                    SUM(CAST((julianday(COALESCE(next_timestamp, datetime('now'))) - julianday(timestamp)) * 24 * 60 AS INTEGER)) as total_minutes
-                FROM window_sessions
-                WHERE is_open = 1 AND prev_open = 0
-                GROUP BY DATE(timestamp)
-            )
-            SELECT
-                date,
-                open_count,
-                CAST(total_minutes AS REAL) / 60 as total_hours
-            FROM daily_opens
-            ORDER BY date ASC
-        """, (start_time,))
-
-        daily_trends = []
-        for row in cursor.fetchall():
-            daily_trends.append({
+        daily_trends = [
+            {
                 'date': row['date'],
                 'open_count': row['open_count'],
-                'total_hours': round(row['total_hours'] or 0, 1)
-            })
+                'total_hours': row['total_hours']
+            }
+            for row in sorted(daily_rows, key=lambda r: r['date'])
+        ]
 
         return {
             'duration_by_window': duration_data,
@@ -1946,18 +3012,10 @@ class Database:
 
     def cleanup_window_observations(self, retention_days: int = 90) -> int:
         """Löscht alte Fenster-Beobachtungen"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
         cutoff_date = datetime.now() - timedelta(days=retention_days)
-
-        cursor.execute("""
-            DELETE FROM window_observations
-            WHERE timestamp < ?
-        """, (cutoff_date,))
-
-        deleted_count = cursor.rowcount
-        conn.commit()
+        deleted_count = self._delete_older_than('window_observations', 'timestamp', cutoff_date)
+        self._delete_older_than('window_open_sessions', 'opened_at', cutoff_date)
+        self._clear_statistics_cache()
 
         logger.info(f"Deleted {deleted_count} old window observations (older than {retention_days} days)")
         return deleted_count
@@ -1983,7 +3041,7 @@ class Database:
     def get_room_learning_parameter(self, room_name: str, parameter_name: str,
                                      min_confidence: float = 0.6) -> Optional[float]:
         """Holt gelernten Parameter für einen Raum"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2020,7 +3078,7 @@ class Database:
     def get_active_humidity_alerts(self, room_name: str = None,
                                    hours_back: int = 24) -> List[Dict]:
         """Holt aktive Luftfeuchtigkeit-Warnungen"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         start_time = datetime.now() - timedelta(hours=hours_back)
@@ -2037,8 +3095,9 @@ class Database:
 
         query += " ORDER BY timestamp DESC"
 
+        cursor.row_factory = None
         cursor.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows_as_dicts(cursor)
 
     def acknowledge_humidity_alert(self, alert_id: int):
         """Markiert eine Warnung als bestätigt"""
@@ -2076,7 +3135,7 @@ class Database:
 
     def get_latest_ventilation_recommendation(self, room_name: str = None) -> Optional[Dict]:
         """Holt die neueste Lüftungsempfehlung"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         query = """
@@ -2116,7 +3175,7 @@ class Database:
 
     def get_next_shower_prediction(self, min_confidence: float = 0.6) -> Optional[Dict]:
         """Holt die nächste Dusch-Vorhersage"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2131,19 +3190,20 @@ class Database:
 
     def get_shower_predictions_today(self) -> List[Dict]:
         """Holt alle Vorhersagen für heute"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + timedelta(days=1)
-
+        # Tagesgrenzen (Ortszeit wie datetime.now()) berechnet SQLite selbst,
+        # Bereichsscan über idx_shower_predictions_time
         cursor.execute("""
             SELECT * FROM shower_predictions
-            WHERE predicted_time BETWEEN ? AND ?
+            WHERE predicted_time >= date('now', 'localtime')
+                AND predicted_time < date('now', 'localtime', '+1 day')
             ORDER BY predicted_time ASC
-        """, (today_start, today_end))
+        """)
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows_as_dicts(cursor)
 
     # === SYSTEM STATUS METHODEN ===
 
@@ -2161,7 +3221,7 @@ class Database:
 
     def get_system_status(self, key: str) -> Optional[Dict]:
         """Holt einen System-Status-Wert"""
-        conn = self._get_connection()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -2174,27 +3234,93 @@ class Database:
 
     # === ML TRAINING DATA COLLECTION ===
 
+    def _buffer_insert(self, table: str, row: NamedTuple):
+        """
+        Puffert eine Zeile für BUFFERED_INSERTS[table]; Flush bei Zeilen-/Zeitlimit
+
+        Zeilen sind NamedTuples (LightingEventRow, ContinuousMeasurementRow,
+        HeatingObservationRow, WindowObservationRow) und
+        werden ohne Umwandlung an executemany übergeben; der Zeitstempel wird
+        bereits als ISO-Text gepuffert, damit kein Adapter pro Zeile läuft (sekundengenau
+        nur für lighting_events und continuous_measurements).
+        """
+        with self._write_buffer_lock:
+            self._write_buffers[table].append(row)
+            now = time.monotonic()
+            if self._write_buffer_since is None:
+                self._write_buffer_since = now
+
+            # Nach einem Fehlschlag nicht bei jeder Zeile erneut auf den Lock warten
+            if self._write_buffer_failed_at is not None and \
+                    now - self._write_buffer_failed_at < WRITE_BUFFER_MAX_AGE:
+                return
+
+            pending = sum(len(rows) for rows in self._write_buffers.values())
+            if pending < WRITE_BUFFER_MAX_ROWS and now - self._write_buffer_since < WRITE_BUFFER_MAX_AGE:
+                return
+
+        try:
+            self.flush_write_buffers()
+        except sqlite3.Error as e:
+            # Zeilen bleiben gepuffert und werden beim nächsten Flush geschrieben
+            logger.warning(f"Write buffer flush failed, keeping rows for retry: {e}")
+
+    def flush_write_buffers(self) -> int:
+        """
+        Schreibt alle gepufferten Zeilen (executemany je Tabelle + ein Commit)
+
+        Wird automatisch bei Zeilen-/Zeitlimit, vor Lesezugriffen auf die
+        gepufferten Tabellen, in close() und beim Beenden aufgerufen. Collector
+        rufen es zusätzlich am Ende jedes Sammel-Durchlaufs auf.
+
+        Returns:
+            Anzahl geschriebener Zeilen
+        """
+        with self._write_buffer_lock:
+            if self._write_buffer_since is None:
+                return 0
+
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            written = 0
+            try:
+                # Schreib-Lock sofort nehmen statt beim ersten INSERT hochzustufen
+                cursor.execute("BEGIN IMMEDIATE")
+                for table, rows in self._write_buffers.items():
+                    if rows:
+                        cursor.executemany(BUFFERED_INSERTS[table], rows)
+                        written += len(rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self._write_buffer_failed_at = time.monotonic()
+                # Zeilen behalten (Retry beim nächsten Flush), Puffer aber begrenzen
+                for table, rows in self._write_buffers.items():
+                    overflow = len(rows) - WRITE_BUFFER_MAX_PENDING
+                    if overflow > 0:
+                        del rows[:overflow]
+                        logger.warning(f"Write buffer for {table} full - dropped {overflow} oldest rows")
+                raise
+
+            # Neue Fenster-Beobachtungen ändern window_open_sessions (Trigger)
+            if self._write_buffers['window_observations']:
+                self._clear_statistics_cache()
+
+            for rows in self._write_buffers.values():
+                rows.clear()
+            self._write_buffer_since = None
+            self._write_buffer_failed_at = None
+
+        return written
+
     def add_lighting_event(self, device_id: str, device_name: str, room_name: str,
                           state: str, brightness: int = None, outdoor_light: float = None,
                           presence: bool = False, motion_detected: bool = False):
-        """Fügt ein Beleuchtungs-Event für ML-Training hinzu"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        now = datetime.now()
-        
-        cursor.execute("""
-            INSERT INTO lighting_events
-            (timestamp, device_id, device_name, room_name, state, brightness,
-             hour_of_day, day_of_week, is_weekend, outdoor_light, presence, motion_detected)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            now, device_id, device_name, room_name, state, brightness,
-            now.hour, now.weekday(), now.weekday() >= 5,
+        """Fügt ein Beleuchtungs-Event für ML-Training hinzu (gepuffert, siehe flush_write_buffers)"""
+        self._buffer_insert('lighting_events', LightingEventRow(
+            datetime.now().isoformat(' ', 'seconds'), device_id, device_name, room_name, state, brightness,
             outdoor_light, presence, motion_detected
         ))
-        
-        conn.commit()
         logger.debug(f"Lighting event saved: {device_name} ({room_name}) -> {state}")
 
     def add_continuous_measurement(self, device_id: str, device_name: str, room_name: str,
@@ -2202,81 +3328,137 @@ class Database:
                                   outdoor_temp: float = None, humidity: float = None,
                                   heating_active: bool = False, presence: bool = False,
                                   window_open: bool = False, energy_price_level: int = 2):
-        """Fügt eine kontinuierliche Temperaturmessung für ML-Training hinzu"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        now = datetime.now()
-        
-        cursor.execute("""
-            INSERT INTO continuous_measurements
-            (timestamp, device_id, device_name, room_name, current_temperature, target_temperature,
-             outdoor_temperature, humidity, heating_active, presence, window_open,
-             hour_of_day, day_of_week, is_weekend, energy_price_level)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            now, device_id, device_name, room_name, current_temp, target_temp,
-            outdoor_temp, humidity, heating_active, presence, window_open,
-            now.hour, now.weekday(), now.weekday() >= 5, energy_price_level
+        """Fügt eine kontinuierliche Temperaturmessung für ML-Training hinzu (gepuffert, siehe flush_write_buffers)"""
+        self._buffer_insert('continuous_measurements', ContinuousMeasurementRow(
+            datetime.now().isoformat(' ', 'seconds'), device_id, device_name, room_name, current_temp, target_temp,
+            outdoor_temp, humidity, heating_active, presence, window_open, energy_price_level
         ))
-        
-        conn.commit()
         logger.debug(f"Temperature measurement saved: {device_name} ({room_name}) {current_temp}°C")
 
     def get_lighting_events_count(self) -> int:
         """Gibt Anzahl der Lighting Events zurück"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM lighting_events")
-        return cursor.fetchone()[0]
+        self.flush_write_buffers()
+        return self.get_table_counts(['lighting_events'])['lighting_events']
 
     def get_continuous_measurements_count(self) -> int:
         """Gibt Anzahl der Temperaturmessungen zurück"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM continuous_measurements")
-        return cursor.fetchone()[0]
-
-    def get_lighting_events(self, days_back: int = 30, limit: int = None) -> List[Dict]:
-        """Holt Lighting Events für ML-Training"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT * FROM lighting_events
+        self.flush_write_buffers()
+        return self.get_table_counts(['continuous_measurements'])['continuous_measurements']
+
+    def _ml_training_cursor(self, table: str, days_back: int, limit: int = None) -> sqlite3.Cursor:
+        """Führt die Abfrage für eine ML-Trainingstabelle aus (Zeilen als Tupel, neueste zuerst)"""
+        self.flush_write_buffers()
+        cursor = self._get_reader_connection().cursor()
+        cursor.row_factory = None
+
+        # LIMIT gebunden (-1 = unbegrenzt) -> konstanter SQL-Text für den Statement-Cache
+        cursor.execute(f"""
+            SELECT * FROM {table}
             WHERE timestamp >= ?
             ORDER BY timestamp DESC
+            LIMIT ?
+        """, (datetime.now() - timedelta(days=days_back), limit if limit else -1))
+        return cursor
+
+    def _iter_ml_training_rows(self, table: str, days_back: int, limit: int,
+                               chunk_size: int) -> Iterator[List[Dict]]:
+        return self._iter_dict_chunks(self._ml_training_cursor(table, days_back, limit), chunk_size)
+
+    def iter_lighting_events(self, days_back: int = 30, limit: int = None,
+                             chunk_size: int = 10000) -> Iterator[List[Dict]]:
+        """Liefert Lighting Events blockweise (je bis zu chunk_size Dicts) für ML-Training"""
+        return self._iter_ml_training_rows('lighting_events', days_back, limit, chunk_size)
+
+    def iter_continuous_measurements(self, days_back: int = 30, limit: int = None,
+                                     chunk_size: int = 10000) -> Iterator[List[Dict]]:
+        """Liefert Temperaturmessungen blockweise (je bis zu chunk_size Dicts) für ML-Training"""
+        return self._iter_ml_training_rows('continuous_measurements', days_back, limit, chunk_size)
+
+    def get_lighting_events(self, days_back: int = 30, limit: int = None,
+                            as_columns: bool = False):
+        """Holt Lighting Events für ML-Training (as_columns=True: {Spalte: [Werte]})"""
+        if as_columns:
+            return self._rows_as_columns(self._ml_training_cursor('lighting_events', days_back, limit))
+        return list(chain.from_iterable(self.iter_lighting_events(days_back, limit)))
+
+    def get_continuous_measurements(self, days_back: int = 30, limit: int = None,
+                                    as_columns: bool = False):
+        """Holt Temperaturmessungen für ML-Training (as_columns=True: {Spalte: [Werte]})"""
+        if as_columns:
+            return self._rows_as_columns(
+                self._ml_training_cursor('continuous_measurements', days_back, limit)
+            )
+        return list(chain.from_iterable(self.iter_continuous_measurements(days_back, limit)))
+
+    def get_continuous_measurements_np(self, days_back: int = 30, limit: int = None,
+                                       chunk_size: int = 10000) -> Dict[str, np.ndarray]:
         """
-        
-        if limit:
-            query += f" LIMIT {limit}"
-        
-        cursor.execute(query, (datetime.now() - timedelta(days=days_back),))
-        return [dict(row) for row in cursor.fetchall()]
+        Holt Temperaturmessungen für ML-Training spaltenweise als NumPy-Arrays
 
-    def get_continuous_measurements(self, days_back: int = 30, limit: int = None) -> List[Dict]:
-        """Holt Temperaturmessungen für ML-Training"""
-        conn = self._get_connection()
+        Schmale dtypes (float32 Temperaturen, int8 Flags/Stufen) halbieren den Speicher
+        gegenüber Listen von Dicts; gelesen wird blockweise per fetchmany.
+
+        Returns:
+            Dict Spaltenname -> np.ndarray, 'timestamp' als datetime64[s].
+            NULL wird zu NaN (float) bzw. -1 (int).
+        """
+        self.flush_write_buffers()
+        conn = self._get_reader_connection()
         cursor = conn.cursor()
-        
-        query = """
-            SELECT * FROM continuous_measurements
+        cursor.row_factory = None
+
+        cursor.execute("""
+            SELECT
+                CAST(strftime('%s', timestamp) AS INTEGER), device_id, room_name,
+                current_temperature, target_temperature, outdoor_temperature, humidity,
+                heating_active, presence, window_open,
+                hour_of_day, day_of_week, is_weekend, energy_price_level
+            FROM continuous_measurements
             WHERE timestamp >= ?
             ORDER BY timestamp DESC
-        """
-        
-        if limit:
-            query += f" LIMIT {limit}"
-        
-        cursor.execute(query, (datetime.now() - timedelta(days=days_back),))
-        return [dict(row) for row in cursor.fetchall()]
+            LIMIT ?
+        """, (datetime.now() - timedelta(days=days_back), limit if limit else -1))
+
+        columns = self._fetch_columns(cursor, {
+            'timestamp': np.int64,
+            'device_id': object,
+            'room_name': object,
+            'current_temperature': np.float32,
+            'target_temperature': np.float32,
+            'outdoor_temperature': np.float32,
+            'humidity': np.float32,
+            'heating_active': np.int8,
+            'presence': np.int8,
+            'window_open': np.int8,
+            'hour_of_day': np.int8,
+            'day_of_week': np.int8,
+            'is_weekend': np.int8,
+            'energy_price_level': np.int8,
+        }, chunk_size=chunk_size)
+        columns['timestamp'] = columns['timestamp'].astype('datetime64[s]')
+        return columns
 
     def close(self):
         """Schließt die Datenbankverbindung"""
+        if self.connection:
+            try:
+                self.flush_write_buffers()
+            except Exception as e:
+                logger.error(f"Error flushing write buffers: {e}")
+
+        with self._connections_lock:
+            for _, conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+            self._connection_local = threading.local()
+
         if self.connection:
             self.connection.close()
             self.connection = None
 
-    def __del__(self):
-        """Destructor - schließt Verbindung"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Schließt die Verbindungen beim Verlassen des with-Blocks"""
         self.close()
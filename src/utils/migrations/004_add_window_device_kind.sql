@@ -0,0 +1,29 @@
+-- Migration 004: Geräte-Klassifizierung für Fenster-Beobachtungen
+-- Erstellt: 2025-11-12
+-- Beschreibung: Fügt device_kind Spalte hinzu, damit Abfragen auf echte Fenster
+--               per Index filtern können statt LOWER(device_name) LIKE '%...%'
+
+ALTER TABLE window_observations ADD COLUMN device_kind TEXT;
+
+-- Bestehende Beobachtungen einmalig klassifizieren (neue Zeilen setzt add_window_observation)
+UPDATE window_observations
+SET device_kind = CASE
+    WHEN (
+        LOWER(device_name) LIKE '%fenster%'
+        OR LOWER(device_name) LIKE '%window%'
+    )
+    AND NOT (
+        LOWER(device_name) LIKE '%tür%'
+        OR LOWER(device_name) LIKE '%door%'
+        OR LOWER(device_name) LIKE '%temperatur%'
+        OR LOWER(device_name) LIKE '%temperature%'
+        OR LOWER(device_name) LIKE '%gruppe%'
+        OR LOWER(device_name) LIKE '%group%'
+    )
+    THEN 'window'
+    ELSE 'other'
+END;
+
+-- Index für "letzter Status pro Fenster"
+CREATE INDEX IF NOT EXISTS idx_window_obs_kind_device
+ON window_observations(device_kind, device_id, timestamp DESC);
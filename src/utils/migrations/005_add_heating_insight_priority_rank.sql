@@ -0,0 +1,19 @@
+-- Migration 005: Numerische Priorität für Heizungs-Insights
+-- Erstellt: 2025-11-12
+-- Beschreibung: priority ist Text ('low'/'medium'/'high') und sortiert lexikographisch
+--               falsch. priority_rank (1=low, 2=medium, 3=high) sortiert korrekt und
+--               ist per Index sortierbar.
+
+ALTER TABLE heating_insights ADD COLUMN priority_rank INTEGER DEFAULT 2;
+
+-- Bestehende Insights einmalig umrechnen (neue Zeilen setzt add_heating_insight)
+UPDATE heating_insights
+SET priority_rank = CASE priority
+    WHEN 'high' THEN 3
+    WHEN 'low' THEN 1
+    ELSE 2
+END;
+
+-- Index passend zu ORDER BY timestamp DESC, priority_rank DESC LIMIT ?
+CREATE INDEX IF NOT EXISTS idx_heating_insights_ts_pri
+ON heating_insights(timestamp DESC, priority_rank DESC, confidence);
@@ -0,0 +1,81 @@
+-- Migration 006: Materialisierte Fenster-Öffnungen
+-- Erstellt: 2025-11-13
+-- Beschreibung: window_open_sessions enthält pro Öffnen eines Fensters eine Zeile
+--               (opened_at, closed_at, duration_minutes). Ein Trigger auf
+--               window_observations pflegt sie bei jedem Statuswechsel, damit
+--               Statistiken nicht jedes Mal per LAG/LEAD über alle Beobachtungen
+--               rekonstruiert werden müssen.
+
+CREATE TABLE IF NOT EXISTS window_open_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    device_id TEXT NOT NULL,
+    device_name TEXT,
+    room_name TEXT,
+    opened_at DATETIME NOT NULL,
+    closed_at DATETIME,              -- NULL solange das Fenster offen ist
+    duration_minutes INTEGER         -- gesetzt beim Schließen
+);
+
+CREATE INDEX IF NOT EXISTS idx_window_sessions_opened
+ON window_open_sessions(opened_at);
+
+-- Für den Trigger: offene Session eines Geräts finden
+CREATE INDEX IF NOT EXISTS idx_window_sessions_device_open
+ON window_open_sessions(device_id, closed_at);
+
+-- Bestehende Beobachtungen einmalig in Sessions umrechnen
+-- (wie bisher: erste Beobachtung eines Geräts gilt als Wechsel von "zu")
+INSERT INTO window_open_sessions
+(device_id, device_name, room_name, opened_at, closed_at, duration_minutes)
+WITH changes AS (
+    SELECT
+        device_id,
+        device_name,
+        room_name,
+        timestamp,
+        is_open,
+        LAG(is_open, 1, 0) OVER (PARTITION BY device_id ORDER BY timestamp) as prev_open
+    FROM window_observations
+),
+transitions AS (
+    SELECT
+        device_id,
+        device_name,
+        room_name,
+        timestamp,
+        is_open,
+        LEAD(timestamp) OVER (PARTITION BY device_id ORDER BY timestamp) as next_change
+    FROM changes
+    WHERE is_open != prev_open
+)
+SELECT
+    device_id,
+    device_name,
+    room_name,
+    timestamp,
+    next_change,
+    (strftime('%s', next_change) - strftime('%s', timestamp)) / 60
+FROM transitions
+WHERE is_open = 1;
+
+-- Statuswechsel pflegen: Schließen beendet die offene Session, Öffnen legt eine neue an
+CREATE TRIGGER IF NOT EXISTS trg_window_open_sessions
+AFTER INSERT ON window_observations
+WHEN NEW.is_open != COALESCE((
+    SELECT is_open FROM window_observations
+    WHERE device_id = NEW.device_id AND timestamp < NEW.timestamp
+    ORDER BY timestamp DESC
+    LIMIT 1
+), 0)
+BEGIN
+    UPDATE window_open_sessions
+    SET closed_at = NEW.timestamp,
+        duration_minutes = (strftime('%s', NEW.timestamp) - strftime('%s', opened_at)) / 60
+    WHERE NEW.is_open = 0
+        AND device_id = NEW.device_id
+        AND closed_at IS NULL;
+
+    INSERT INTO window_open_sessions (device_id, device_name, room_name, opened_at)
+    SELECT NEW.device_id, NEW.device_name, NEW.room_name, NEW.timestamp
+    WHERE NEW.is_open = 1;
+END;
@@ -0,0 +1,32 @@
+-- Migration 007: Offene Fenster aus window_open_sessions
+-- Erstellt: 2025-11-13
+-- Beschreibung: v_current_open_windows las bisher alle is_open-Beobachtungen und nahm
+--               MIN(timestamp) als Öffnungszeitpunkt (auch aus früheren Öffnungen).
+--               Die offene Session (closed_at IS NULL, per Trigger aus Migration 006)
+--               liefert den Öffnungszeitpunkt direkt; last_seen kommt per Index
+--               idx_window_obs_device statt per Gruppierung über alle Beobachtungen.
+
+DROP VIEW IF EXISTS v_current_open_windows;
+
+CREATE VIEW IF NOT EXISTS v_current_open_windows AS
+SELECT
+    device_id,
+    device_name,
+    room_name,
+    opened_at,
+    last_seen,
+    CAST((julianday('now') - julianday(opened_at)) * 24 * 60 AS INTEGER) as minutes_open
+FROM (
+    SELECT
+        s.device_id,
+        s.device_name,
+        s.room_name,
+        s.opened_at,
+        (
+            SELECT MAX(o.timestamp) FROM window_observations o
+            WHERE o.device_id = s.device_id
+        ) as last_seen
+    FROM window_open_sessions s
+    WHERE s.closed_at IS NULL
+)
+WHERE last_seen >= datetime('now', '-2 minutes');
@@ -0,0 +1,30 @@
+-- Migration 008: Fensterdauer per Unix-Epoch
+-- Erstellt: 2025-11-14
+-- Beschreibung: minutes_open wird wie duration_minutes in window_open_sessions
+--               (Migration 006) aus strftime('%s') als Ganzzahl-Differenz
+--               berechnet statt über julianday-Gleitkomma.
+
+DROP VIEW IF EXISTS v_current_open_windows;
+
+CREATE VIEW IF NOT EXISTS v_current_open_windows AS
+SELECT
+    device_id,
+    device_name,
+    room_name,
+    opened_at,
+    last_seen,
+    (strftime('%s', 'now') - strftime('%s', opened_at)) / 60 as minutes_open
+FROM (
+    SELECT
+        s.device_id,
+        s.device_name,
+        s.room_name,
+        s.opened_at,
+        (
+            SELECT MAX(o.timestamp) FROM window_observations o
+            WHERE o.device_id = s.device_id
+        ) as last_seen
+    FROM window_open_sessions s
+    WHERE s.closed_at IS NULL
+)
+WHERE last_seen >= datetime('now', '-2 minutes');
@@ -0,0 +1,26 @@
+-- Migration 009: Gelernte Badezimmer-Parameter als WITHOUT ROWID-Tabelle
+-- Erstellt: 2025-11-15
+-- Beschreibung: Die id wurde nie referenziert; gelesen wird nur der neueste Wert pro
+--               parameter_name. Mit (parameter_name, timestamp DESC) als Primärschlüssel
+--               liegen die Zeilen direkt in dieser Reihenfolge im B-Baum - ein
+--               zusätzlicher Index (und der Umweg über die rowid) entfällt.
+
+CREATE TABLE IF NOT EXISTS bathroom_learned_parameters_new (
+    timestamp DATETIME NOT NULL,
+    parameter_name TEXT NOT NULL,
+    parameter_value REAL NOT NULL,
+    confidence REAL,
+    samples_used INTEGER,
+    reason TEXT,
+    PRIMARY KEY (parameter_name, timestamp DESC)
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO bathroom_learned_parameters_new
+(timestamp, parameter_name, parameter_value, confidence, samples_used, reason)
+SELECT timestamp, parameter_name, parameter_value, confidence, samples_used, reason
+FROM bathroom_learned_parameters;
+
+-- Entfernt auch idx_learned_params_name_time
+DROP TABLE bathroom_learned_parameters;
+
+ALTER TABLE bathroom_learned_parameters_new RENAME TO bathroom_learned_parameters;
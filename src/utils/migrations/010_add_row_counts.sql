@@ -0,0 +1,110 @@
+-- Migration 010: Zeilenzähler für große Tabellen
+-- Erstellt: 2025-11-15
+-- Beschreibung: COUNT(*) durchläuft in SQLite die ganze Tabelle. row_counts wird per
+--               Trigger bei jedem INSERT/DELETE mitgezählt, Database.get_table_counts
+--               liest die Werte von dort (O(1) statt O(N)).
+
+CREATE TABLE IF NOT EXISTS row_counts (
+    table_name TEXT PRIMARY KEY,
+    row_count INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- Einmalige Initialisierung mit den aktuellen Zeilenanzahlen
+INSERT OR REPLACE INTO row_counts (table_name, row_count)
+SELECT 'sensor_data', COUNT(*) FROM sensor_data
+UNION ALL
+SELECT 'external_data', COUNT(*) FROM external_data
+UNION ALL
+SELECT 'lighting_events', COUNT(*) FROM lighting_events
+UNION ALL
+SELECT 'continuous_measurements', COUNT(*) FROM continuous_measurements
+UNION ALL
+SELECT 'heating_observations', COUNT(*) FROM heating_observations
+UNION ALL
+SELECT 'window_observations', COUNT(*) FROM window_observations
+UNION ALL
+SELECT 'bathroom_continuous_measurements', COUNT(*) FROM bathroom_continuous_measurements;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_sensor_data_insert
+AFTER INSERT ON sensor_data
+BEGIN
+    UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = 'sensor_data';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_sensor_data_delete
+AFTER DELETE ON sensor_data
+BEGIN
+    UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = 'sensor_data';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_external_data_insert
+AFTER INSERT ON external_data
+BEGIN
+    UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = 'external_data';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_external_data_delete
+AFTER DELETE ON external_data
+BEGIN
+    UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = 'external_data';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_lighting_events_insert
+AFTER INSERT ON lighting_events
+BEGIN
+    UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = 'lighting_events';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_lighting_events_delete
+AFTER DELETE ON lighting_events
+BEGIN
+    UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = 'lighting_events';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_continuous_measurements_insert
+AFTER INSERT ON continuous_measurements
+BEGIN
+    UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = 'continuous_measurements';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_continuous_measurements_delete
+AFTER DELETE ON continuous_measurements
+BEGIN
+    UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = 'continuous_measurements';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_heating_observations_insert
+AFTER INSERT ON heating_observations
+BEGIN
+    UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = 'heating_observations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_heating_observations_delete
+AFTER DELETE ON heating_observations
+BEGIN
+    UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = 'heating_observations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_window_observations_insert
+AFTER INSERT ON window_observations
+BEGIN
+    UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = 'window_observations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_window_observations_delete
+AFTER DELETE ON window_observations
+BEGIN
+    UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = 'window_observations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_bathroom_continuous_measurements_insert
+AFTER INSERT ON bathroom_continuous_measurements
+BEGIN
+    UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = 'bathroom_continuous_measurements';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_row_counts_bathroom_continuous_measurements_delete
+AFTER DELETE ON bathroom_continuous_measurements
+BEGIN
+    UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = 'bathroom_continuous_measurements';
+END;
@@ -0,0 +1,20 @@
+-- Migration 011: Zeitreihen-Indizes aufräumen und ergänzen
+-- Erstellt: 2025-11-16
+-- Beschreibung: Die (id, timestamp)-Indizes für sensor_data, heating_observations,
+--               window_observations und bathroom_events existieren bereits (SQLite liest
+--               sie für ORDER BY ... DESC rückwärts, eigene DESC-Indizes sind unnötig).
+--               Neu ist ein partieller, abdeckender Index für die Luftfeuchtigkeits-
+--               Zeitreihe; doppelte Timestamp-Indizes aus 001/002 entfallen, da jeder
+--               Index jeden INSERT der 60s-Collector verteuert.
+
+-- get_bathroom_humidity_timeseries: WHERE timestamp >= ? AND humidity IS NOT NULL,
+-- liest timestamp/humidity direkt aus dem Index (kein Zugriff auf die Tabelle)
+CREATE INDEX IF NOT EXISTS idx_bathroom_continuous_humidity
+ON bathroom_continuous_measurements(timestamp, humidity)
+WHERE humidity IS NOT NULL;
+
+-- Gleicher Index wie idx_bathroom_continuous_time (Database._init_database)
+DROP INDEX IF EXISTS idx_bathroom_continuous_timestamp;
+
+-- Präfix von idx_heating_observations_time(timestamp, device_id)
+DROP INDEX IF EXISTS idx_heating_obs_timestamp;
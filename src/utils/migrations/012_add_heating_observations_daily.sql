@@ -0,0 +1,90 @@
+-- Migration 012: Tages-Rollup für Heizungsbeobachtungen
+-- Erstellt: 2025-11-16
+-- Beschreibung: get_heating_statistics aggregierte bei jedem Aufruf alle Beobachtungen
+--               der letzten 30 Tage (eine Zeile pro Gerät und Minute). Die Tabelle
+--               heating_observations_daily hält pro Tag und Raum Anzahl und Summen und
+--               wird per Trigger bei jedem INSERT/DELETE mitgeführt; Durchschnitte
+--               ergeben sich als Summe / Anzahl der Nicht-NULL-Werte (wie AVG).
+--               room_name '' steht für Beobachtungen ohne Raum (NULL ist als
+--               Primärschlüssel-Teil nicht eindeutig).
+
+CREATE TABLE IF NOT EXISTS heating_observations_daily (
+    day TEXT NOT NULL,
+    room_name TEXT NOT NULL,
+    observations INTEGER NOT NULL DEFAULT 0,
+    heating_count INTEGER NOT NULL DEFAULT 0,
+    temp_sum REAL NOT NULL DEFAULT 0,
+    temp_count INTEGER NOT NULL DEFAULT 0,
+    target_sum REAL NOT NULL DEFAULT 0,
+    target_count INTEGER NOT NULL DEFAULT 0,
+    outdoor_sum REAL NOT NULL DEFAULT 0,
+    outdoor_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, room_name)
+) WITHOUT ROWID;
+
+-- Einmalige Initialisierung aus den vorhandenen Beobachtungen
+INSERT OR REPLACE INTO heating_observations_daily
+(day, room_name, observations, heating_count, temp_sum, temp_count,
+ target_sum, target_count, outdoor_sum, outdoor_count)
+SELECT
+    date(timestamp),
+    COALESCE(room_name, ''),
+    COUNT(*),
+    SUM(is_heating = 1),
+    TOTAL(current_temp),
+    COUNT(current_temp),
+    TOTAL(target_temp),
+    COUNT(target_temp),
+    TOTAL(outdoor_temp),
+    COUNT(outdoor_temp)
+FROM heating_observations
+GROUP BY date(timestamp), COALESCE(room_name, '');
+
+CREATE TRIGGER IF NOT EXISTS trg_heating_observations_daily_insert
+AFTER INSERT ON heating_observations
+BEGIN
+    INSERT INTO heating_observations_daily
+    (day, room_name, observations, heating_count, temp_sum, temp_count,
+     target_sum, target_count, outdoor_sum, outdoor_count)
+    VALUES (
+        date(NEW.timestamp),
+        COALESCE(NEW.room_name, ''),
+        1,
+        NEW.is_heating = 1,
+        COALESCE(NEW.current_temp, 0),
+        NEW.current_temp IS NOT NULL,
+        COALESCE(NEW.target_temp, 0),
+        NEW.target_temp IS NOT NULL,
+        COALESCE(NEW.outdoor_temp, 0),
+        NEW.outdoor_temp IS NOT NULL
+    )
+    ON CONFLICT (day, room_name) DO UPDATE SET
+        observations = observations + 1,
+        heating_count = heating_count + excluded.heating_count,
+        temp_sum = temp_sum + excluded.temp_sum,
+        temp_count = temp_count + excluded.temp_count,
+        target_sum = target_sum + excluded.target_sum,
+        target_count = target_count + excluded.target_count,
+        outdoor_sum = outdoor_sum + excluded.outdoor_sum,
+        outdoor_count = outdoor_count + excluded.outdoor_count;
+END;
+
+-- Retention-Löschungen (Database._delete_older_than) ziehen die Werte wieder ab
+CREATE TRIGGER IF NOT EXISTS trg_heating_observations_daily_delete
+AFTER DELETE ON heating_observations
+BEGIN
+    UPDATE heating_observations_daily
+    SET observations = observations - 1,
+        heating_count = heating_count - (OLD.is_heating = 1),
+        temp_sum = temp_sum - COALESCE(OLD.current_temp, 0),
+        temp_count = temp_count - (OLD.current_temp IS NOT NULL),
+        target_sum = target_sum - COALESCE(OLD.target_temp, 0),
+        target_count = target_count - (OLD.target_temp IS NOT NULL),
+        outdoor_sum = outdoor_sum - COALESCE(OLD.outdoor_temp, 0),
+        outdoor_count = outdoor_count - (OLD.outdoor_temp IS NOT NULL)
+    WHERE day = date(OLD.timestamp) AND room_name = COALESCE(OLD.room_name, '');
+
+    DELETE FROM heating_observations_daily
+    WHERE day = date(OLD.timestamp) AND room_name = COALESCE(OLD.room_name, '')
+        AND observations <= 0;
+END;
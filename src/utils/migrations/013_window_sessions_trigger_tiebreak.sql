@@ -0,0 +1,31 @@
+-- Migration 013: Fenster-Session-Trigger bei gleichen Zeitstempeln
+-- Erstellt: 2025-11-17
+-- Beschreibung: trg_window_open_sessions suchte die vorherige Beobachtung eines Geräts
+--               nur über timestamp < NEW.timestamp. Mehrere Beobachtungen mit gleichem
+--               Zeitstempel (z.B. aus einem gepufferten Flush) sahen sich dadurch nicht
+--               gegenseitig und legten doppelte offene Sessions an. Die Reihenfolge ist
+--               jetzt (timestamp, id).
+
+DROP TRIGGER IF EXISTS trg_window_open_sessions;
+
+CREATE TRIGGER IF NOT EXISTS trg_window_open_sessions
+AFTER INSERT ON window_observations
+WHEN NEW.is_open != COALESCE((
+    SELECT is_open FROM window_observations
+    WHERE device_id = NEW.device_id
+        AND (timestamp < NEW.timestamp OR (timestamp = NEW.timestamp AND id < NEW.id))
+    ORDER BY timestamp DESC, id DESC
+    LIMIT 1
+), 0)
+BEGIN
+    UPDATE window_open_sessions
+    SET closed_at = NEW.timestamp,
+        duration_minutes = (strftime('%s', NEW.timestamp) - strftime('%s', opened_at)) / 60
+    WHERE NEW.is_open = 0
+        AND device_id = NEW.device_id
+        AND closed_at IS NULL;
+
+    INSERT INTO window_open_sessions (device_id, device_name, room_name, opened_at)
+    SELECT NEW.device_id, NEW.device_name, NEW.room_name, NEW.timestamp
+    WHERE NEW.is_open = 1;
+END;
@@ -2,12 +2,18 @@
 Migration Manager für automatische Datenbank-Schema-Updates
 """
 
+import re
 import sqlite3
+from functools import cached_property
 from pathlib import Path
 from typing import List, Tuple
 from loguru import logger
 
 
+# Dateiname ohne Endung: "<VERSION>_<NAME>", z.B. "001_add_continuous_measurements"
+MIGRATION_FILENAME_PATTERN = re.compile(r'^(\d+)_(.+)$')
+
+
 class MigrationManager:
     """
     Verwaltet Datenbank-Migrationen
@@ -15,6 +21,7 @@ class MigrationManager:
     - Trackt ausgeführte Migrationen in schema_migrations Tabelle
     - Führt neue Migrationen automatisch beim Start aus
     - Idempotent: Kann mehrfach ausgeführt werden ohne Probleme
+    - Eine Verbindung für die gesamte Lebensdauer (close() bzw. with-Block)
     """
 
     def __init__(self, db_path: str):
@@ -23,34 +30,34 @@ class MigrationManager:
             db_path: Pfad zur SQLite-Datenbank
         """
         self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
         self._ensure_migrations_table()
 
+    def close(self):
+        """Schließt die Verbindung des Managers"""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _ensure_migrations_table(self):
         """Erstellt die schema_migrations Tabelle falls noch nicht vorhanden"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS schema_migrations (
-                version INTEGER PRIMARY KEY,
-                name TEXT NOT NULL,
-                applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        conn.commit()
-        conn.close()
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
 
     def get_applied_migrations(self) -> List[int]:
         """Gibt Liste der bereits angewendeten Migrations-Versionen zurück"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
-        versions = [row[0] for row in cursor.fetchall()]
-
-        conn.close()
-        return versions
+        cursor = self._conn.execute("SELECT version FROM schema_migrations ORDER BY version")
+        return [row[0] for row in cursor.fetchall()]
 
     def get_pending_migrations(self) -> List[Tuple[int, str, str]]:
         """
@@ -60,35 +67,32 @@ class MigrationManager:
             List of (version, name, sql) tuples
         """
         applied = set(self.get_applied_migrations())
-        migrations_dir = Path(__file__).parent
-        pending = []
+
+        # SQL nur für noch nicht angewendete Migrationen lesen
+        return [
+            (version, name, path.read_text())
+            for version, name, path in self._available_migrations
+            if version not in applied
+        ]
+
+    @cached_property
+    def _available_migrations(self) -> List[Tuple[int, str, Path]]:
+        """Alle Migrations-Dateien als (version, name, path), nach Version sortiert (einmal pro Instanz)"""
+        migrations = []
 
         # Finde alle Migrations-Dateien
-        for migration_file in sorted(migrations_dir.glob('[0-9]*.sql')):
+        for migration_file in Path(__file__).parent.glob('[0-9]*.sql'):
             # Parse Version aus Dateiname (z.B. "001_add_continuous_measurements.sql")
-            parts = migration_file.stem.split('_', 1)
-            if len(parts) != 2:
+            match = MIGRATION_FILENAME_PATTERN.match(migration_file.stem)
+            if not match:
                 logger.warning(f"Invalid migration filename: {migration_file.name}")
                 continue
 
-            try:
-                version = int(parts[0])
-                name = parts[1]
-            except ValueError:
-                logger.warning(f"Invalid migration version in: {migration_file.name}")
-                continue
-
-            # Prüfe ob bereits angewendet
-            if version in applied:
-                continue
-
-            # Lese SQL
-            sql = migration_file.read_text()
-            pending.append((version, name, sql))
+            migrations.append((int(match.group(1)), match.group(2), migration_file))
 
         # Sortiere nach Version
-        pending.sort(key=lambda x: x[0])
-        return pending
+        migrations.sort(key=lambda x: x[0])
+        return migrations
 
     def apply_migration(self, version: int, name: str, sql: str) -> bool:
         """
@@ -102,31 +106,28 @@ class MigrationManager:
         Returns:
             True wenn erfolgreich, False bei Fehler
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            # Führe Migration in Transaktion aus
-            cursor.executescript(sql)
+            # executescript() committet vorher und läuft sonst im Autocommit (ein Commit
+            # pro Statement) - mit explizitem BEGIN bleibt die ganze Migration inkl.
+            # Eintrag in schema_migrations eine Transaktion, FK-Prüfung erst beim COMMIT
+            self._conn.executescript(f"BEGIN;\nPRAGMA defer_foreign_keys = ON;\n{sql}\n;")
 
             # Markiere als angewendet
-            cursor.execute(
+            self._conn.execute(
                 "INSERT INTO schema_migrations (version, name) VALUES (?, ?)",
                 (version, name)
             )
+            self._conn.commit()
 
-            conn.commit()
             logger.info(f"✅ Applied migration {version:03d}: {name}")
             return True
 
         except Exception as e:
-            conn.rollback()
+            if self._conn.in_transaction:
+                self._conn.rollback()
             logger.error(f"❌ Failed to apply migration {version:03d} ({name}): {e}")
             return False
 
-        finally:
-            conn.close()
-
     def run_migrations(self) -> int:
         """
         Führt alle ausstehenden Migrationen aus
@@ -162,17 +163,11 @@ class MigrationManager:
 
     def get_migration_history(self) -> List[dict]:
         """Gibt die komplette Migrations-Historie zurück"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        cursor = self._conn.execute("""
             SELECT version, name, applied_at
             FROM schema_migrations
             ORDER BY version
         """)
 
-        history = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-
-        return history
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -8,10 +8,38 @@ Bietet einfache Methoden zum Abfragen von:
 - Außenhelligkeit
 """
 
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from loguru import logger
 from datetime import datetime
 import math
+import time
+
+
+# Sensor-Listen unter data_collection.sensors, die der Helper nutzt
+SENSOR_TYPES = ('motion', 'window', 'door', 'light', 'presence', 'humidity')
+
+# Wie lange ein geholter Sensor-State wiederverwendet wird (Sekunden) - deckt
+# mehrere Getter-Aufrufe innerhalb eines Entscheidungs-Durchlaufs ab
+STATE_CACHE_TTL = 0.25
+
+# Sensor-States (lowercase), die als aktiv gelten
+MOTION_ON_STATES = frozenset(('on', 'detected', 'true', '1', 'motion'))
+OPEN_STATES = frozenset(('on', 'open', 'true', '1'))
+PRESENT_STATES = frozenset(('on', 'home', 'present', 'true', '1'))
+
+# Wie lange zeitbasierte Schätzungen (Helligkeit, Preis-Level) gelten (Sekunden)
+TIME_ESTIMATE_CACHE_TTL = 60.0
+
+# Wie lange Energiepreis-/Wetterdaten aus der DB wiederverwendet werden (Sekunden)
+EXTERNAL_DATA_CACHE_TTL = 60.0
+
+
+def _normalize_state(state: Dict) -> str:
+    """Gibt den 'state'-Wert eines State-Dicts in Kleinschreibung zurück ('' wenn nicht vorhanden)"""
+    value = state.get('state')
+    if type(value) is str:
+        return value.lower()
+    return '' if value is None else str(value).lower()
 
 
 class SensorHelper:
@@ -27,6 +55,183 @@ class SensorHelper:
         self.config = engine.config if engine else None
         self.db = engine.db if engine else None
 
+        # Sensor-IDs je Typ aus der Config, neu gelesen wenn sich config.version ändert
+        self._sensors: Dict[str, Tuple[str, ...]] = {}
+        # Dieselben IDs in Kleinschreibung (gleiche Reihenfolge) für Teilstring-Filter
+        self._sensors_lc: Dict[str, Tuple[str, ...]] = {}
+        self._config_version = None
+        # (Typ, raum_name.lower()) -> Sensor-IDs, deren ID den Raumnamen enthält
+        # (Typ 'window+door': Fenster und Türen zusammen, '' = alle Räume)
+        self._sensors_by_room: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        # sensor_id -> (time.monotonic() beim Abruf, state_data oder None)
+        self._state_cache: Dict[str, Tuple[float, Optional[Dict]]] = {}
+        # Ergebnis von get_window_open() ohne Raum: (time.monotonic(), offen)
+        self._any_window_open: Optional[Tuple[float, bool]] = None
+        # Zeitbasierte Schätzungen: (time.monotonic(), Wert)
+        self._brightness_estimate: Optional[Tuple[float, float]] = None
+        self._price_level_estimate: Optional[Tuple[float, int]] = None
+        # data_type -> (time.monotonic(), Ergebnis von db.get_latest_external_data)
+        self._external_cache: Dict[str, Tuple[float, Optional[Dict]]] = {}
+        # (Wetterdaten, aus denen der Faktor berechnet wurde, Helligkeits-Faktor)
+        self._cloud_factor: Tuple[Optional[Dict], float] = (None, 1.0)
+
+    def _sensor_ids(self, sensor_type: str) -> Tuple[str, ...]:
+        """
+        Gibt die konfigurierten Sensor-IDs eines Typs zurück
+
+        Die Listen werden einmal aus der Config gelesen und erst nach einem
+        Config-Update (config.version) erneut aufgelöst.
+        """
+        version = getattr(self.config, 'version', 0)
+        if version != self._config_version:
+            self._sensors = {
+                t: tuple(self.config.get(f'data_collection.sensors.{t}', None) or ())
+                for t in SENSOR_TYPES
+            }
+            self._sensors_lc = {
+                t: tuple(s.lower() for s in ids)
+                for t, ids in self._sensors.items()
+            }
+            self._sensors_by_room = {}
+            self._config_version = version
+
+        return self._sensors[sensor_type]
+
+    def _room_sensor_ids(self, sensor_type: str, room_name: Optional[str]) -> Tuple[str, ...]:
+        """
+        Gibt die Sensor-IDs eines Typs zurück, deren ID den Raumnamen enthält
+
+        Der Filter (Teilstring, ohne Groß-/Kleinschreibung) wird pro Raum nur
+        einmal berechnet. Ohne room_name werden alle Sensoren des Typs geliefert.
+        """
+        sensors = self._sensor_ids(sensor_type)
+        if not room_name:
+            return sensors
+
+        key = (sensor_type, room_name.lower())
+        room_sensors = self._sensors_by_room.get(key)
+        if room_sensors is None:
+            room = key[1]
+            room_sensors = tuple(
+                s for s, s_lc in zip(sensors, self._sensors_lc[sensor_type])
+                if room in s_lc
+            )
+            self._sensors_by_room[key] = room_sensors
+
+        return room_sensors
+
+    def _opening_sensor_ids(self, room_name: Optional[str]) -> Tuple[str, ...]:
+        """Gibt Fenster- und Tür-Sensoren (optional gefiltert nach Raum) als ein Tupel zurück"""
+        windows = self._room_sensor_ids('window', room_name)
+        doors = self._room_sensor_ids('door', room_name)
+
+        key = ('window+door', room_name.lower() if room_name else '')
+        sensors = self._sensors_by_room.get(key)
+        if sensors is None:
+            sensors = windows + doors
+            self._sensors_by_room[key] = sensors
+
+        return sensors
+
+    def _get_states(self, sensor_ids: Tuple[str, ...]) -> Dict[str, Dict]:
+        """
+        Holt die States mehrerer Sensoren mit einem Plattform-Aufruf
+
+        States, die jünger als STATE_CACHE_TTL sind, werden wiederverwendet;
+        nur die übrigen Sensoren werden bei der Plattform abgefragt.
+
+        Returns:
+            Dictionary: sensor_id -> state_data (fehlende Sensoren nicht enthalten)
+        """
+        if not sensor_ids:
+            return {}
+
+        now = time.monotonic()
+        cache = self._state_cache
+        stale = tuple(
+            sid for sid in sensor_ids
+            if sid not in cache or now - cache[sid][0] >= STATE_CACHE_TTL
+        )
+
+        if len(stale) == 1:
+            # Einzelner Sensor: gezielte Abfrage statt aller States
+            cache[stale[0]] = (now, self.platform.get_state(stale[0]))
+        elif stale:
+            fetched = self.platform.get_states(list(stale))
+            for sid in stale:
+                cache[sid] = (now, fetched.get(sid))
+
+        return {sid: cache[sid][1] for sid in sensor_ids if cache[sid][1]}
+
+    def invalidate_states(self, sensor_id: Optional[str] = None):
+        """
+        Verwirft zwischengespeicherte Sensor-States
+
+        Args:
+            sensor_id: Optional - nur diesen Sensor, sonst alle
+        """
+        if sensor_id is None:
+            self._state_cache.clear()
+        else:
+            self._state_cache.pop(sensor_id, None)
+        self._any_window_open = None
+
+    def _get_external_data(self, data_type: str) -> Optional[Dict]:
+        """
+        Holt die neuesten externen Daten eines Typs (z.B. 'energy_price', 'weather')
+
+        Das DB-Ergebnis wird EXTERNAL_DATA_CACHE_TTL Sekunden wiederverwendet.
+        """
+        now = time.monotonic()
+        cached = self._external_cache.get(data_type)
+        if cached is not None and now - cached[0] < EXTERNAL_DATA_CACHE_TTL:
+            return cached[1]
+
+        data = self.db.get_latest_external_data(data_type)
+        self._external_cache[data_type] = (now, data)
+        return data
+
+    def invalidate_external_data(self, data_type: Optional[str] = None):
+        """
+        Verwirft zwischengespeicherte externe Daten (z.B. nach neuem Preis-/Wetter-Update)
+
+        Args:
+            data_type: Optional - nur diesen Typ, sonst alle
+        """
+        if data_type is None:
+            self._external_cache.clear()
+        else:
+            self._external_cache.pop(data_type, None)
+
+    def _weather_cloud_factor(self) -> float:
+        """
+        Helligkeits-Faktor aus der Bewölkung der letzten Wetterdaten
+
+        Weniger Wolken = mehr Helligkeit: 1 - clouds/200 (0-100% Bewölkung).
+        Wird nur neu berechnet, wenn neue Wetterdaten geladen wurden.
+
+        Returns:
+            Faktor zwischen 0.5 und 1.0 (1.0 ohne Wetter-/Bewölkungsdaten)
+        """
+        if not self.db:
+            return 1.0
+
+        weather_data = self._get_external_data('weather')
+        source, factor = self._cloud_factor
+        if weather_data is source:
+            return factor
+
+        factor = 1.0
+        if weather_data and 'data' in weather_data:
+            data = weather_data['data']
+
+            # UV-Index oder Cloud-Cover kann als Proxy dienen
+            if 'clouds' in data:
+                factor = 1 - float(data['clouds']) / 200
+
+        self._cloud_factor = (weather_data, factor)
+        return factor
+
     def get_motion_detected(self, room_name: Optional[str] = None) -> bool:
         """
         Prüft ob Bewegung erkannt wurde
@@ -42,27 +247,22 @@ class SensorHelper:
 
         try:
             # Hole Motion-Sensoren aus Config
-            motion_sensors = self.config.get('data_collection.sensors.motion', [])
-
-            if not motion_sensors:
+            if not self._sensor_ids('motion'):
                 logger.debug("No motion sensors configured")
                 return False
 
             # Filter nach Raum-Name falls angegeben
-            if room_name:
-                motion_sensors = [
-                    s for s in motion_sensors
-                    if room_name.lower() in s.lower()
-                ]
+            motion_sensors = self._room_sensor_ids('motion', room_name)
 
             # Prüfe jeden Motion-Sensor
+            states = self._get_states(motion_sensors)
             for sensor_id in motion_sensors:
-                state = self.platform.get_state(sensor_id)
+                state = states.get(sensor_id)
                 if state:
-                    sensor_state = str(state.get('state', '')).lower()
+                    sensor_state = _normalize_state(state)
 
                     # Motion-Sensor kann verschiedene States haben
-                    if sensor_state in ['on', 'detected', 'true', '1', 'motion']:
+                    if sensor_state in MOTION_ON_STATES:
                         logger.debug(f"Motion detected: {sensor_id}")
                         return True
 
@@ -87,33 +287,38 @@ class SensorHelper:
 
         try:
             # Hole Window/Door-Sensoren aus Config
-            window_sensors = self.config.get('data_collection.sensors.window', [])
-            door_sensors = self.config.get('data_collection.sensors.door', [])
-            all_sensors = window_sensors + door_sensors
-
-            if not all_sensors:
+            if not self._sensor_ids('window') and not self._sensor_ids('door'):
                 logger.debug("No window/door sensors configured")
                 return False
 
+            # Gesamtstatus aller Fenster/Türen wiederverwenden, solange die States gültig sind
+            now = time.monotonic()
+            if not room_name and self._any_window_open is not None:
+                checked_at, any_open = self._any_window_open
+                if now - checked_at < STATE_CACHE_TTL:
+                    return any_open
+
             # Filter nach Raum-Name falls angegeben
-            if room_name:
-                all_sensors = [
-                    s for s in all_sensors
-                    if room_name.lower() in s.lower()
-                ]
+            all_sensors = self._opening_sensor_ids(room_name)
 
             # Prüfe jeden Sensor
+            is_open = False
+            states = self._get_states(all_sensors)
             for sensor_id in all_sensors:
-                state = self.platform.get_state(sensor_id)
+                state = states.get(sensor_id)
                 if state:
-                    sensor_state = str(state.get('state', '')).lower()
+                    sensor_state = _normalize_state(state)
 
                     # Window/Door offen
-                    if sensor_state in ['on', 'open', 'true', '1']:
+                    if sensor_state in OPEN_STATES:
                         logger.debug(f"Window/Door open: {sensor_id}")
-                        return True
+                        is_open = True
+                        break
 
-            return False
+            if not room_name:
+                self._any_window_open = (now, is_open)
+
+            return is_open
 
         except Exception as e:
             logger.warning(f"Error checking window/door sensors: {e}")
@@ -131,7 +336,7 @@ class SensorHelper:
 
         try:
             # Versuche aktuelle Energiepreise aus DB zu holen
-            energy_data = self.db.get_latest_external_data('energy_price')
+            energy_data = self._get_external_data('energy_price')
 
             if energy_data and 'data' in energy_data:
                 data = energy_data.get('data', {})
@@ -154,14 +359,7 @@ class SensorHelper:
                         return 3  # Teuer
 
             # Fallback: Zeit-basierte Schätzung
-            # (meist günstiger nachts, teurer abends)
-            hour = datetime.now().hour
-            if 0 <= hour < 6:  # Nachts
-                return 1
-            elif 17 <= hour < 21:  # Abends (Peak)
-                return 3
-            else:
-                return 2
+            return self._estimate_price_level_from_time()
 
         except Exception as e:
             logger.warning(f"Error getting energy price level: {e}")
@@ -179,69 +377,86 @@ class SensorHelper:
 
         try:
             # Versuche echten Outdoor-Brightness-Sensor
-            light_sensors = self.config.get('data_collection.sensors.light', [])
-
-            for sensor_id in light_sensors:
-                # Suche nach Outdoor/Outside Sensoren
-                if 'outdoor' in sensor_id.lower() or 'outside' in sensor_id.lower():
-                    state = self.platform.get_state(sensor_id)
-                    if state and 'state' in state:
-                        try:
-                            return float(state['state'])
-                        except (ValueError, TypeError):
-                            pass
-
-            # Fallback: Von Wetterstation oder aus DB
-            if self.db:
-                weather_data = self.db.get_latest_external_data('weather')
-                if weather_data and 'data' in weather_data:
-                    data = weather_data['data']
-
-                    # UV-Index oder Cloud-Cover kann als Proxy dienen
-                    if 'clouds' in data:
-                        clouds = float(data['clouds'])  # 0-100%
-                        # Weniger Wolken = mehr Helligkeit
-                        base_brightness = self._estimate_brightness_from_time()
-                        return base_brightness * (1 - clouds / 200)  # Reduziere bei Wolken
-
-            # Fallback: Schätzung basierend auf Tageszeit
-            return self._estimate_brightness_from_time()
+            light_sensors = self._sensor_ids('light')
+
+            # Suche nach Outdoor/Outside Sensoren
+            outdoor_sensors = tuple(
+                s for s, s_lc in zip(light_sensors, self._sensors_lc['light'])
+                if 'outdoor' in s_lc or 'outside' in s_lc
+            )
+
+            states = self._get_states(outdoor_sensors)
+            for sensor_id in outdoor_sensors:
+                state = states.get(sensor_id)
+                if state and 'state' in state:
+                    try:
+                        return float(state['state'])
+                    except (ValueError, TypeError):
+                        pass
+
+            # Fallback: Schätzung basierend auf Tageszeit, reduziert bei Wolken (Wetter aus DB)
+            return self._estimate_brightness_from_time() * self._weather_cloud_factor()
 
         except Exception as e:
             logger.warning(f"Error getting outdoor brightness: {e}")
             return self._estimate_brightness_from_time()
 
+    def _estimate_price_level_from_time(self) -> int:
+        """
+        Schätzt das Energiepreis-Level anhand der Uhrzeit
+        (meist günstiger nachts, teurer abends)
+
+        Returns:
+            1 = günstig, 2 = mittel, 3 = teuer
+        """
+        now_mono = time.monotonic()
+        if self._price_level_estimate is not None:
+            estimated_at, level = self._price_level_estimate
+            if now_mono - estimated_at < TIME_ESTIMATE_CACHE_TTL:
+                return level
+
+        hour = datetime.now().hour
+        if 0 <= hour < 6:  # Nachts
+            level = 1
+        elif 17 <= hour < 21:  # Abends (Peak)
+            level = 3
+        else:
+            level = 2
+
+        self._price_level_estimate = (now_mono, level)
+        return level
+
     def _estimate_brightness_from_time(self) -> float:
         """
         Schätzt Helligkeit basierend auf Tageszeit und Sonnenstand
 
+        Das Ergebnis wird TIME_ESTIMATE_CACHE_TTL Sekunden wiederverwendet.
+
         Returns:
             Geschätzte Helligkeit in Lux (grob)
         """
+        now_mono = time.monotonic()
+        if self._brightness_estimate is not None:
+            estimated_at, brightness = self._brightness_estimate
+            if now_mono - estimated_at < TIME_ESTIMATE_CACHE_TTL:
+                return brightness
+
         now = datetime.now()
         hour = now.hour
         minute = now.minute
         time_decimal = hour + minute / 60.0
 
-        # Sonnenaufgang ca. 6:00, Sonnenuntergang ca. 20:00 (grobe Schätzung)
-        sunrise = 6.0
-        sunset = 20.0
-        noon = 13.0
+        # Sonnenaufgang ca. 6:00, Sonnenuntergang ca. 20:00 (grobe Schätzung):
+        # ein Sinus-Bogen über den Tag mit Maximum um 13:00 - entspricht dem
+        # Sinus-Anstieg bis Mittag und dem Kosinus-Abfall danach
+        day_progress = (time_decimal - 6.0) / 14.0
+        daylight = math.sin(math.pi * day_progress) if 0.0 < day_progress < 1.0 else 0.0
 
-        if time_decimal < sunrise or time_decimal > sunset:
-            # Nacht: sehr dunkel
-            return 10.0  # ~10 Lux (Mondlicht)
+        # Nachts ~10 Lux (Mondlicht)
+        brightness = 10.0 + (50000 - 10) * daylight
 
-        elif sunrise <= time_decimal <= noon:
-            # Morgens: ansteigend
-            progress = (time_decimal - sunrise) / (noon - sunrise)
-            # Sinus-Kurve für natürlicheren Verlauf
-            return 10 + (50000 - 10) * math.sin(progress * math.pi / 2)
-
-        else:  # noon < time_decimal <= sunset
-            # Nachmittags/Abends: absteigend
-            progress = (time_decimal - noon) / (sunset - noon)
-            return 10 + (50000 - 10) * math.cos(progress * math.pi / 2)
+        self._brightness_estimate = (now_mono, brightness)
+        return brightness
 
     def get_presence_in_room(self, room_name: str) -> bool:
         """
@@ -264,17 +479,14 @@ class SensorHelper:
                 return True
 
             # 2. Prüfe dedizierte Presence-Sensoren
-            presence_sensors = self.config.get('data_collection.sensors.presence', [])
-            room_sensors = [
-                s for s in presence_sensors
-                if room_name.lower() in s.lower()
-            ]
+            room_sensors = self._room_sensor_ids('presence', room_name)
 
+            states = self._get_states(room_sensors)
             for sensor_id in room_sensors:
-                state = self.platform.get_state(sensor_id)
+                state = states.get(sensor_id)
                 if state:
-                    sensor_state = str(state.get('state', '')).lower()
-                    if sensor_state in ['on', 'home', 'present', 'true', '1']:
+                    sensor_state = _normalize_state(state)
+                    if sensor_state in PRESENT_STATES:
                         return True
 
             return False
@@ -298,17 +510,12 @@ class SensorHelper:
 
         try:
             # Suche nach Humidity-Sensoren
-            humidity_sensors = self.config.get('data_collection.sensors.humidity', [])
-
-            if room_name:
-                # Filter nach Raum
-                humidity_sensors = [
-                    s for s in humidity_sensors
-                    if room_name.lower() in s.lower()
-                ]
+            # Filter nach Raum falls angegeben
+            humidity_sensors = self._room_sensor_ids('humidity', room_name)
 
+            states = self._get_states(humidity_sensors)
             for sensor_id in humidity_sensors:
-                state = self.platform.get_state(sensor_id)
+                state = states.get(sensor_id)
                 if state and 'state' in state:
                     try:
                         return float(state['state'])
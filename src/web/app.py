@@ -3,16 +3,24 @@ Flask Web Interface für KI-System
 Dashboard, Einstellungen, Geräte-Übersicht, KI-Vorhersagen
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, current_app
 from flask_cors import CORS
 from pathlib import Path
 from loguru import logger
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import subprocess
 import os
 import json
-
+import threading
+import time
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 # Füge src zum Python-Path hinzu
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
@@ -30,6 +38,101 @@ from src.background.database_maintenance import DatabaseMaintenanceJob
 from src.utils.database import Database
 
 
+# Gerätetypen (Domains) für Geräteliste und Zuordnungs-Sync
+DEVICE_DOMAINS = ('light', 'climate', 'switch', 'sensor')
+
+# Threads für parallele Plattform-Abfragen (eine pro Domain)
+_platform_executor = ThreadPoolExecutor(max_workers=len(DEVICE_DOMAINS), thread_name_prefix='platform-fetch')
+
+
+def _fetch_domain_states(platform, domains=DEVICE_DOMAINS):
+    """
+    Startet get_all_entities() + get_states() für alle Domains parallel
+
+    Returns:
+        Dictionary: domain -> Future mit den States (entity_id -> state_data);
+        Fehler einer Domain kommen erst bei future.result()
+    """
+    return {
+        domain: _platform_executor.submit(
+            lambda d: platform.get_states(platform.get_all_entities(d)), domain
+        )
+        for domain in domains
+    }
+
+
+# Geparste JSON-Dateien aus data/: Pfad -> ((mtime_ns, Größe), Inhalt)
+_json_file_cache = {}
+
+
+def _read_json_file(path: Path):
+    """Liest eine JSON-Datei (mit orjson falls verfügbar)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(path.read_bytes())
+
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _read_json_file_cached(path: Path):
+    """
+    Wie _read_json_file(), parst die Datei aber nur neu wenn sich mtime oder Größe geändert haben
+
+    Die Größe fängt Änderungen ab, die bei grober mtime-Auflösung des
+    Dateisystems innerhalb desselben Zeitstempels landen.
+
+    Das Ergebnis wird zwischen Requests geteilt und darf nicht verändert werden
+    (für GET-Handler, die es nur ausliefern).
+    """
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _json_file_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    data = _read_json_file(path)
+    _json_file_cache[path] = (key, data)
+    return data
+
+
+def _write_json_file(path: Path, data) -> None:
+    """
+    Schreibt eine JSON-Datei mit Einrückung 2 (mit orjson falls verfügbar)
+
+    data wird danach von _read_json_file_cached() geliefert und darf vom
+    Aufrufer nicht mehr verändert werden.
+    """
+    if ORJSON_AVAILABLE:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    stat = path.stat()
+    _json_file_cache[path] = ((stat.st_mtime_ns, stat.st_size), data)
+
+
+def _json_response(payload):
+    """
+    Wie jsonify(payload), serialisiert aber mit orjson falls verfügbar
+
+    Sortierte Keys und datetime-Werte über den Flask-Default wie bei jsonify;
+    numpy-Werte werden direkt serialisiert.
+    """
+    if not ORJSON_AVAILABLE:
+        return jsonify(payload)
+
+    return current_app.response_class(
+        orjson.dumps(
+            payload,
+            default=current_app.json.default,
+            option=(orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+                    | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY)
+        ),
+        mimetype='application/json'
+    )
+
+
 class WebInterface:
     """Web Interface für das KI-System"""
 
@@ -338,125 +441,160 @@ class WebInterface:
 
         # === API Endpunkte ===
 
+        # Cache für fertig serialisierte API-Antworten: key -> (Ablauf time.monotonic(), JSON-Bytes)
+        # (Dashboard pollt regelmäßig, die Daten kommen von der Plattform)
+        response_cache = {}
+        response_cache_lock = threading.Lock()
+
+        def cached_json_response(key, ttl, build_payload, cacheable=None):
+            """
+            Liefert die gecachte Antwort für key oder baut sie mit build_payload() neu
+
+            cacheable(payload) -> False: Antwort ausliefern, aber nicht cachen
+            (z.B. unvollständige Daten nach einem Plattform-Fehler)
+            """
+            with response_cache_lock:
+                cached = response_cache.get(key)
+            if cached and time.monotonic() < cached[0]:
+                return self.app.response_class(cached[1], mimetype='application/json')
+
+            payload = build_payload()
+            response = _json_response(payload)
+            if cacheable is not None and not cacheable(payload):
+                return response
+            with response_cache_lock:
+                response_cache[key] = (time.monotonic() + ttl, response.get_data())
+            return response
+
+        def build_status():
+            """Baut die Antwort für /api/status"""
+            state = self.engine.collect_current_state()
+
+            # Hole Wettervorhersage
+            forecast = None
+            try:
+                forecast_data = self.engine.weather.get_forecast()
+                if forecast_data:
+                    forecast = forecast_data.get('forecasts', [])
+            except Exception as e:
+                logger.warning(f"Could not get weather forecast: {e}")
+
+            return {
+                'timestamp': state.get('timestamp'),
+                'temperature': {
+                    'indoor': state.get('current_temperature'),
+                    'outdoor': state.get('outdoor_temperature'),
+                    'feels_like': state.get('feels_like'),
+                    'humidity': state.get('humidity')
+                },
+                'environment': {
+                    'brightness': state.get('brightness'),
+                    'motion_detected': state.get('motion_detected'),
+                    'weather': state.get('weather_condition'),
+                    'weather_description': state.get('weather_description')
+                },
+                'weather': {
+                    'condition': state.get('weather_condition'),
+                    'description': state.get('weather_description'),
+                    'temperature': state.get('outdoor_temperature'),
+                    'feels_like': state.get('feels_like'),
+                    'humidity': state.get('humidity'),
+                    'wind_speed': state.get('wind_speed'),
+                    'pressure': state.get('pressure'),
+                    'clouds': state.get('clouds'),
+                    'forecast': forecast
+                },
+                'energy': {
+                    'price': state.get('energy_price'),
+                    'price_level': state.get('energy_price_level'),
+                    'consumption': state.get('power_consumption')
+                },
+                'mold_prevention': self._get_mold_prevention_status()
+            }
+
         @self.app.route('/api/status')
         def api_status():
-            """API: Aktueller System-Status"""
+            """API: Aktueller System-Status (5 Sekunden gecached)"""
             if not self.engine:
                 return jsonify({'error': 'Engine not initialized'}), 500
 
             try:
-                state = self.engine.collect_current_state()
+                return cached_json_response('status', 5, build_status)
+            except Exception as e:
+                logger.error(f"Error getting status: {e}")
+                return jsonify({'error': str(e)}), 500
+
+        def build_devices():
+            """Baut die Antwort für /api/devices"""
+            # Hole alle Geräte vom Platform Collector
+            platform = self.engine.platform
+
+            devices = []
+            failed_domains = []
 
-                # Hole Wettervorhersage
-                forecast = None
+            # Hole verschiedene Gerätetypen (parallel, Reihenfolge bleibt je Domain)
+            for domain, states_future in _fetch_domain_states(platform).items():
                 try:
-                    forecast_data = self.engine.weather.get_forecast()
-                    if forecast_data:
-                        forecast = forecast_data.get('forecasts', [])
+                    states = states_future.result()
+
+                    for entity_id, state_data in states.items():
+                        device_data = {
+                            'id': entity_id,
+                            'entity_id': entity_id,
+                            'name': state_data.get('attributes', {}).get('friendly_name', entity_id),
+                            'domain': domain,
+                            'state': state_data.get('state'),
+                            'attributes': state_data.get('attributes', {}),
+                            'last_updated': state_data.get('last_updated')
+                        }
+
+                        # Zone/Raum für ALLE Gerätetypen
+                        zone = state_data.get('attributes', {}).get('zone')
+                        if zone:
+                            device_data['zone'] = zone
+
+                        # Für Climate/Heizgeräte: Extrahiere Temperaturen
+                        if domain == 'climate':
+                            capabilities = state_data.get('attributes', {}).get('capabilities', {})
+
+                            # Aktuelle Temperatur
+                            if 'measure_temperature' in capabilities:
+                                current_temp = capabilities['measure_temperature'].get('value')
+                                if current_temp is not None:
+                                    device_data['current_temperature'] = current_temp
+                                    if 'attributes' not in device_data:
+                                        device_data['attributes'] = {}
+                                    device_data['attributes']['current_temperature'] = current_temp
+
+                            # Zieltemperatur
+                            if 'target_temperature' in capabilities:
+                                target_temp = capabilities['target_temperature'].get('value')
+                                if target_temp is not None:
+                                    device_data['target_temperature'] = target_temp
+                                    if 'attributes' not in device_data:
+                                        device_data['attributes'] = {}
+                                    device_data['attributes']['temperature'] = target_temp
+
+                            # Capabilities Object für erweiterte Infos
+                            device_data['capabilitiesObj'] = capabilities
+
+                        devices.append(device_data)
                 except Exception as e:
-                    logger.warning(f"Could not get weather forecast: {e}")
+                    logger.warning(f"Error getting {domain} devices: {e}")
+                    failed_domains.append(domain)
 
-                return jsonify({
-                    'timestamp': state.get('timestamp'),
-                    'temperature': {
-                        'indoor': state.get('current_temperature'),
-                        'outdoor': state.get('outdoor_temperature'),
-                        'feels_like': state.get('feels_like'),
-                        'humidity': state.get('humidity')
-                    },
-                    'environment': {
-                        'brightness': state.get('brightness'),
-                        'motion_detected': state.get('motion_detected'),
-                        'weather': state.get('weather_condition'),
-                        'weather_description': state.get('weather_description')
-                    },
-                    'weather': {
-                        'condition': state.get('weather_condition'),
-                        'description': state.get('weather_description'),
-                        'temperature': state.get('outdoor_temperature'),
-                        'feels_like': state.get('feels_like'),
-                        'humidity': state.get('humidity'),
-                        'wind_speed': state.get('wind_speed'),
-                        'pressure': state.get('pressure'),
-                        'clouds': state.get('clouds'),
-                        'forecast': forecast
-                    },
-                    'energy': {
-                        'price': state.get('energy_price'),
-                        'price_level': state.get('energy_price_level'),
-                        'consumption': state.get('power_consumption')
-                    },
-                    'mold_prevention': self._get_mold_prevention_status()
-                })
-            except Exception as e:
-                logger.error(f"Error getting status: {e}")
-                return jsonify({'error': str(e)}), 500
+            return {'devices': devices, 'count': len(devices), 'failed_domains': failed_domains}
 
         @self.app.route('/api/devices')
         def api_devices():
-            """API: Liste aller Geräte"""
+            """API: Liste aller Geräte (15 Sekunden gecached)"""
             if not self.engine:
                 return jsonify({'error': 'Engine not initialized'}), 500
 
             try:
-                # Hole alle Geräte vom Platform Collector
-                platform = self.engine.platform
-
-                devices = []
-
-                # Hole verschiedene Gerätetypen
-                for domain in ['light', 'climate', 'switch', 'sensor']:
-                    try:
-                        entity_ids = platform.get_all_entities(domain)
-                        states = platform.get_states(entity_ids)
-
-                        for entity_id, state_data in states.items():
-                            device_data = {
-                                'id': entity_id,
-                                'entity_id': entity_id,
-                                'name': state_data.get('attributes', {}).get('friendly_name', entity_id),
-                                'domain': domain,
-                                'state': state_data.get('state'),
-                                'attributes': state_data.get('attributes', {}),
-                                'last_updated': state_data.get('last_updated')
-                            }
-
-                            # Zone/Raum für ALLE Gerätetypen
-                            zone = state_data.get('attributes', {}).get('zone')
-                            if zone:
-                                device_data['zone'] = zone
-
-                            # Für Climate/Heizgeräte: Extrahiere Temperaturen
-                            if domain == 'climate':
-                                capabilities = state_data.get('attributes', {}).get('capabilities', {})
-
-                                # Aktuelle Temperatur
-                                if 'measure_temperature' in capabilities:
-                                    current_temp = capabilities['measure_temperature'].get('value')
-                                    if current_temp is not None:
-                                        device_data['current_temperature'] = current_temp
-                                        if 'attributes' not in device_data:
-                                            device_data['attributes'] = {}
-                                        device_data['attributes']['current_temperature'] = current_temp
-
-                                # Zieltemperatur
-                                if 'target_temperature' in capabilities:
-                                    target_temp = capabilities['target_temperature'].get('value')
-                                    if target_temp is not None:
-                                        device_data['target_temperature'] = target_temp
-                                        if 'attributes' not in device_data:
-                                            device_data['attributes'] = {}
-                                        device_data['attributes']['temperature'] = target_temp
-
-                                # Capabilities Object für erweiterte Infos
-                                device_data['capabilitiesObj'] = capabilities
-
-                            devices.append(device_data)
-                    except Exception as e:
-                        logger.warning(f"Error getting {domain} devices: {e}")
-
-                return jsonify({'devices': devices, 'count': len(devices)})
-
+                # Unvollständige Liste (Domain fehlgeschlagen) nicht cachen, nächster Poll lädt neu
+                return cached_json_response('devices', 15, build_devices,
+                                            cacheable=lambda payload: not payload['failed_domains'])
             except Exception as e:
                 logger.error(f"Error getting devices: {e}")
                 return jsonify({'error': str(e)}), 500
@@ -483,6 +621,11 @@ class WebInterface:
                 else:
                     return jsonify({'error': 'Unknown action'}), 400
 
+                if result:
+                    # Geräteliste zeigt sonst bis zum Ablauf den alten Zustand
+                    with response_cache_lock:
+                        response_cache.pop('devices', None)
+
                 return jsonify({
                     'success': result,
                     'device_id': device_id,
@@ -637,7 +780,7 @@ class WebInterface:
                     }
                 }
 
-                return jsonify({
+                return _json_response({
                     'predictions': predictions,
                     'recommendations': recommendations,
                     'timestamp': datetime.now().isoformat()
@@ -1769,45 +1912,51 @@ class WebInterface:
                 logger.error(f"Error getting ventilation recommendations: {e}")
                 return jsonify({'error': str(e)}), 500
 
+        def build_available_sensors():
+            """Baut die Antwort für /api/sensors/available"""
+            # Hole alle Temperatur- und Luftfeuchtigkeit-Sensoren
+            temp_sensors = self.engine._get_all_temperature_sensors()
+            humidity_sensors = self.engine._get_all_humidity_sensors()
+
+            # Hole Device-Details (ein Plattform-Aufruf für alle Sensoren)
+            all_sensor_ids = list(dict.fromkeys([*temp_sensors, *humidity_sensors]))
+            states = self.engine.platform.get_states(all_sensor_ids) if all_sensor_ids else {}
+
+            temp_details = []
+            for sensor_id in temp_sensors:
+                state = states.get(sensor_id)
+                if state:
+                    temp_details.append({
+                        'id': sensor_id,
+                        'name': state.get('attributes', {}).get('friendly_name', sensor_id),
+                        'zone': state.get('attributes', {}).get('zone'),
+                        'current_value': self.engine._extract_temperature_value(state)
+                    })
+
+            humidity_details = []
+            for sensor_id in humidity_sensors:
+                state = states.get(sensor_id)
+                if state:
+                    humidity_details.append({
+                        'id': sensor_id,
+                        'name': state.get('attributes', {}).get('friendly_name', sensor_id),
+                        'zone': state.get('attributes', {}).get('zone'),
+                        'current_value': self.engine._extract_humidity_value(state)
+                    })
+
+            return {
+                'temperature_sensors': temp_details,
+                'humidity_sensors': humidity_details
+            }
+
         @self.app.route('/api/sensors/available', methods=['GET'])
         def api_get_available_sensors():
-            """API: Hole alle verfügbaren Sensoren"""
+            """API: Hole alle verfügbaren Sensoren (30 Sekunden gecached)"""
             if not self.engine:
                 return jsonify({'error': 'Engine not initialized'}), 500
 
             try:
-                # Hole alle Temperatur- und Luftfeuchtigkeit-Sensoren
-                temp_sensors = self.engine._get_all_temperature_sensors()
-                humidity_sensors = self.engine._get_all_humidity_sensors()
-
-                # Hole Device-Details
-                temp_details = []
-                for sensor_id in temp_sensors:
-                    state = self.engine.platform.get_state(sensor_id)
-                    if state:
-                        temp_details.append({
-                            'id': sensor_id,
-                            'name': state.get('attributes', {}).get('friendly_name', sensor_id),
-                            'zone': state.get('attributes', {}).get('zone'),
-                            'current_value': self.engine._extract_temperature_value(state)
-                        })
-
-                humidity_details = []
-                for sensor_id in humidity_sensors:
-                    state = self.engine.platform.get_state(sensor_id)
-                    if state:
-                        humidity_details.append({
-                            'id': sensor_id,
-                            'name': state.get('attributes', {}).get('friendly_name', sensor_id),
-                            'zone': state.get('attributes', {}).get('zone'),
-                            'current_value': self.engine._extract_humidity_value(state)
-                        })
-
-                return jsonify({
-                    'temperature_sensors': temp_details,
-                    'humidity_sensors': humidity_details
-                })
-
+                return cached_json_response('available_sensors', 30, build_available_sensors)
             except Exception as e:
                 logger.error(f"Error getting available sensors: {e}")
                 return jsonify({'error': str(e)}), 500
@@ -1815,16 +1964,12 @@ class WebInterface:
         @self.app.route('/api/sensors/config', methods=['GET', 'POST'])
         def api_sensor_config():
             """API: Sensor-Konfiguration verwalten"""
-            import json
-            from pathlib import Path
-
             config_file = Path('data/sensor_config.json')
 
             if request.method == 'GET':
                 # Lade aktuelle Konfiguration
                 if config_file.exists():
-                    with open(config_file, 'r') as f:
-                        config = json.load(f)
+                    config = _read_json_file_cached(config_file)
                 else:
                     config = {
                         'temperature_sensors': [],
@@ -1849,8 +1994,7 @@ class WebInterface:
                     Path('data').mkdir(exist_ok=True)
 
                     # Speichere Konfiguration
-                    with open(config_file, 'w') as f:
-                        json.dump(config, f, indent=2)
+                    _write_json_file(config_file, config)
 
                     logger.info(f"Sensor config saved: {len(temp_sensors)} temp, {len(humidity_sensors)} humidity")
 
@@ -1872,9 +2016,7 @@ class WebInterface:
                 # Lade aus Datei oder verwende Defaults
                 config_file = Path('data/automations.json')
                 if config_file.exists():
-                    import json
-                    with open(config_file, 'r') as f:
-                        config = json.load(f)
+                    config = _read_json_file_cached(config_file)
                 else:
                     config = {
                         'device_config': {'learning': [], 'control': [], 'automation': []},
@@ -1901,9 +2043,7 @@ class WebInterface:
                 Path('data').mkdir(exist_ok=True)
 
                 if config_file.exists():
-                    import json
-                    with open(config_file, 'r') as f:
-                        config = json.load(f)
+                    config = _read_json_file(config_file)
                 else:
                     config = {'device_config': {}, 'automation_rules': {}}
 
@@ -1911,9 +2051,7 @@ class WebInterface:
                 config['device_config'] = device_config
 
                 # Speichern
-                import json
-                with open(config_file, 'w') as f:
-                    json.dump(config, f, indent=2)
+                _write_json_file(config_file, config)
 
                 logger.info(f"Device config saved: {len(device_config.get('learning', []))} learning, {len(device_config.get('control', []))} control")
                 return jsonify({'success': True})
@@ -1934,9 +2072,7 @@ class WebInterface:
                 Path('data').mkdir(exist_ok=True)
 
                 if config_file.exists():
-                    import json
-                    with open(config_file, 'r') as f:
-                        config = json.load(f)
+                    config = _read_json_file(config_file)
                 else:
                     config = {'device_config': {}, 'automation_rules': {}}
 
@@ -1944,9 +2080,7 @@ class WebInterface:
                 config['automation_rules'] = automation_rules
 
                 # Speichern
-                import json
-                with open(config_file, 'w') as f:
-                    json.dump(config, f, indent=2)
+                _write_json_file(config_file, config)
 
                 logger.info(f"Automation rules saved: away={automation_rules.get('away_mode', {}).get('enabled')}, arrival={automation_rules.get('arrival_mode', {}).get('enabled')}")
                 return jsonify({'success': True})
@@ -1966,7 +2100,7 @@ class WebInterface:
                     # Nutze Homey's User-Presence (Smartphone-Tracking)
                     presence_data = platform.get_presence_status()
 
-                    return jsonify({
+                    return _json_response({
                         'present': presence_data.get('anyone_home', False),
                         'mode': 'homey_users',
                         'users': presence_data.get('users', []),
@@ -2011,7 +2145,7 @@ class WebInterface:
                                 except (ValueError, OSError, OverflowError, TypeError) as e:
                                     logger.debug(f"Could not parse timestamp: {e}")
 
-                    return jsonify({
+                    return _json_response({
                         'present': present,
                         'mode': 'motion_sensors',
                         'last_motion': last_motion.isoformat() if last_motion else None,
@@ -2318,14 +2452,12 @@ class WebInterface:
         @self.app.route('/api/rooms', methods=['GET', 'POST'])
         def api_rooms():
             """API: Räume verwalten"""
-            import json
             rooms_file = Path('data/rooms.json')
 
             if request.method == 'GET':
                 # Lade Räume
                 if rooms_file.exists():
-                    with open(rooms_file, 'r') as f:
-                        data = json.load(f)
+                    data = _read_json_file_cached(rooms_file)
                 else:
                     data = {'rooms': [], 'assignments': {}}
                 return jsonify(data)
@@ -2337,8 +2469,7 @@ class WebInterface:
                 icon = data.get('icon', '🏠')
 
                 if rooms_file.exists():
-                    with open(rooms_file, 'r') as f:
-                        rooms_data = json.load(f)
+                    rooms_data = _read_json_file(rooms_file)
                 else:
                     rooms_data = {'rooms': [], 'assignments': {}}
 
@@ -2353,8 +2484,7 @@ class WebInterface:
                 rooms_data['rooms'].append(new_room)
 
                 Path('data').mkdir(exist_ok=True)
-                with open(rooms_file, 'w') as f:
-                    json.dump(rooms_data, f, indent=2)
+                _write_json_file(rooms_file, rooms_data)
 
                 logger.info(f"Room added: {name}")
                 return jsonify({'success': True, 'room': new_room})
@@ -2393,7 +2523,6 @@ class WebInterface:
         def api_sync_homey_zones():
             """API: Homey Zonen importieren"""
             try:
-                import json
                 platform = self.engine.platform
 
                 # Hole Zonen von Homey
@@ -2401,8 +2530,7 @@ class WebInterface:
 
                 rooms_file = Path('data/rooms.json')
                 if rooms_file.exists():
-                    with open(rooms_file, 'r') as f:
-                        rooms_data = json.load(f)
+                    rooms_data = _read_json_file(rooms_file)
                 else:
                     rooms_data = {'rooms': [], 'assignments': {}}
 
@@ -2423,8 +2551,7 @@ class WebInterface:
                             imported += 1
 
                 Path('data').mkdir(exist_ok=True)
-                with open(rooms_file, 'w') as f:
-                    json.dump(rooms_data, f, indent=2)
+                _write_json_file(rooms_file, rooms_data)
 
                 logger.info(f"Imported {imported} Homey zones")
                 return jsonify({'success': True, 'zones_imported': imported})
@@ -2437,22 +2564,19 @@ class WebInterface:
         def api_sync_device_assignments():
             """API: Geräte-Zuordnungen aus Homey importieren"""
             try:
-                import json
                 platform = self.engine.platform
 
                 rooms_file = Path('data/rooms.json')
                 if rooms_file.exists():
-                    with open(rooms_file, 'r') as f:
-                        rooms_data = json.load(f)
+                    rooms_data = _read_json_file(rooms_file)
                 else:
                     rooms_data = {'rooms': [], 'assignments': {}}
 
                 # Hole alle Geräte und extrahiere Zone-Zuordnungen
                 assignments_count = 0
-                for domain in ['light', 'climate', 'switch', 'sensor']:
+                for domain, states_future in _fetch_domain_states(platform).items():
                     try:
-                        entity_ids = platform.get_all_entities(domain)
-                        states = platform.get_states(entity_ids)
+                        states = states_future.result()
 
                         for entity_id, state_data in states.items():
                             zone_id = state_data.get('attributes', {}).get('zone')
@@ -2465,8 +2589,7 @@ class WebInterface:
                         logger.warning(f"Error getting {domain} device assignments: {e}")
 
                 Path('data').mkdir(exist_ok=True)
-                with open(rooms_file, 'w') as f:
-                    json.dump(rooms_data, f, indent=2)
+                _write_json_file(rooms_file, rooms_data)
 
                 logger.info(f"Imported {assignments_count} device assignments from Homey")
                 return jsonify({'success': True, 'assignments_imported': assignments_count})
@@ -2479,22 +2602,19 @@ class WebInterface:
         def api_assign_device():
             """API: Gerät zu Raum zuordnen"""
             try:
-                import json
                 data = request.json
                 device_id = data.get('device_id')
                 room_id = data.get('room_id')
 
                 rooms_file = Path('data/rooms.json')
                 if rooms_file.exists():
-                    with open(rooms_file, 'r') as f:
-                        rooms_data = json.load(f)
+                    rooms_data = _read_json_file(rooms_file)
                 else:
                     rooms_data = {'rooms': [], 'assignments': {}}
 
                 rooms_data['assignments'][device_id] = room_id
 
-                with open(rooms_file, 'w') as f:
-                    json.dump(rooms_data, f, indent=2)
+                _write_json_file(rooms_file, rooms_data)
 
                 logger.info(f"Device {device_id} assigned to room {room_id}")
                 return jsonify({'success': True})
@@ -2507,20 +2627,17 @@ class WebInterface:
         def api_unassign_device():
             """API: Gerät von Raum entfernen"""
             try:
-                import json
                 data = request.json
                 device_id = data.get('device_id')
 
                 rooms_file = Path('data/rooms.json')
                 if rooms_file.exists():
-                    with open(rooms_file, 'r') as f:
-                        rooms_data = json.load(f)
+                    rooms_data = _read_json_file(rooms_file)
 
                     if device_id in rooms_data['assignments']:
                         del rooms_data['assignments'][device_id]
 
-                        with open(rooms_file, 'w') as f:
-                            json.dump(rooms_data, f, indent=2)
+                        _write_json_file(rooms_file, rooms_data)
 
                 logger.info(f"Device {device_id} unassigned")
                 return jsonify({'success': True})
@@ -2533,7 +2650,6 @@ class WebInterface:
         def api_control_room_lights():
             """API: Alle Lichter in einem Raum steuern"""
             try:
-                import json
                 data = request.json
                 room_id = data.get('room_id')
                 action = data.get('action')  # 'on' or 'off'
@@ -2543,8 +2659,7 @@ class WebInterface:
                 if not rooms_file.exists():
                     return jsonify({'success': False, 'error': 'No rooms configured'}), 400
 
-                with open(rooms_file, 'r') as f:
-                    rooms_data = json.load(f)
+                rooms_data = _read_json_file_cached(rooms_file)
 
                 # Finde alle Geräte in diesem Raum
                 room_devices = [device_id for device_id, rid in rooms_data['assignments'].items() if rid == room_id]
@@ -2575,7 +2690,6 @@ class WebInterface:
         def api_update_room():
             """API: Raum bearbeiten (Name und Icon)"""
             try:
-                import json
                 data = request.json
                 room_id = data.get('room_id')
                 new_name = data.get('name')
@@ -2586,8 +2700,7 @@ class WebInterface:
 
                 rooms_file = Path('data/rooms.json')
                 if rooms_file.exists():
-                    with open(rooms_file, 'r') as f:
-                        rooms_data = json.load(f)
+                    rooms_data = _read_json_file(rooms_file)
 
                     # Finde und aktualisiere Raum
                     for room in rooms_data['rooms']:
@@ -2598,8 +2711,7 @@ class WebInterface:
                                 room['icon'] = new_icon
                             break
 
-                    with open(rooms_file, 'w') as f:
-                        json.dump(rooms_data, f, indent=2)
+                    _write_json_file(rooms_file, rooms_data)
 
                     logger.info(f"Room {room_id} updated")
                     return jsonify({'success': True})
@@ -2614,19 +2726,16 @@ class WebInterface:
         def api_delete_room():
             """API: Raum löschen"""
             try:
-                import json
                 data = request.json
                 room_id = data.get('room_id')
 
                 rooms_file = Path('data/rooms.json')
                 if rooms_file.exists():
-                    with open(rooms_file, 'r') as f:
-                        rooms_data = json.load(f)
+                    rooms_data = _read_json_file(rooms_file)
 
                     rooms_data['rooms'] = [r for r in rooms_data['rooms'] if r['id'] != room_id]
 
-                    with open(rooms_file, 'w') as f:
-                        json.dump(rooms_data, f, indent=2)
+                    _write_json_file(rooms_file, rooms_data)
 
                 logger.info(f"Room {room_id} deleted")
                 return jsonify({'success': True})
@@ -2911,11 +3020,11 @@ class WebInterface:
             try:
                 from src.utils.database import Database
 
-                db = Database()
                 days_back = int(request.args.get('days', 30))
                 limit = int(request.args.get('limit', 100))
 
-                events = db.get_bathroom_events(days_back=days_back, limit=limit)
+                with Database() as db:
+                    events = db.get_bathroom_events(days_back=days_back, limit=limit)
 
                 return jsonify({
                     'events': events,
@@ -4617,14 +4726,9 @@ class WebInterface:
         try:
             stats = {}
 
-            # Zähle Einträge pro Tabelle
+            # Zähle Einträge pro Tabelle (Schätzung aus ANALYZE-Statistiken)
             tables = ['sensor_data', 'decisions', 'training_history', 'heating_observations']
-            for table in tables:
-                try:
-                    result = self.db.execute(f"SELECT COUNT(*) as count FROM {table}")
-                    stats[table] = result[0]['count'] if result else 0
-                except:
-                    stats[table] = 0
+            stats.update(self.db.get_table_count_estimates(tables))
 
             # Hole Zeitraum der Daten
             try:
@@ -16,9 +16,8 @@ from src.utils.config_loader import ConfigLoader
 @pytest.fixture
 def test_db():
     """Temporäre Test-Datenbank"""
-    db = Database(db_path=":memory:")  # In-Memory-DB für Tests
-    yield db
-    db.close()
+    with Database(db_path=":memory:") as db:  # In-Memory-DB für Tests
+        yield db
 
 
 @pytest.fixture
@@ -64,6 +64,33 @@ class TestHomeyCollector:
         assert device['id'] == 'device-1'
         assert device['class'] == 'light'
 
+    @patch('src.data_collector.homey_collector.requests.get')
+    def test_get_states_uses_device_cache(self, mock_get, mock_homey_response):
+        """Test: get_states lädt die Device-Liste nur einmal pro Cache-Dauer, fehlende Devices einzeln"""
+        def homey_get(url, **kwargs):
+            response = Mock(status_code=200)
+            if url.endswith('/api/manager/devices/device/'):
+                response.json.return_value = mock_homey_response
+            else:
+                response.json.return_value = {'id': 'device-3', 'name': 'Garage Sensor', 'capabilitiesObj': {}}
+            return response
+
+        mock_get.side_effect = homey_get
+
+        collector = HomeyCollector(url='http://test.local', token='test-token')
+        for _ in range(10):
+            states = collector.get_states(['device-1', 'device-2'])
+
+        assert mock_get.call_count == 1
+        assert states['device-1']['state'] == 'on'
+        assert states['device-2']['state'] == '20.5'
+
+        states = collector.get_states(['device-1', 'device-3'])
+
+        assert set(states) == {'device-1', 'device-3'}
+        assert mock_get.call_count == 2
+        assert mock_get.call_args[0][0] == 'http://test.local/api/manager/devices/device/device-3/'
+
     @patch('src.data_collector.homey_collector.requests.get')
     def test_connection_error_handling(self, mock_get):
         """Test: Fehlerbehandlung bei Verbindungsproblemen"""
@@ -5,7 +5,10 @@ Unit Tests für Database
 import pytest
 import tempfile
 import os
-from datetime import datetime
+import json
+import sqlite3
+import numpy as np
+from datetime import datetime, timedelta
 from src.utils.database import Database
 
 
@@ -15,10 +18,9 @@ def temp_db():
     temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
     temp_file.close()
 
-    db = Database(temp_file.name)
-    yield db
+    with Database(temp_file.name) as db:
+        yield db
 
-    db.close()
     os.unlink(temp_file.name)
 
 
@@ -125,3 +127,528 @@ def test_close_connection(temp_db):
     temp_db.close()
 
     assert temp_db.connection is None
+
+
+def test_bathroom_statistics_distribution(temp_db):
+    """Test: Stunden- und Wochentags-Verteilung der Badezimmer-Events"""
+    start = datetime.now() - timedelta(days=2)
+    for offset in (0, 0, 1):
+        event_start = start.replace(hour=7 + offset, minute=0, second=0, microsecond=0)
+        temp_db.create_manual_bathroom_event(
+            start_time=event_start,
+            end_time=event_start + timedelta(minutes=15),
+            peak_humidity=80.0
+        )
+
+    stats = temp_db.get_bathroom_statistics(days_back=30)
+
+    assert stats['event_stats']['event_count'] == 3
+    assert stats['event_stats']['avg_duration'] == 15.0
+    assert stats['peak_hours'][0] == {'hour_of_day': 7, 'count': 2}
+    assert stats['peak_hours'][1] == {'hour_of_day': 8, 'count': 1}
+    assert stats['weekday_distribution'] == [
+        {'day_of_week': start.weekday(), 'count': 3}
+    ]
+
+
+def test_learned_parameter_cache_invalidation(temp_db):
+    """Test: Gecachte Parameter werden beim Speichern/Reset verworfen"""
+    assert temp_db.get_learned_parameter('humidity_threshold_high') is None
+
+    temp_db.save_learned_parameter('humidity_threshold_high', 72.0, 0.9, 10, 'test')
+    assert temp_db.get_learned_parameter('humidity_threshold_high') == 72.0
+    assert temp_db.get_learned_parameter_details('humidity_threshold_high')['samples_used'] == 10
+
+    temp_db.reset_learned_parameters()
+    assert temp_db.get_learned_parameter('humidity_threshold_high') is None
+    assert temp_db.get_learned_parameter_details('humidity_threshold_high') is None
+
+
+def test_create_manual_bathroom_events_bulk(temp_db):
+    """Test: Bulk-Import entspricht einzeln angelegten manuellen Events"""
+    start = datetime(2024, 3, 3, 7, 30)  # Sonntag
+    event_ids = temp_db.create_manual_bathroom_events_bulk([
+        {'start_time': start, 'end_time': start + timedelta(minutes=20), 'peak_humidity': 85.0},
+        {'start_time': start + timedelta(days=1), 'end_time': start + timedelta(days=1, minutes=10),
+         'peak_humidity': 75.0},
+    ])
+
+    assert len(event_ids) == 2
+
+    single_id = temp_db.create_manual_bathroom_event(
+        start_time=start, end_time=start + timedelta(minutes=20), peak_humidity=85.0
+    )
+
+    columns = ('start_time, end_time, duration_minutes, peak_humidity, start_humidity, '
+               'avg_humidity, day_of_week, hour_of_day, event_type')
+    bulk = temp_db.execute(f"SELECT {columns} FROM bathroom_events WHERE id = ?", (event_ids[0],))
+    single = temp_db.execute(f"SELECT {columns} FROM bathroom_events WHERE id = ?", (single_id,))
+    assert bulk == single
+
+    second = temp_db.execute("SELECT day_of_week, duration_minutes FROM bathroom_events WHERE id = ?",
+                             (event_ids[1],))
+    assert second == [{'day_of_week': 0, 'duration_minutes': 10.0}]
+
+
+def test_lighting_events_write_buffer(temp_db):
+    """Test: Gepufferte Lighting Events sind nach Flush bzw. beim Lesen sichtbar"""
+    for state in ('on', 'off'):
+        temp_db.add_lighting_event('light.bad', 'Licht Bad', 'Bad', state, brightness=80)
+
+    raw_count = temp_db.execute("SELECT COUNT(*) as count FROM lighting_events")[0]['count']
+    assert raw_count == 0
+
+    assert temp_db.get_lighting_events_count() == 2
+    assert temp_db.flush_write_buffers() == 0
+    assert sorted(event['state'] for event in temp_db.get_lighting_events()) == ['off', 'on']
+
+
+def test_write_buffer_kept_when_flush_fails(temp_db):
+    """Test: Bei gesperrter Datenbank bleiben gepufferte Zeilen für den nächsten Flush erhalten"""
+    temp_db.add_lighting_event('light.bad', 'Licht Bad', 'Bad', 'on')
+    temp_db._get_connection().execute("PRAGMA busy_timeout = 0")
+
+    blocker = sqlite3.connect(temp_db.db_path)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            temp_db.flush_write_buffers()
+        # Automatischer Flush beim Puffern wirft nicht, Zeile wird angehängt
+        temp_db.add_lighting_event('light.bad', 'Licht Bad', 'Bad', 'off')
+    finally:
+        blocker.rollback()
+        blocker.close()
+
+    assert temp_db.flush_write_buffers() == 2
+    assert temp_db.get_lighting_events_count() == 2
+
+
+def test_insert_sensor_data_many(temp_db):
+    """Test: Batch-Insert schreibt alle Zeilen inkl. Metadaten"""
+    timestamp = datetime(2024, 3, 3, 7, 30)
+    inserted = temp_db.insert_sensor_data_many([
+        (timestamp, 'sensor.bad', 'temperature', 21.5, '°C', {'zone': 'Bad'}),
+        (None, 'sensor.bad', 'humidity', 60.0, '%', None),
+    ])
+
+    assert inserted == 2
+    assert temp_db.insert_sensor_data_many([]) == 0
+
+    rows = temp_db.execute("SELECT sensor_type, value, metadata FROM sensor_data ORDER BY sensor_type")
+    assert [(row['sensor_type'], row['value']) for row in rows] == [('humidity', 60.0), ('temperature', 21.5)]
+    assert json.loads(rows[1]['metadata']) == {'zone': 'Bad'}
+
+
+def test_end_bathroom_event_longer_than_one_day(temp_db):
+    """Test: Dauer wird auch für Events über 24 Stunden vollständig berechnet"""
+    event_id = temp_db.start_bathroom_event(humidity=70.0, temperature=22.0, motion=True, door_closed=True)
+    start = datetime.now() - timedelta(days=1, minutes=30)
+    temp_db.execute("UPDATE bathroom_events SET start_time = ? WHERE id = ?", (start, event_id))
+
+    temp_db.end_bathroom_event(event_id, humidity=55.0)
+
+    duration = temp_db.execute("SELECT duration_minutes FROM bathroom_events WHERE id = ?",
+                               (event_id,))[0]['duration_minutes']
+    assert duration == pytest.approx(24 * 60 + 30, abs=1)
+
+
+@pytest.mark.parametrize('has_returning', [True, False])
+def test_returning_fallback_for_old_sqlite(temp_db, monkeypatch, has_returning):
+    """Test: Ohne RETURNING (SQLite < 3.35) liefern lastrowid/Folgeabfragen dieselben Ergebnisse"""
+    monkeypatch.setattr('src.utils.database.SQLITE_HAS_RETURNING', has_returning)
+
+    decision_id = temp_db.insert_decision('light.bad', 'lighting', 'turn_on', 0.9)
+    assert temp_db.execute("SELECT action FROM decisions WHERE id = ?", (decision_id,)) == [
+        {'action': 'turn_on'}]
+
+    event_id = temp_db.start_bathroom_event(humidity=70.0, temperature=22.0, motion=True, door_closed=True)
+    for humidity in (75.0, 85.0):
+        temp_db.add_bathroom_measurement(event_id, humidity, 22.0, True, False)
+    temp_db.end_bathroom_event(event_id, humidity=60.0)
+    row = temp_db.execute("SELECT avg_humidity, peak_humidity, end_humidity FROM bathroom_events WHERE id = ?",
+                          (event_id,))[0]
+    assert row == {'avg_humidity': 80.0, 'peak_humidity': 85.0, 'end_humidity': 60.0}
+
+    start = datetime(2024, 3, 3, 7, 30)
+    manual_id = temp_db.create_manual_bathroom_event(
+        start_time=start, end_time=start + timedelta(minutes=20), peak_humidity=85.0
+    )
+    bulk_ids = temp_db.create_manual_bathroom_events_bulk([
+        {'start_time': start, 'end_time': start + timedelta(minutes=10), 'peak_humidity': 75.0},
+        {'start_time': start, 'end_time': start + timedelta(minutes=30), 'peak_humidity': 95.0},
+    ])
+
+    assert bulk_ids == [manual_id + 1, manual_id + 2]
+    rows = temp_db.execute("SELECT id, peak_humidity FROM bathroom_events WHERE id >= ? ORDER BY id",
+                           (manual_id,))
+    assert [(row['id'], row['peak_humidity']) for row in rows] == [
+        (manual_id, 85.0), (bulk_ids[0], 75.0), (bulk_ids[1], 95.0)]
+
+
+def test_bathroom_statistics_cache_invalidation(temp_db):
+    """Test: Gecachte Badezimmer-Statistiken werden bei neuen Events verworfen"""
+    assert temp_db.get_bathroom_statistics()['event_stats']['event_count'] == 0
+
+    start = datetime.now() - timedelta(hours=2)
+    temp_db.create_manual_bathroom_event(
+        start_time=start, end_time=start + timedelta(minutes=15), peak_humidity=80.0
+    )
+
+    stats = temp_db.get_bathroom_statistics()
+    assert stats['event_stats']['event_count'] == 1
+
+    # Aufrufer erhalten Kopien, der Cache-Eintrag bleibt unverändert
+    stats['event_stats']['event_count'] = 99
+    assert temp_db.get_bathroom_statistics()['event_stats']['event_count'] == 1
+
+
+def test_heating_observation_roundtrip(temp_db):
+    """Test: Heizungsbeobachtungen passen zum Tabellenschema (inkl. Präsenz/Fenster)"""
+    temp_db.add_heating_observation(
+        'thermostat_1', room_name='Wohnzimmer', current_temp=20.5, target_temp=21.0,
+        is_heating=True, presence=True, window_open=False, energy_level=3
+    )
+
+    observations = temp_db.get_heating_observations(days_back=1)
+
+    assert len(observations) == 1
+    assert observations[0]['current_temp'] == 20.5
+    assert observations[0]['presence_detected'] == 1
+    assert observations[0]['energy_price_level'] == 3
+
+
+def test_row_counts_follow_batched_deletes(temp_db):
+    """Test: Per Trigger gepflegte Zeilenanzahlen stimmen nach Batch-Löschungen mit COUNT(*) überein"""
+    now = datetime.now()
+    temp_db.insert_sensor_data_many([
+        (now - timedelta(days=days), 'sensor.bad', 'temperature', 20.0 + days, '°C', None)
+        for days in range(10)
+    ])
+    assert temp_db.get_table_counts(['sensor_data']) == {'sensor_data': 10}
+
+    deleted = temp_db._delete_older_than('sensor_data', 'timestamp', now - timedelta(days=3, hours=12),
+                                         batch_size=2)
+
+    assert deleted == 6
+    tracked = temp_db.execute("SELECT row_count FROM row_counts WHERE table_name = 'sensor_data'")
+    actual = temp_db.execute("SELECT COUNT(*) as count FROM sensor_data")
+    assert tracked[0]['row_count'] == actual[0]['count'] == 4
+    assert temp_db.get_table_counts(['sensor_data', 'decisions']) == {'sensor_data': 4, 'decisions': 0}
+
+
+def test_heating_statistics_rollup_matches_raw_observations(temp_db):
+    """Test: Tages-Rollup liefert nach Inserts und Löschungen dieselben Statistiken wie heating_observations"""
+    now = datetime.now()
+    rows = []
+    for days in (1, 2, 5, 40):
+        for room, current, target, outdoor, heating in (
+            ('Bad', 21.5, 22.0, 5.0, True),
+            ('Bad', None, 22.0, None, False),
+            ('Wohnzimmer', 20.0, 21.0, 4.0, False),
+            (None, 19.0, None, 3.5, True),
+        ):
+            rows.append((now - timedelta(days=days), 'climate.test', room, current, target, outdoor, heating))
+    for row in rows:
+        temp_db.execute("""
+            INSERT INTO heating_observations
+            (timestamp, device_id, room_name, current_temp, target_temp, outdoor_temp, is_heating)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, row)
+
+    # Retention (Batches) und gezieltes Löschen innerhalb des Zeitraums
+    assert temp_db._delete_older_than('heating_observations', 'timestamp', now - timedelta(days=30),
+                                      batch_size=3) == 4
+    temp_db.execute("DELETE FROM heating_observations WHERE room_name = 'Wohnzimmer' AND timestamp < ?",
+                    (now - timedelta(days=4),))
+    temp_db._get_connection().commit()
+
+    rollup = temp_db.get_heating_statistics(days_back=30)
+
+    # Ohne Rollup-Tabelle greift die Abfrage über die Rohdaten
+    temp_db.execute("DROP TABLE heating_observations_daily")
+    temp_db._get_connection().commit()
+    raw = temp_db.get_heating_statistics(days_back=30)
+
+    assert rollup['total_observations'] == raw['total_observations'] == 11
+    assert rollup['heating_count'] == raw['heating_count']
+    for key in ('avg_temp', 'avg_target', 'avg_outdoor'):
+        assert rollup[key] == pytest.approx(raw[key])
+    assert [room['room_name'] for room in rollup['room_stats']] == ['Bad', 'Wohnzimmer']
+    for rollup_room, raw_room in zip(rollup['room_stats'], raw['room_stats']):
+        assert rollup_room == pytest.approx(raw_room)
+
+
+def test_cleanup_old_data_skips_missing_tables():
+    """Test: Retention überspringt Migrations-Tabellen, die fehlen (z.B. bei :memory:)"""
+    with Database(':memory:') as db:
+        db.insert_sensor_data_many([
+            (datetime.now() - timedelta(days=100), 'sensor.bad', 'temperature', 21.0, '°C', None),
+        ])
+
+        deleted = db.cleanup_old_data(retention_days=90)
+
+    assert deleted['sensor_data'] == 1
+    assert 'window_observations' not in deleted
+    assert 'window_open_sessions' not in deleted
+
+
+def test_cleanup_old_data_rolls_back_on_error(temp_db):
+    """Test: Schlägt ein Löschschritt fehl, wird die Retention-Transaktion zurückgerollt"""
+    old = datetime.now() - timedelta(days=100)
+    temp_db.execute("INSERT INTO external_data (timestamp, data_type, data) VALUES (?, 'weather', '{}')",
+                    (old,))
+    temp_db.execute("DROP TABLE heating_insights")
+
+    with pytest.raises(sqlite3.OperationalError):
+        temp_db.cleanup_old_data(retention_days=90)
+
+    assert not temp_db._get_connection().in_transaction
+    assert temp_db.execute("SELECT COUNT(*) as count FROM external_data")[0]['count'] == 1
+
+
+def test_window_sessions_follow_open_close_sequence(temp_db):
+    """Test: Trigger legt pro Öffnen eine Session an und schließt sie beim nächsten Schließen"""
+    start = datetime(2024, 3, 3, 7, 0)
+    observations = [
+        (0, 'window.bad', False),      # Erste Beobachtung geschlossen: keine Session
+        (1, 'window.bad', True),       # Öffnen
+        (2, 'window.kueche', True),
+        (3, 'window.bad', True),       # Weiterhin offen: keine neue Session
+        (6, 'window.bad', False),      # Schließen nach 5 Minuten
+        (7, 'window.bad', False),
+        (10, 'window.kueche', False),  # Schließen nach 8 Minuten
+        (12, 'window.bad', True),      # Erneut offen
+    ]
+    for minute, device_id, is_open in observations:
+        temp_db.execute(
+            "INSERT INTO window_observations (timestamp, device_id, is_open) VALUES (?, ?, ?)",
+            (start + timedelta(minutes=minute), device_id, is_open)
+        )
+
+    sessions = temp_db.execute("""
+        SELECT device_id, opened_at, closed_at, duration_minutes
+        FROM window_open_sessions ORDER BY id
+    """)
+
+    def at(minute):
+        return (start + timedelta(minutes=minute)).isoformat(' ')
+
+    assert [tuple(session.values()) for session in sessions] == [
+        ('window.bad', at(1), at(6), 5),
+        ('window.kueche', at(2), at(10), 8),
+        ('window.bad', at(12), None, None),
+    ]
+
+
+def test_window_sessions_follow_observations_with_equal_timestamps(temp_db):
+    """Test: Trigger pflegt window_open_sessions auch bei Beobachtungen mit gleichem Zeitstempel"""
+    timestamp = datetime(2024, 3, 3, 7, 30).isoformat(' ')
+    for is_open in (True, True, False, True):
+        temp_db.execute(
+            "INSERT INTO window_observations (timestamp, device_id, is_open) VALUES (?, ?, ?)",
+            (timestamp, 'window.bad', is_open)
+        )
+
+    sessions = temp_db.execute(
+        "SELECT closed_at FROM window_open_sessions WHERE device_id = ? ORDER BY id", ('window.bad',)
+    )
+    assert [session['closed_at'] for session in sessions] == [timestamp, None]
+
+
+def test_window_observations_buffered_within_one_second(temp_db):
+    """Test: Schnell aufeinanderfolgende gepufferte Beobachtungen ergeben genau eine offene Session"""
+    for is_open in (True, True, False, True):
+        temp_db.add_window_observation('window.kueche', 'Fenster Küche', 'Küche', is_open=is_open)
+
+    open_windows = temp_db.get_current_open_windows()
+    assert [window['device_id'] for window in open_windows] == ['window.kueche']
+
+
+def test_get_continuous_measurements_np(temp_db):
+    """Test: Temperaturmessungen als NumPy-Spalten mit schmalen dtypes und NULL -> NaN"""
+    for temp, outdoor in ((20.5, 4.0), (21.0, None), (21.5, 5.0)):
+        temp_db.add_continuous_measurement('climate.bad', 'Heizung Bad', 'Bad', temp, 22.0,
+                                           outdoor_temp=outdoor, heating_active=True)
+
+    columns = temp_db.get_continuous_measurements_np(days_back=1, chunk_size=2)
+
+    assert all(len(values) == 3 for values in columns.values())
+    assert columns['timestamp'].dtype == np.dtype('datetime64[s]')
+    assert columns['current_temperature'].dtype == np.float32
+    assert columns['heating_active'].dtype == np.int8
+    assert columns['device_id'].dtype == object
+    assert np.isnan(columns['outdoor_temperature']).sum() == 1
+    assert np.isnan(columns['humidity']).all()
+    assert (columns['heating_active'] == 1).all()
+
+    assert len(temp_db.get_continuous_measurements_np(days_back=1, limit=2)['timestamp']) == 2
+    empty = temp_db.get_continuous_measurements_np(days_back=0)
+    assert empty['timestamp'].shape == (0,) and empty['current_temperature'].dtype == np.float32
+
+
+def test_get_sensor_data_timeseries_np(temp_db):
+    """Test: Zeitreihe als NumPy-Spalten, aufsteigend sortiert, NULL -> NaN, Einheit als Skalar"""
+    now = datetime.now()
+    temp_db.insert_sensor_data_many([
+        (now - timedelta(minutes=minutes), 'sensor.bad', 'temperature', value, unit, None)
+        for minutes, value, unit in ((30, 21.0, '°C'), (20, None, '°C'), (10, 22.0, None))
+    ] + [(now, 'sensor.kueche', 'temperature', 19.0, '°C', None)])
+
+    columns = temp_db.get_sensor_data_timeseries_np('sensor.bad', hours_back=1, chunk_size=2)
+
+    assert columns['timestamp'].dtype == np.dtype('datetime64[s]')
+    assert columns['value'].dtype == np.float64 and columns['value'].shape == (3,)
+    assert (np.diff(columns['timestamp'].astype(np.int64)) > 0).all()
+    assert np.isnan(columns['value'][1]) and columns['value'][2] == 22.0
+    assert columns['unit'] == '°C'
+
+    empty = temp_db.get_sensor_data_timeseries_np('sensor.unbekannt')
+    assert empty['value'].shape == (0,) and empty['unit'] is None
+
+
+def test_get_sensor_data_np(temp_db):
+    """Test: Sensordaten als NumPy-Spalten mit Filtern, neueste zuerst, NULL -> NaN"""
+    now = datetime.now()
+    temp_db.insert_sensor_data_many([
+        (now - timedelta(hours=3), 'sensor.bad', 'temperature', 21.0, '°C', None),
+        (now - timedelta(hours=2), 'sensor.bad', 'humidity', None, '%', None),
+        (now - timedelta(hours=1), 'sensor.kueche', 'temperature', 19.5, '°C', None),
+        (now - timedelta(hours=30), 'sensor.bad', 'temperature', 18.0, '°C', None),
+    ])
+
+    columns = temp_db.get_sensor_data_np(hours_back=24, chunk_size=2)
+
+    assert set(columns) == {'timestamp', 'sensor_id', 'sensor_type', 'value', 'unit'}
+    assert all(values.shape == (3,) for values in columns.values())
+    assert columns['timestamp'].dtype == np.dtype('datetime64[s]')
+    assert columns['sensor_id'].dtype == object and columns['value'].dtype == np.float64
+    assert list(columns['sensor_id']) == ['sensor.kueche', 'sensor.bad', 'sensor.bad']
+    assert np.isnan(columns['value'][1])
+
+    filtered = temp_db.get_sensor_data_np(sensor_id='sensor.bad', sensor_type='temperature')
+    assert filtered['value'].tolist() == [21.0]
+
+    aggregated = temp_db.get_sensor_data_aggregated_np('temperature', hours_back=24, interval_minutes=60)
+    assert aggregated['interval_time'].dtype == np.dtype('datetime64[s]')
+    assert aggregated['sample_count'].dtype == np.int64
+    assert aggregated['avg_value'].tolist() == [21.0, 19.5]
+
+
+def test_get_heating_observations_np(temp_db):
+    """Test: Heizungsbeobachtungen als NumPy-Spalten, NULL -> NaN (float) bzw. -1 (int)"""
+    temp_db.add_heating_observation('climate.bad', room_name='Bad', current_temp=21.0, target_temp=22.0,
+                                    is_heating=True, presence=True)
+    temp_db.add_heating_observation('climate.wohnzimmer', room_name='Wohnzimmer', target_temp=20.0)
+
+    columns = temp_db.get_heating_observations_np(days_back=1)
+
+    assert all(values.shape == (2,) for values in columns.values())
+    assert columns['timestamp'].dtype == np.dtype('datetime64[s]')
+    assert columns['room_name'].dtype == object
+    assert columns['current_temp'].dtype == np.float64 and columns['is_heating'].dtype == np.int64
+    assert columns['current_temp'][0] == 21.0 and np.isnan(columns['current_temp'][1])
+    assert columns['presence_detected'].tolist() == [1, -1]
+
+    filtered = temp_db.get_heating_observations_np(days_back=1, room_name='Wohnzimmer')
+    assert filtered['device_id'].tolist() == ['climate.wohnzimmer']
+
+
+def test_get_bathroom_humidity_timeseries_np(temp_db):
+    """Test: Badezimmer-Luftfeuchtigkeit als NumPy-Spalten, Messungen ohne Feuchte entfallen"""
+    temp_db.add_bathroom_continuous_measurement(humidity=55.0, temperature=21.0)
+    temp_db.add_bathroom_continuous_measurement(temperature=21.5)
+    temp_db.add_bathroom_continuous_measurement(humidity=60.5)
+
+    columns = temp_db.get_bathroom_humidity_timeseries_np(hours_back=1)
+
+    assert set(columns) == {'timestamp', 'humidity'}
+    assert columns['timestamp'].dtype == np.dtype('datetime64[s]')
+    assert columns['humidity'].dtype == np.float64
+    assert columns['humidity'].tolist() == [55.0, 60.5]
+
+
+def test_iter_ml_training_rows(temp_db):
+    """Test: ML-Trainingsdaten blockweise, als Liste und spaltenweise in derselben Reihenfolge"""
+    for state in ('on', 'off', 'on'):
+        temp_db.add_lighting_event('light.bad', 'Licht Bad', 'Bad', state, brightness=None)
+    temp_db.add_continuous_measurement('climate.bad', 'Heizung Bad', 'Bad', 21.0, 22.0)
+
+    chunks = list(temp_db.iter_lighting_events(days_back=1, chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    rows = [row for chunk in chunks for row in chunk]
+    assert rows == temp_db.get_lighting_events(days_back=1)
+    assert rows[0]['brightness'] is None
+
+    columns = temp_db.get_lighting_events(days_back=1, as_columns=True)
+    assert columns['state'] == [row['state'] for row in rows]
+    assert temp_db.get_lighting_events(days_back=1, limit=1, as_columns=True)['state'] == [rows[0]['state']]
+
+    assert [len(chunk) for chunk in temp_db.iter_continuous_measurements(days_back=1)] == [1]
+    assert temp_db.get_continuous_measurements(days_back=1, as_columns=True)['current_temperature'] == [21.0]
+    assert list(temp_db.iter_continuous_measurements(days_back=0)) == []
+    assert temp_db.get_continuous_measurements(days_back=0, as_columns=True)['device_id'] == []
+
+
+def test_iter_heating_and_window_observations(temp_db):
+    """Test: Heizungs-/Fenster-Beobachtungen blockweise, älteste zuerst, mit Filtern"""
+    for temp in (20.0, 20.5, 21.0):
+        temp_db.add_heating_observation('climate.bad', room_name='Bad', current_temp=temp)
+    temp_db.add_heating_observation('climate.kueche', room_name='Küche', current_temp=None)
+    for is_open in (True, False):
+        temp_db.add_window_observation('window.bad', 'Fenster Bad', 'Bad', is_open=is_open)
+
+    chunks = list(temp_db.iter_heating_observations(days_back=1, room_name='Bad', chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert [row['current_temp'] for chunk in chunks for row in chunk] == [20.0, 20.5, 21.0]
+
+    kitchen = temp_db.get_heating_observations(days_back=1, device_id='climate.kueche')
+    assert len(kitchen) == 1 and kitchen[0]['current_temp'] is None
+
+    window_chunks = list(temp_db.iter_window_observations(hours_back=1, device_id='window.bad', chunk_size=1))
+    assert [[row['is_open'] for row in chunk] for chunk in window_chunks] == [[1], [0]]
+    assert list(temp_db.iter_window_observations(hours_back=1, room_name='Küche')) == []
+
+
+def test_timeseries_downsample_and_limit(temp_db):
+    """Test: Zeitreihen mit Intervall-Mittelwerten und Limit (neueste Punkte, aufsteigend sortiert)"""
+    base = datetime.now() - timedelta(hours=1)
+    base = base.replace(minute=base.minute // 10 * 10, second=0, microsecond=0)
+    points = [(0, 1.0), (2, 2.0), (4, 3.0), (10, 10.0), (12, 20.0), (20, 7.0)]
+    temp_db.insert_sensor_data_many([
+        (base + timedelta(minutes=minutes), 'sensor.bad', 'humidity', value, '%', None)
+        for minutes, value in points
+    ])
+    for minutes, value in points:
+        temp_db.execute("INSERT INTO bathroom_continuous_measurements (timestamp, humidity) VALUES (?, ?)",
+                        (base + timedelta(minutes=minutes), value))
+    temp_db._get_connection().commit()
+
+    def bucket(minutes):
+        return (base + timedelta(minutes=minutes)).isoformat(' ')
+
+    for read in (
+        lambda **kwargs: temp_db.get_sensor_data_timeseries('sensor.bad', hours_back=2, **kwargs),
+        lambda **kwargs: temp_db.get_bathroom_humidity_timeseries(hours_back=2, **kwargs),
+    ):
+        assert [row['value'] for row in read()] == [value for _, value in points]
+        assert [row['value'] for row in read(limit=2)] == [20.0, 7.0]
+
+        downsampled = read(downsample_seconds=600)
+        assert [(row['timestamp'], row['value'], row['unit']) for row in downsampled] == [
+            (bucket(0), 2.0, '%'), (bucket(10), 15.0, '%'), (bucket(20), 7.0, '%')]
+        assert [row['value'] for row in read(downsample_seconds=600, limit=2)] == [15.0, 7.0]
+
+
+def test_device_room_names_reread_on_size_change(temp_db, tmp_path):
+    """Test: rooms.json mit gleicher mtime, aber anderer Größe wird neu gelesen"""
+    rooms_file = tmp_path / 'rooms.json'
+    rooms = [{'id': 'bad', 'name': 'Bad'}, {'id': 'kueche', 'name': 'Küche'}]
+    rooms_file.write_text(json.dumps({'rooms': rooms, 'assignments': {'light.bad': 'bad'}}))
+    mtime_ns = rooms_file.stat().st_mtime_ns
+    assert temp_db._get_device_room_names(rooms_file) == {'light.bad': 'Bad'}
+
+    rooms_file.write_text(json.dumps({'rooms': rooms, 'assignments': {'light.bad': 'kueche'}}))
+    os.utime(rooms_file, ns=(mtime_ns, mtime_ns))
+
+    assert temp_db._get_device_room_names(rooms_file) == {'light.bad': 'Küche'}
@@ -0,0 +1,301 @@
+"""
+Tests für SensorHelper (Caching von Sensor-Listen, States und externen Daten)
+"""
+
+import pytest
+import yaml
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from src.data_collector.homey_collector import HomeyCollector
+from src.utils import sensor_helper
+from src.utils.config_loader import ConfigLoader
+from src.utils.sensor_helper import SensorHelper, STATE_CACHE_TTL, EXTERNAL_DATA_CACHE_TTL
+
+
+class FakePlatform:
+    """Platform mit festen States, zeichnet alle Abfragen auf"""
+
+    def __init__(self, states):
+        self.states = states
+        self.calls = []
+
+    def get_state(self, sensor_id):
+        self.calls.append(('get_state', sensor_id))
+        state = self.states.get(sensor_id)
+        return {'state': state} if state is not None else None
+
+    def get_states(self, sensor_ids=None):
+        self.calls.append(('get_states', tuple(sensor_ids)))
+        return {
+            sensor_id: {'state': state}
+            for sensor_id, state in self.states.items()
+            if sensor_id in sensor_ids
+        }
+
+
+class FakeDatabase:
+    """Database mit festen externen Daten, zählt die Abfragen pro Typ"""
+
+    def __init__(self, external_data):
+        self.external_data = external_data
+        self.calls = []
+
+    def get_latest_external_data(self, data_type):
+        self.calls.append(data_type)
+        data = self.external_data.get(data_type)
+        return {'data': data} if data is not None else None
+
+
+class FakeConfig:
+    """Minimaler ConfigLoader-Ersatz (get mit Dot-Notation, version)"""
+
+    def __init__(self, sensors):
+        self.config = {'data_collection': {'sensors': sensors}}
+        self.version = 0
+
+    def get(self, key, default=None):
+        value = self.config
+        for k in key.split('.'):
+            value = value.get(k) if isinstance(value, dict) else None
+            if value is None:
+                return default
+        return value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Steuerbare Uhr für time.monotonic() im SensorHelper"""
+    now = [1000.0]
+    monkeypatch.setattr(sensor_helper, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def platform():
+    return FakePlatform({
+        'binary_sensor.bad_motion': 'off',
+        'binary_sensor.kueche_motion': 'on',
+        'binary_sensor.bad_window': 'off',
+        'binary_sensor.flur_door': 'closed',
+        'sensor.bad_humidity': '61.5',
+    })
+
+
+@pytest.fixture
+def config():
+    return FakeConfig({
+        'motion': ['binary_sensor.bad_motion', 'binary_sensor.kueche_motion'],
+        'window': ['binary_sensor.bad_window'],
+        'door': ['binary_sensor.flur_door'],
+        'humidity': ['sensor.bad_humidity', 'sensor.keller_humidity'],
+    })
+
+
+@pytest.fixture
+def helper(platform, config):
+    return SensorHelper(SimpleNamespace(platform=platform, config=config, db=None))
+
+
+class TestStateCache:
+    """Tests für den kurzlebigen State-Cache (_get_states)"""
+
+    def test_states_reused_within_ttl(self, helper, platform, clock):
+        """Test: Innerhalb der TTL werden States nicht erneut abgefragt"""
+        assert helper.get_motion_detected() is True
+        assert platform.calls == [
+            ('get_states', ('binary_sensor.bad_motion', 'binary_sensor.kueche_motion'))
+        ]
+
+        clock[0] += STATE_CACHE_TTL / 2
+        assert helper.get_motion_detected('Kueche') is True
+        assert helper.get_presence_in_room('Bad') is False
+        assert len(platform.calls) == 1
+
+    def test_only_stale_ids_fetched(self, helper, platform, clock):
+        """Test: Nur abgelaufene bzw. unbekannte Sensoren werden abgefragt"""
+        helper.get_motion_detected('Bad')
+        clock[0] += STATE_CACHE_TTL / 2
+        helper.get_motion_detected()
+        clock[0] += STATE_CACHE_TTL / 2
+        helper.get_motion_detected()
+
+        assert platform.calls == [
+            ('get_state', 'binary_sensor.bad_motion'),
+            # bad_motion noch gültig -> gezielte Einzelabfrage für kueche_motion
+            ('get_state', 'binary_sensor.kueche_motion'),
+            # bad_motion abgelaufen, kueche_motion noch gültig
+            ('get_state', 'binary_sensor.bad_motion'),
+        ]
+
+    def test_missing_sensor_cached(self, helper, platform, clock):
+        """Test: Sensoren ohne State werden ebenfalls zwischengespeichert"""
+        assert helper.get_humidity('Keller') is None
+        assert helper.get_humidity('Keller') is None
+        assert platform.calls == [('get_state', 'sensor.keller_humidity')]
+
+        clock[0] += STATE_CACHE_TTL
+        assert helper.get_humidity() == 61.5
+        assert platform.calls[1:] == [
+            ('get_states', ('sensor.bad_humidity', 'sensor.keller_humidity'))
+        ]
+
+    def test_invalidate_states(self, helper, platform, clock):
+        """Test: invalidate_states verwirft einzelne oder alle States"""
+        helper.get_motion_detected()
+
+        platform.states['binary_sensor.kueche_motion'] = 'off'
+        helper.invalidate_states('binary_sensor.kueche_motion')
+        assert helper.get_motion_detected() is False
+        assert platform.calls[-1] == ('get_state', 'binary_sensor.kueche_motion')
+
+        helper.invalidate_states()
+        helper.get_motion_detected()
+        assert platform.calls[-1] == (
+            'get_states', ('binary_sensor.bad_motion', 'binary_sensor.kueche_motion')
+        )
+
+    @patch('src.data_collector.homey_collector.requests.get')
+    def test_homey_batch_uses_device_cache(self, mock_get, config, clock):
+        """Test: Auf Homey lädt der Batch-Abruf die Device-Liste nicht bei jedem Durchlauf neu"""
+        devices = [
+            {'id': sensor_id, 'name': sensor_id, 'capabilitiesObj': {'onoff': {'value': False}}}
+            for sensor_id in ('binary_sensor.bad_motion', 'binary_sensor.kueche_motion',
+                              'binary_sensor.flur_motion')
+        ]
+        mock_get.return_value = Mock(status_code=200, **{'json.return_value': devices})
+        config.config['data_collection']['sensors']['motion'] = [device['id'] for device in devices]
+
+        homey = HomeyCollector(url='http://test.local', token='test-token')
+        helper = SensorHelper(SimpleNamespace(platform=homey, config=config, db=None))
+
+        for _ in range(10):
+            assert helper.get_motion_detected() is False
+            clock[0] += STATE_CACHE_TTL
+
+        assert mock_get.call_count == 1
+
+
+class TestSensorLists:
+    """Tests für die gecachten Sensor-Listen aus der Config"""
+
+    def test_config_update_resets_sensor_lists(self, tmp_path, platform, clock):
+        """Test: Nach ConfigLoader.update() werden die Sensor-Listen neu gelesen"""
+        config_path = tmp_path / 'config.yaml'
+        config_path.write_text(yaml.safe_dump({
+            'data_collection': {'sensors': {'motion': ['binary_sensor.bad_motion']}}
+        }))
+        config = ConfigLoader(str(config_path), validate=False)
+        helper = SensorHelper(SimpleNamespace(platform=platform, config=config, db=None))
+
+        assert helper.get_motion_detected() is False
+        # Listen werden nicht bei jedem Aufruf neu aus der Config gelesen
+        config.config['data_collection']['sensors']['motion'] = ['binary_sensor.kueche_motion']
+        assert helper._sensor_ids('motion') == ('binary_sensor.bad_motion',)
+
+        config.update('data_collection.sensors.motion',
+                      ['binary_sensor.bad_motion', 'binary_sensor.kueche_motion'])
+
+        assert helper.get_motion_detected() is True
+        assert helper._sensor_ids('motion') == ('binary_sensor.bad_motion', 'binary_sensor.kueche_motion')
+
+    def test_room_filter_memoized_per_config_version(self, helper, config):
+        """Test: Raum-Filter wird pro Raum einmal berechnet und beim Config-Update verworfen"""
+        assert helper._room_sensor_ids('motion', 'KUECHE') == ('binary_sensor.kueche_motion',)
+        assert helper._opening_sensor_ids('Bad') == ('binary_sensor.bad_window',)
+        assert helper._opening_sensor_ids(None) == ('binary_sensor.bad_window', 'binary_sensor.flur_door')
+        assert set(helper._sensors_by_room) == {
+            ('motion', 'kueche'), ('window', 'bad'), ('door', 'bad'),
+            ('window+door', 'bad'), ('window+door', ''),
+        }
+
+        config.config['data_collection']['sensors']['motion'].append('binary_sensor.kueche_motion_2')
+        config.version += 1
+
+        assert helper._room_sensor_ids('motion', 'kueche') == (
+            'binary_sensor.kueche_motion', 'binary_sensor.kueche_motion_2'
+        )
+        assert set(helper._sensors_by_room) == {('motion', 'kueche')}
+
+
+class TestWindowOpenCache:
+    """Tests für den gecachten Gesamtstatus von get_window_open()"""
+
+    def test_any_window_open_cached_within_ttl(self, helper, platform, clock):
+        """Test: Gesamtstatus wird innerhalb der TTL wiederverwendet, danach neu geprüft"""
+        assert helper.get_window_open() is False
+        platform.states['binary_sensor.flur_door'] = 'open'
+
+        clock[0] += STATE_CACHE_TTL / 2
+        assert helper.get_window_open() is False
+        assert len(platform.calls) == 1
+
+        clock[0] += STATE_CACHE_TTL / 2
+        assert helper.get_window_open() is True
+        assert len(platform.calls) == 2
+
+    def test_room_query_does_not_use_any_window_cache(self, helper, platform, clock):
+        """Test: Raum-Abfragen lesen und überschreiben den Gesamtstatus nicht"""
+        platform.states['binary_sensor.flur_door'] = 'open'
+        assert helper.get_window_open() is True
+        assert helper.get_window_open('Bad') is False
+        assert helper.get_window_open() is True
+
+    def test_invalidate_states_resets_any_window_cache(self, helper, platform, clock):
+        """Test: invalidate_states verwirft auch den Gesamtstatus"""
+        assert helper.get_window_open() is False
+
+        platform.states['binary_sensor.bad_window'] = 'on'
+        helper.invalidate_states('binary_sensor.bad_window')
+
+        assert helper.get_window_open() is True
+        assert platform.calls[-1] == ('get_state', 'binary_sensor.bad_window')
+
+
+class TestExternalDataCache:
+    """Tests für den Cache von Energiepreis- und Wetterdaten"""
+
+    @pytest.fixture
+    def db(self):
+        return FakeDatabase({'energy_price': {'price': 0.20}, 'weather': {'clouds': 50}})
+
+    @pytest.fixture
+    def helper(self, platform, config, db):
+        return SensorHelper(SimpleNamespace(platform=platform, config=config, db=db))
+
+    def test_external_data_reused_within_ttl(self, helper, db, clock):
+        """Test: Energiepreis wird innerhalb der TTL nur einmal aus der DB gelesen"""
+        assert helper.get_energy_price_level() == 1
+        db.external_data['energy_price'] = {'price': 0.40}
+
+        clock[0] += EXTERNAL_DATA_CACHE_TTL / 2
+        assert helper.get_energy_price_level() == 1
+        assert db.calls == ['energy_price']
+
+        clock[0] += EXTERNAL_DATA_CACHE_TTL / 2
+        assert helper.get_energy_price_level() == 3
+        assert db.calls == ['energy_price', 'energy_price']
+
+    def test_invalidate_external_data(self, helper, db, clock):
+        """Test: invalidate_external_data verwirft einen oder alle Typen"""
+        assert helper._weather_cloud_factor() == 0.75
+        assert helper.get_energy_price_level() == 1
+        db.external_data.update({'energy_price': {'level': 2}, 'weather': {'clouds': 100}})
+
+        helper.invalidate_external_data('energy_price')
+        assert helper.get_energy_price_level() == 2
+        assert helper._weather_cloud_factor() == 0.75
+
+        helper.invalidate_external_data()
+        assert helper._weather_cloud_factor() == 0.5
+        assert db.calls == ['weather', 'energy_price', 'energy_price', 'weather']
+
+    def test_missing_external_data_cached(self, helper, db, clock):
+        """Test: Fehlende Daten werden ebenfalls zwischengespeichert (Fallback auf Schätzung)"""
+        db.external_data.clear()
+
+        assert helper.get_energy_price_level() in (1, 2, 3)
+        assert helper._weather_cloud_factor() == 1.0
+        helper.get_energy_price_level()
+        helper._weather_cloud_factor()
+
+        assert db.calls == ['energy_price', 'weather']
@@ -4,8 +4,12 @@ Tests für Web-API Endpoints
 
 import pytest
 import json
-from unittest.mock import Mock, patch
+import os
+from types import SimpleNamespace
+from unittest.mock import Mock, patch, DEFAULT
 from src.web.app import WebInterface
+from src.decision_engine.engine import DecisionEngine
+from src.data_collector.homey_collector import HomeyCollector
 from src.utils.database import Database
 
 
@@ -18,6 +22,46 @@ def test_app(test_config, test_db):
         yield client
 
 
+@pytest.fixture
+def cached_app(monkeypatch, tmp_path):
+    """Flask Test Client mit Mock-Engine (ohne Hintergrund-Jobs) und steuerbarer Uhr für den Response-Cache"""
+    monkeypatch.chdir(tmp_path)
+
+    clock = [1000.0]
+    monkeypatch.setattr('src.web.app.time', SimpleNamespace(monotonic=lambda: clock[0]))
+
+    engine = Mock()
+    engine.platform.get_all_entities.side_effect = lambda domain: [f'{domain}.test']
+    engine.platform.get_states.side_effect = lambda sensor_ids: {
+        sensor_id: {'state': 'on', 'attributes': {'friendly_name': sensor_id}}
+        for sensor_id in sensor_ids
+    }
+    engine.collect_current_state.return_value = {'timestamp': 'now', 'current_temperature': 21.0}
+    engine.weather.get_forecast.return_value = {'forecasts': []}
+    engine._get_all_humidity_sensors.return_value = []
+    engine._extract_temperature_value.return_value = 21.0
+
+    with patch.multiple(
+        'src.web.app',
+        DecisionEngine=Mock(return_value=engine),
+        Database=DEFAULT,
+        BackgroundDataCollector=DEFAULT,
+        BathroomOptimizer=DEFAULT,
+        MLAutoTrainer=DEFAULT,
+        HeatingDataCollector=DEFAULT,
+        WindowDataCollector=DEFAULT,
+        BathroomDataCollector=DEFAULT,
+        LightingDataCollector=DEFAULT,
+        TemperatureDataCollector=DEFAULT,
+        DatabaseMaintenanceJob=DEFAULT,
+    ):
+        web = WebInterface()
+    web.app.config['TESTING'] = True
+
+    with web.app.test_client() as client:
+        yield SimpleNamespace(client=client, engine=engine, clock=clock)
+
+
 class TestHealthEndpoints:
     """Tests für Health & Status Endpoints"""
 
@@ -240,3 +284,152 @@ class TestHTMLPages:
         """Test: Heating-Seite"""
         response = test_app.get('/heating')
         assert response.status_code == 200
+
+
+class TestResponseCache:
+    """Tests für den Cache der Dashboard-Endpoints (/api/status, /api/devices, /api/sensors/available)"""
+
+    def test_cache_hit_within_ttl(self, cached_app):
+        """Test: Innerhalb der TTL wird die Antwort nicht neu gebaut"""
+        client, engine = cached_app.client, cached_app.engine
+
+        first = client.get('/api/devices')
+        fetches = engine.platform.get_states.call_count
+        assert first.status_code == 200
+        assert fetches > 0
+
+        cached_app.clock[0] += 14
+        second = client.get('/api/devices')
+        assert second.status_code == 200
+        assert second.data == first.data
+        assert engine.platform.get_states.call_count == fetches
+
+        cached_app.clock[0] += 1
+        client.get('/api/devices')
+        assert engine.platform.get_states.call_count == 2 * fetches
+
+        for _ in range(2):
+            assert client.get('/api/status').get_json()['temperature']['indoor'] == 21.0
+        assert engine.collect_current_state.call_count == 1
+
+    def test_device_control_drops_devices_entry(self, cached_app):
+        """Test: Erfolgreiches Steuern verwirft die gecachte Geräteliste, andere Einträge bleiben"""
+        client, engine = cached_app.client, cached_app.engine
+        client.get('/api/devices')
+        client.get('/api/status')
+        fetches = engine.platform.get_states.call_count
+
+        engine.platform.turn_on.return_value = False
+        client.post('/api/devices/light.test/control', json={'action': 'turn_on'})
+        client.get('/api/devices')
+        assert engine.platform.get_states.call_count == fetches
+
+        engine.platform.turn_on.return_value = True
+        response = client.post('/api/devices/light.test/control', json={'action': 'turn_on'})
+        assert response.get_json()['success'] is True
+
+        client.get('/api/devices')
+        assert engine.platform.get_states.call_count == 2 * fetches
+        client.get('/api/status')
+        assert engine.collect_current_state.call_count == 1
+
+    def test_error_payload_not_cached(self, cached_app):
+        """Test: Fehlerantworten werden nicht gecacht, der nächste Aufruf baut neu"""
+        client, engine = cached_app.client, cached_app.engine
+        engine._get_all_temperature_sensors.side_effect = [
+            RuntimeError('Plattform nicht erreichbar'),
+            ['sensor.wohnzimmer_temperatur'],
+        ]
+
+        failed = client.get('/api/sensors/available')
+        assert failed.status_code == 500
+        assert 'error' in failed.get_json()
+
+        response = client.get('/api/sensors/available')
+        assert response.status_code == 200
+        assert [sensor['id'] for sensor in response.get_json()['temperature_sensors']] == [
+            'sensor.wohnzimmer_temperatur'
+        ]
+        assert engine._get_all_temperature_sensors.call_count == 2
+
+        assert client.get('/api/sensors/available').data == response.data
+        assert engine._get_all_temperature_sensors.call_count == 2
+
+    def test_partial_device_list_not_cached(self, cached_app):
+        """Test: Schlägt eine Domain fehl, wird die unvollständige Geräteliste nicht gecacht"""
+        client, engine = cached_app.client, cached_app.engine
+        all_entities = engine.platform.get_all_entities.side_effect
+        failing = {'climate'}
+
+        def get_all_entities(domain):
+            if domain in failing:
+                raise RuntimeError('Plattform nicht erreichbar')
+            return all_entities(domain)
+
+        engine.platform.get_all_entities.side_effect = get_all_entities
+
+        partial = client.get('/api/devices').get_json()
+        assert partial['failed_domains'] == ['climate']
+        assert 'climate.test' not in [device['id'] for device in partial['devices']]
+
+        failing.clear()
+        complete = client.get('/api/devices').get_json()
+        assert complete['failed_domains'] == []
+        assert complete['count'] == partial['count'] + 1
+
+        calls = engine.platform.get_all_entities.call_count
+        assert client.get('/api/devices').get_json() == complete
+        assert engine.platform.get_all_entities.call_count == calls
+
+    @patch('src.data_collector.homey_collector.requests.get')
+    def test_available_sensors_on_homey_without_extra_device_download(self, mock_get, cached_app):
+        """Test: Auf Homey lädt der Sensor-Batch die Device-Liste nicht ein drittes Mal"""
+        client, engine = cached_app.client, cached_app.engine
+        mock_get.return_value = Mock(status_code=200, **{'json.return_value': [
+            {'id': 'sensor-1', 'name': 'Bad Klima', 'class': 'sensor',
+             'capabilitiesObj': {'measure_temperature': {'value': 21.5}, 'measure_humidity': {'value': 60}}},
+        ]})
+        engine.platform = HomeyCollector(url='http://test.local', token='test-token')
+        for name in ('_get_all_temperature_sensors', '_get_all_humidity_sensors',
+                     '_extract_temperature_value', '_extract_humidity_value'):
+            setattr(engine, name, getattr(DecisionEngine, name).__get__(engine))
+
+        data = client.get('/api/sensors/available').get_json()
+
+        assert [sensor['current_value'] for sensor in data['temperature_sensors']] == [21.5]
+        assert [sensor['id'] for sensor in data['humidity_sensors']] == ['sensor-1']
+        # Je ein Refresh in _get_all_temperature_sensors/_get_all_humidity_sensors, States aus dem Cache
+        assert mock_get.call_count == 2
+
+
+class TestJsonFileCache:
+    """Tests für den Cache geparster JSON-Dateien (data/rooms.json)"""
+
+    def test_rooms_writers_update_cache(self, cached_app):
+        """Test: Zuordnen/Entfernen über die API ist beim nächsten GET sichtbar"""
+        client = cached_app.client
+        client.post('/api/rooms', json={'name': 'Bad'})
+        room_id = client.get('/api/rooms').get_json()['rooms'][0]['id']
+
+        client.post('/api/rooms/assign-device', json={'device_id': 'light.bad', 'room_id': room_id})
+        assert client.get('/api/rooms').get_json()['assignments'] == {'light.bad': room_id}
+
+        client.post('/api/rooms/unassign-device', json={'device_id': 'light.bad'})
+        assert client.get('/api/rooms').get_json()['assignments'] == {}
+
+        client.post('/api/rooms/delete', json={'room_id': room_id})
+        assert client.get('/api/rooms').get_json()['rooms'] == []
+
+    def test_same_mtime_different_size_reparsed(self, cached_app, tmp_path):
+        """Test: Externe Änderung mit gleicher mtime, aber anderer Größe wird erkannt"""
+        client = cached_app.client
+        rooms_file = tmp_path / 'data' / 'rooms.json'
+        rooms_file.parent.mkdir()
+        rooms_file.write_text(json.dumps({'rooms': [], 'assignments': {}}))
+        mtime_ns = rooms_file.stat().st_mtime_ns
+        assert client.get('/api/rooms').get_json()['assignments'] == {}
+
+        rooms_file.write_text(json.dumps({'rooms': [], 'assignments': {'light.bad': 'bad'}}))
+        os.utime(rooms_file, ns=(mtime_ns, mtime_ns))
+
+        assert client.get('/api/rooms').get_json()['assignments'] == {'light.bad': 'bad'}